@@ -1,6 +1,10 @@
-from flask import Flask, render_template, request
+import io
+
+import numpy as np
+from flask import Flask, render_template, request, jsonify, send_file
 
 from latency_model.total_latency import calculate_total_latency  # import unic
+from latency_model.batch import calculate_latency_grid
 
 app = Flask(__name__)
 
@@ -12,5 +16,37 @@ def index():
         result = calculate_total_latency(params)
     return render_template('index.html', result=result)
 
+@app.route('/batch', methods=['POST'])
+def batch():
+    # corp JSON: {"grid": {param: valori | {start, stop, num|step}}, "fixed": {...},
+    #             "format": "json" (sumar + valori optionale) | "npz" (tablouri binare)}
+    body = request.get_json(force=True)
+    try:
+        axes, components = calculate_latency_grid(body['grid'], body.get('fixed'))
+    except (KeyError, TypeError, ValueError) as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    total = components['Total Latency']
+    if body.get('format') == 'npz':
+        # componentele raman la forma lor minima; clientul face broadcast la forma grilei
+        buf = io.BytesIO()
+        np.savez(buf, **{f'axis_{k}': v for k, v in axes.items()},
+                 **{k.replace(' ', '_'): v for k, v in components.items()})
+        buf.seek(0)
+        return send_file(buf, mimetype='application/octet-stream', download_name='latency_grid.npz')
+
+    response = {
+        'axes': {k: v.tolist() for k, v in axes.items()},
+        'shape': list(total.shape),
+        'summary': {
+            k: {'min': float(np.min(v)), 'max': float(np.max(v)), 'mean': float(np.mean(v))}
+            for k, v in components.items()
+        },
+    }
+    if body.get('include_values'):
+        response['values'] = {k: np.broadcast_to(v, total.shape).round(3).tolist()
+                              for k, v in components.items()}
+    return jsonify(response)
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,125 @@
+import numpy as np
+
+from latency_model.scheduling_delay import FACTORI_ORDONARE
+
+# Evaluare vectorizata a modelului analitic: fiecare parametru poate fi scalar
+# sau tablou NumPy, iar rezultatele sunt tablouri cu forma obtinuta prin broadcast.
+# Pentru valori intregi ale parametrilor rezultatele coincid cu calculate_total_latency.
+
+VALORI_IMPLICITE = {
+    'ordonare_dinamica': True,
+    'numerologie': 0,
+    'k_sloturi': 1,
+    'tip_slot': 'slot',
+    'tip_ordonare': 'RR',
+    'n_symbs_mini_slot': 2,
+    'n_bits': 1000,
+    'modulation_order': 2,
+    'overhead': 0.2,
+    'processing_delay': 0.2,
+    'n_retransmisii': 0,
+    'feedback_delay': 4,
+    'retransmission_delay': 8,
+    'distanta': 100,
+}
+
+COMPONENTE = ('Access Delay', 'Scheduling Delay', 'Transmission Delay', 'Processing Delay',
+              'HARQ Delay', 'Propagation Delay', 'Total Latency')
+
+
+def batch_access_delay(ordonare_dinamica):
+    # T_sr + T_grant = 4 ms cand ordonarea e dinamica, altfel 0
+    return np.where(np.asarray(ordonare_dinamica, dtype=bool), 4.0, 0.0)
+
+
+def batch_scheduling_delay(numerologie, k_sloturi, tip_slot, n_symbs_mini_slot, tip_ordonare):
+    mu = np.asarray(numerologie, dtype=float)
+    T_symb = 1 / (15 * 1000 * 2.0 ** mu) * 1e3  # ms
+    n_symbs = np.where(np.asarray(tip_slot) == 'mini_slot', np.asarray(n_symbs_mini_slot, dtype=float), 14.0)
+    factor = _lookup(tip_ordonare, FACTORI_ORDONARE, 1.0)
+    return np.asarray(k_sloturi, dtype=float) * n_symbs * T_symb * factor
+
+
+def batch_transmission_delay(n_bits, modulation_order, numerologie, overhead):
+    mod_order = np.asarray(modulation_order, dtype=float)
+    delta_f = 15 * 1000 * 2.0 ** np.asarray(numerologie, dtype=float)
+    with np.errstate(divide='ignore'):
+        t = np.asarray(n_bits, dtype=float) / (mod_order * delta_f) * (1 + np.asarray(overhead, dtype=float))
+    return np.where(mod_order == 0, np.inf, t * 1e3)  # evitam impartirea la 0
+
+
+def batch_processing_delay(processing_delay):
+    return np.asarray(processing_delay, dtype=float)
+
+
+def batch_harq_delay(n_retransmisii, feedback_delay, retransmission_delay):
+    return np.asarray(n_retransmisii, dtype=float) * (np.asarray(feedback_delay, dtype=float)
+                                                      + np.asarray(retransmission_delay, dtype=float))
+
+
+def batch_propagation_delay(distanta):
+    c = 3e8  # viteza luminii in m/s
+    return np.asarray(distanta, dtype=float) / c * 1000
+
+
+def _lookup(values, table, default):
+    # mapare vectorizata string -> factor (doar pe valorile unice)
+    values = np.asarray(values)
+    uniq, inv = np.unique(values, return_inverse=True)
+    mapped = np.array([table.get(str(v), default) for v in uniq], dtype=float)
+    return mapped[inv].reshape(values.shape)
+
+
+def calculate_total_latency_batch(params):
+    """
+    Varianta vectorizata a calculate_total_latency: params contine scalari
+    sau tablouri (compatibile la broadcast). Intoarce un dict cu aceleasi chei
+    ca varianta scalara, cu tablouri NumPy; componentele pastreaza forma lor
+    minima, iar 'Total Latency' are forma completa a grilei.
+    """
+    p = {**VALORI_IMPLICITE, **params}
+    out = {
+        'Access Delay': batch_access_delay(p['ordonare_dinamica']),
+        'Scheduling Delay': batch_scheduling_delay(p['numerologie'], p['k_sloturi'], p['tip_slot'],
+                                                   p['n_symbs_mini_slot'], p['tip_ordonare']),
+        'Transmission Delay': batch_transmission_delay(p['n_bits'], p['modulation_order'],
+                                                       p['numerologie'], p['overhead']),
+        'Processing Delay': batch_processing_delay(p['processing_delay']),
+        'HARQ Delay': batch_harq_delay(p['n_retransmisii'], p['feedback_delay'], p['retransmission_delay']),
+        'Propagation Delay': batch_propagation_delay(p['distanta']),
+    }
+    total = out['Access Delay']
+    for key in COMPONENTE[1:-1]:
+        total = total + out[key]
+    out['Total Latency'] = total
+    return out
+
+
+def axis_values(spec):
+    # o axa a grilei: lista de valori, {start, stop, num} (linspace) sau {start, stop, step} (arange)
+    if isinstance(spec, dict):
+        if 'num' in spec:
+            return np.linspace(spec['start'], spec['stop'], int(spec['num']))
+        return np.arange(spec['start'], spec['stop'], spec.get('step', 1))
+    return np.asarray(spec)
+
+
+def calculate_latency_grid(grid, fixed=None):
+    """
+    Evalueaza modelul pe produsul cartezian al axelor din `grid`
+    (ex. {'numerologie': [0, 1, 2, 3], 'n_symbs_mini_slot': [2, 4, 7],
+          'modulation_order': [2, 4, 6, 8], 'n_retransmisii': [0, 1, 2, 3],
+          'distanta': {'start': 0, 'stop': 1000, 'num': 100}}).
+    Fiecare axa primeste propria dimensiune, deci grila nu este materializata
+    decat in rezultat. Intoarce (axe, componente).
+    """
+    axes = {name: axis_values(spec) for name, spec in grid.items()}
+    n = len(axes)
+    params = dict(fixed or {})
+    for i, (name, values) in enumerate(axes.items()):
+        shape = [1] * n
+        shape[i] = len(values)
+        params[name] = values.reshape(shape)
+    if 'n_symbs_mini_slot' in axes and 'tip_slot' not in params:
+        params['tip_slot'] = 'mini_slot'  # o axa de simboluri are sens doar pentru mini-slot
+    return axes, calculate_total_latency_batch(params)
@@ -1,3 +1,10 @@
+FACTORI_ORDONARE = {
+    'RR':1,
+    'BestCQI':0.8,
+    'PF':0.9,
+    'WFQ':0.7
+}   #deefinim un dictionar care asociaza fiecare algoritm de scheduling cu un factor de eficienta, cu cat factorul de mai mic, cu atat delay-ul etse mai mic
+
 def calculate_scheduling_delay(params):
     mu =int( params.get('numerologie', 0)) #ia valoarea din dictionar pentru cheia numerologie, dar daca nu exista, pune 0
     k = int(params.get('k_sloturi', 1))
@@ -15,12 +22,6 @@ def calculate_scheduling_delay(params):
     else:
         durata_slot=14*T_symb #fallback
 
-    factori = {
-        'RR':1,
-        'BestCQI':0.8,
-        'PF':0.9,
-        'WFQ':0.7
-    }   #deefinim un dictionar care asociaza fiecare algoritm de scheduling cu un factor de eficienta, cu cat factorul de mai mic, cu atat delay-ul etse mai mic
-    factor= factori.get(tip_ordonare,1)
+    factor= FACTORI_ORDONARE.get(tip_ordonare,1)
 
     return k*durata_slot*factor
\ No newline at end of file
@@ -0,0 +1,33 @@
+# simulator/__init__.py
+"""
+Simulator de latență 5G NR. Nucleul (simulator, scheduler, traffic, channel,
+harq_manager, rb, link_adaptation, frames, simconfig, config) depinde doar de
+biblioteca standard și de numpy; interfața web (app) și graficele (pandas,
+matplotlib, flask) sunt opționale și se încarcă doar la prima utilizare.
+
+Importul pachetului nu încarcă nimic în plus: numele de mai jos sunt
+rezolvate la primul acces.
+"""
+
+import importlib
+
+_LAZY = {
+    "run_scenario":       "simulator.simulator",
+    "Simulation":         "simulator.simulator",
+    "SimulationResult":   "simulator.simulator",
+    "run_scenario_slice": "simulator.simulator_slice",
+    "SimConfig":          "simulator.simconfig",
+    "compile_config":     "simulator.simconfig",
+    "default_params":     "simulator.config",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module 'simulator' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -1,14 +1,15 @@
+import json
 import os
 import sys
-from flask import Flask, render_template, request
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
+import threading
+import time
+import uuid
+from flask import Flask, render_template, request, jsonify, Response, abort, url_for
 
-# Permitem import-uri din pachetul simulator
-project_root = os.path.dirname(os.path.abspath(__file__))
-sys.path.append(project_root)
-sys.path.append(os.path.join(project_root, "simulator"))
+# Rulat ca script (python app.py), pachetul `simulator` e găsit prin
+# directorul părinte; ca modul (python -m simulator.app) nu e nevoie de nimic
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from simulator.simulator import run_scenario, SimulationResult
 from simulator.simulator_slice import run_scenario_slice, SliceSimulationResult
@@ -18,193 +19,437 @@ app = Flask(__name__)
 images_dir = os.path.join(app.static_folder, "images")
 os.makedirs(images_dir, exist_ok=True)
 
+# Catalogul rulărilor (metadate SQLite + coloanele livrărilor pe disc)
+catalog_dir = os.environ.get("SIM_CATALOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs"))
+
+
+def _catalog():
+    # O conexiune per cerere / fir: sqlite3 nu partajează tranzacțiile între fire
+    from simulator.catalog import RunCatalog
+    return RunCatalog(catalog_dir)
+
+
+def _record(res, params: dict, wall_s: float):
+    cat = _catalog()
+    try:
+        return cat.record(res, params, label="web", wall_s=wall_s)
+    finally:
+        cat.close()
+
+
+def _params_from_form(form):
+    # --- 1) Citire parametri comuni din formular ---
+    scs_mu   = int(form["scs_mu"])
+    bw       = float(form["bandwidth_mhz"])
+    n_ues    = int(form["n_ues"])
+    sim_time = float(form["sim_time_ms"])
+    traffic  = form["traffic_type"]
+    pkt_bits = int(form["packet_size_bits"])
+    slot_type= form["slot_type"]
+    coding   = float(form["coding_time_us"])
+    decoding = float(form["decoding_time_us"])
+    fb_delay = float(form["feedback_delay_us"])
+    retx_dur = float(form["retransmission_duration_us"])
+    mode     = form["scheduler_mode"]
+
+    # Construim parametrii de bază
+    base_params = {
+        "scs_mu": scs_mu,
+        "bandwidth_mhz": bw,
+        "n_ues": n_ues,
+        "sim_time_ms": sim_time,
+        "traffic_type": traffic,
+        "packet_size_bits": pkt_bits,
+        "slot_type": slot_type,
+        "coding_time_us": coding,
+        "decoding_time_us": decoding,
+        "feedback_delay_us": fb_delay,
+        "retransmission_duration_us": retx_dur,
+        # heatmap-ul debitului per UE din pagina de rezultate
+        "telemetry_per_ue": True,
+    }
+    if slot_type == "mini":
+        base_params["mini_symbols"] = [int(form["mini_symbols"])]
+    if form.get("memory_every_slots"):
+        # contabilitatea memoriei (opțională): eșantion la fiecare N sloturi
+        base_params["memory_every_slots"] = int(form["memory_every_slots"])
+    return base_params, mode
+
+
+def _reporting():
+    # Stiva de raportare (pandas, matplotlib) se încarcă la prima randare, nu la
+    # importul aplicației: pornirea serverului și a job-urilor rămâne ușoară
+    import numpy as np
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    return pd, plt, np
+
+
+def _render_classic(res: SimulationResult, run_id: int = None):
+    # Grafice, statistici și tabele pentru o simulare clasică (fără slicing);
+    # cu run_id, imaginile rămân în images/<run_id>/ și nu suprascriu rulările anterioare
+    pd, plt, np = _reporting()
+    sub = str(run_id) if run_id is not None else ""
+    out_dir = os.path.join(images_dir, sub)
+    os.makedirs(out_dir, exist_ok=True)
+    image = lambda name: "/".join(p for p in ("images", sub, name) if p)
+    # 2a) Statistici sumare: min/mean/max
+    df = pd.DataFrame(res.latencies, columns=["latency_ms"])
+    stats = (df.describe()
+               .loc[["min","mean","max"]]
+               .round(2)
+               .reset_index()
+               .rename(columns={"index":"stat"}))
+    stats_html = stats.to_html(classes="table table-sm", index=False)
+
+    # 2b) Rate de retransmisie
+    total    = len(res.latencies)
+    first_ok = sum(res.first_tx)
+    retrans  = total - first_ok
+    summary = {
+        "total": total,
+        "first": first_ok,
+        "first_pct": round(first_ok/total*100,1) if total else 0.0,
+        "retrans": retrans,
+        "retrans_pct": round(retrans/total*100,1) if total else 0.0,
+    }
+
+    # 2c) Generare grafice și salvare
+    # (păstrăm restul grafurilor existente...)
+    plt.figure()
+    plt.hist(res.latencies, bins=20, edgecolor="black")
+    plt.title("Histogramă latență")
+    plt.xlabel("ms"); plt.ylabel("count"); plt.tight_layout()
+    plt.savefig(os.path.join(out_dir, "histogram.png")); plt.close()
+
+    plt.figure(figsize=(6,4))
+    plt.scatter(res.slot_indices, res.latencies, alpha=0.6)
+    plt.title("Latență în funcție de sloturi")
+    plt.xlabel("Slot index"); plt.ylabel("latență (ms)"); plt.tight_layout()
+    plt.savefig(os.path.join(out_dir, "scatter.png")); plt.close()
+
+    xs = np.sort(res.latencies)
+    ys = np.arange(1, len(xs)+1)/len(xs)
+    plt.figure(figsize=(6,4))
+    plt.plot(xs, ys)
+    plt.title("CDF latență")
+    plt.xlabel("ms"); plt.ylabel("P(X ≤ x)"); plt.tight_layout()
+    plt.savefig(os.path.join(out_dir, "cdf.png")); plt.close()
+
+    dist = [d["distance_m"] for d in res.delivered_logs]
+    plt.figure(figsize=(6,4))
+    plt.scatter(dist, res.latencies, alpha=0.6)
+    plt.title("Latență vs Distanță")
+    plt.xlabel("m"); plt.ylabel("lat. ms"); plt.tight_layout()
+    plt.savefig(os.path.join(out_dir, "lat_vs_dist.png")); plt.close()
+
+    cqi = [d["cqi"] for d in res.delivered_logs]
+    plt.figure(figsize=(6,4))
+    plt.hist(cqi, bins=range(0,17), edgecolor="black", align="left")
+    plt.title("Distribuție CQI")
+    plt.xlabel("CQI"); plt.ylabel("count"); plt.tight_layout()
+    plt.savefig(os.path.join(out_dir, "cqi_dist.png")); plt.close()
+
+    # Heatmap din telemetria pe ferestre: biții livrați per UE în fiecare
+    # bin de sloturi (nu doar PRB-urile pachetelor livrate). Fără telemetrie
+    # (telemetry_bin_slots = 0) sau fără matricea per UE, graficele lipsesc.
+    tel = res.telemetry
+    heatmap_image = telemetry_image = None
+    if tel is not None and tel.ue_bits is not None:
+        plt.figure(figsize=(6,4))
+        plt.imshow(tel.ue_bits.T, aspect='auto', origin='lower',
+                   extent=[0, len(tel) * tel.bin_slots, -0.5, tel.ue_bits.shape[1] - 0.5])
+        plt.colorbar(label=f"biți livrați / {tel.bin_slots} sloturi")
+        plt.title("Heatmap debit per UE")
+        plt.xlabel("Slot"); plt.ylabel("UE ID"); plt.tight_layout()
+        plt.savefig(os.path.join(out_dir, "prb_heatmap.png")); plt.close()
+        heatmap_image = image("prb_heatmap.png")
+
+    # Serii de timp ale celulei: utilizare PRB, backlog, HARQ activ
+    if tel is not None:
+        fig, axes = plt.subplots(3, 1, figsize=(8, 6), sharex=True)
+        axes[0].plot(tel.slot_start, tel.utilization * 100)
+        axes[0].set_ylabel("PRB ocupate [%]")
+        axes[1].plot(tel.slot_start, tel.backlog_bits)
+        axes[1].set_ylabel("backlog [biți]")
+        axes[2].plot(tel.slot_start, tel.harq_active, label="HARQ activ")
+        axes[2].bar(tel.slot_start, tel.dropped, width=tel.bin_slots, alpha=0.4, label="pierdute")
+        axes[2].set_ylabel("procese / pachete"); axes[2].legend(fontsize="small")
+        axes[2].set_xlabel("Slot")
+        fig.tight_layout()
+        fig.savefig(os.path.join(out_dir, "telemetry.png")); plt.close(fig)
+        telemetry_image = image("telemetry.png")
+
+    # ——————— Evoluție distanță per UE ———————
+    # res.distance_log este un DistanceTrace: sloturile eșantionate și
+    # matricea distanțelor (eșantion × UE)
+    trace = res.distance_log
+
+    # determinăm un pas de marcare la fiecare 10% din numărul total de puncte
+    mark_step = max(1, len(trace) // 10)
+
+    plt.figure(figsize=(10, 5))
+    for ue in range(trace.distance_m.shape[1]):
+        x = trace.slots
+        y = trace.distance_m[:, ue]
+
+        # linie continuă, cu un marker la fiecare al n-lea punct
+        plt.plot(x, y,
+                 linewidth=2,
+                 label=f"UE{ue}",
+                 markevery=mark_step,
+                 marker='o', markersize=5)
+
+        # etichetăm punctele cheie: început, mijloc, sfârșit
+        mid_idx = len(x) // 2
+        for idx in [0, mid_idx, -1]:
+            plt.text(x[idx], y[idx],
+                     f"{y[idx]:.1f}",
+                     fontsize=8,
+                     va='bottom', ha='right')
+
+    plt.xlabel("Slot index")
+    plt.ylabel("Distanță [m]")
+    plt.title("Evoluție distanță per UE")
+    plt.grid(True, linestyle='--', alpha=0.4)
+    plt.legend(bbox_to_anchor=(1.02, 1), loc='upper left', fontsize="small")
+    plt.tight_layout()
+    plt.savefig(os.path.join(out_dir, "distance_evolution.png"))
+    plt.close()
+
+    # Tabele latență și detalii
+    lat_df = pd.DataFrame({
+        "# Pachet": list(range(1, total+1)),
+        "Latență [ms]": [round(x,3) for x in res.latencies]
+    })
+    lat_table = lat_df.to_html(classes="table table-sm", index=False)
+
+    det_df = pd.DataFrame(res.delivered_logs).rename(columns={
+        "ue":"UE","slot":"Slot","latency_ms":"Latență (ms)",
+        "distance_m":"Distanță (m)","pathloss_db":"Pierdere cale (dB)",
+        "sinr_db":"SINR (dB)","cqi":"CQI","mcs_idx":"MCS",
+        "Qm":"Qm","code_rate":"Rată Cod","n_prbs":"PRB",
+        "tbs_teoretic":"TBS teoretic","tbs_bits":"TBS (biți)",
+        "first_tx":"1a TX?"
+    })
+    det_table = det_df.to_html(classes="table table-sm", index=False)
+
+    # Contabilitatea memoriei, inclusiv copiile pandas făcute mai sus
+    memory_table = None
+    if res.memory is not None:
+        res.memory.add("pandas:latency_df", df.memory_usage(deep=True).sum())
+        res.memory.add("pandas:lat_table_df", lat_df.memory_usage(deep=True).sum())
+        res.memory.add("pandas:details_df", det_df.memory_usage(deep=True).sum())
+        memory_table = pd.DataFrame(res.memory.rows()).rename(columns={
+            "structure": "Structură", "last_mb": "Ultim [MB]",
+            "peak_mb": "Vârf [MB]", "growth_mb_s": "Creștere [MB/s simulat]"
+        }).to_html(classes="table table-sm", index=False)
+
+    # Returnăm pagina cu rezultate
+    return render_template(
+        "results.html",
+        summary                = summary,
+        stats_table            = stats_html,
+        hist_image             = image("histogram.png"),
+        scatter_image          = image("scatter.png"),
+        cdf_image              = image("cdf.png"),
+        latdist_image          = image("lat_vs_dist.png"),
+        cqi_image              = image("cqi_dist.png"),
+        heatmap_image          = heatmap_image,
+        telemetry_image        = telemetry_image,
+        distance_evol_image    = image("distance_evolution.png"),
+        lat_table              = lat_table,
+        det_table              = det_table,
+        memory_table           = memory_table,
+        run_id                 = run_id
+    )
+
 
 @app.route("/", methods=["GET", "POST"])
 def index():
     error = None
 
     if request.method == "POST":
-        # --- 1) Citire parametri comuni din formular ---
-        scs_mu   = int(request.form["scs_mu"])
-        bw       = float(request.form["bandwidth_mhz"])
-        n_ues    = int(request.form["n_ues"])
-        sim_time = float(request.form["sim_time_ms"])
-        traffic  = request.form["traffic_type"]
-        pkt_bits = int(request.form["packet_size_bits"])
-        slot_type= request.form["slot_type"]
-        coding   = float(request.form["coding_time_us"])
-        decoding = float(request.form["decoding_time_us"])
-        fb_delay = float(request.form["feedback_delay_us"])
-        retx_dur = float(request.form["retransmission_duration_us"])
-        mode     = request.form["scheduler_mode"]
-
-        # Construim parametrii de bază
-        base_params = {
-            "scs_mu": scs_mu,
-            "bandwidth_mhz": bw,
-            "n_ues": n_ues,
-            "sim_time_ms": sim_time,
-            "traffic_type": traffic,
-            "packet_size_bits": pkt_bits,
-            "slot_type": slot_type,
-            "coding_time_us": coding,
-            "decoding_time_us": decoding,
-            "feedback_delay_us": fb_delay,
-            "retransmission_duration_us": retx_dur,
-        }
-        if slot_type == "mini":
-            base_params["mini_symbols"] = [int(request.form["mini_symbols"])]
+        base_params, mode = _params_from_form(request.form)
 
         # --- 2) Simulare clasică (fără slicing) ---
         if mode != "slice":
             sim_params: dict = {**base_params, "scheduler_mode": mode}
-            res: SimulationResult = run_scenario(sim_params)
-
-            # 2a) Statistici sumare: min/mean/max
-            df = pd.DataFrame(res.latencies, columns=["latency_ms"])
-            stats = (df.describe()
-                       .loc[["min","mean","max"]]
-                       .round(2)
-                       .reset_index()
-                       .rename(columns={"index":"stat"}))
-            stats_html = stats.to_html(classes="table table-sm", index=False)
-
-            # 2b) Rate de retransmisie
-            total    = len(res.latencies)
-            first_ok = sum(res.first_tx)
-            retrans  = total - first_ok
-            summary = {
-                "total": total,
-                "first": first_ok,
-                "first_pct": round(first_ok/total*100,1) if total else 0.0,
-                "retrans": retrans,
-                "retrans_pct": round(retrans/total*100,1) if total else 0.0,
-            }
-
-            # 2c) Generare grafice și salvare
-            # (păstrăm restul grafurilor existente...)
-            plt.figure()
-            plt.hist(res.latencies, bins=20, edgecolor="black")
-            plt.title("Histogramă latență")
-            plt.xlabel("ms"); plt.ylabel("count"); plt.tight_layout()
-            plt.savefig(os.path.join(images_dir, "histogram.png")); plt.close()
-
-            plt.figure(figsize=(6,4))
-            plt.scatter(res.slot_indices, res.latencies, alpha=0.6)
-            plt.title("Latență în funcție de sloturi")
-            plt.xlabel("Slot index"); plt.ylabel("latență (ms)"); plt.tight_layout()
-            plt.savefig(os.path.join(images_dir, "scatter.png")); plt.close()
-
-            xs = np.sort(res.latencies)
-            ys = np.arange(1, len(xs)+1)/len(xs)
-            plt.figure(figsize=(6,4))
-            plt.plot(xs, ys)
-            plt.title("CDF latență")
-            plt.xlabel("ms"); plt.ylabel("P(X ≤ x)"); plt.tight_layout()
-            plt.savefig(os.path.join(images_dir, "cdf.png")); plt.close()
-
-            dist = [d["distance_m"] for d in res.delivered_logs]
-            plt.figure(figsize=(6,4))
-            plt.scatter(dist, res.latencies, alpha=0.6)
-            plt.title("Latență vs Distanță")
-            plt.xlabel("m"); plt.ylabel("lat. ms"); plt.tight_layout()
-            plt.savefig(os.path.join(images_dir, "lat_vs_dist.png")); plt.close()
-
-            cqi = [d["cqi"] for d in res.delivered_logs]
-            plt.figure(figsize=(6,4))
-            plt.hist(cqi, bins=range(0,17), edgecolor="black", align="left")
-            plt.title("Distribuție CQI")
-            plt.xlabel("CQI"); plt.ylabel("count"); plt.tight_layout()
-            plt.savefig(os.path.join(images_dir, "cqi_dist.png")); plt.close()
-
-            max_slot = max(res.slot_indices) + 1
-            prb_mat = np.zeros((len(res.ue_ids), max_slot))
-            for uid, slot, rec in zip(res.ue_ids, res.slot_indices, res.delivered_logs):
-                prb_mat[uid, slot] = rec["n_prbs"]
-            plt.figure(figsize=(6,4))
-            plt.imshow(prb_mat, aspect='auto', origin='lower')
-            plt.colorbar(label="PRB alocate")
-            plt.title("Heatmap PRB-uri")
-            plt.xlabel("Slot"); plt.ylabel("UE ID"); plt.tight_layout()
-            plt.savefig(os.path.join(images_dir, "prb_heatmap.png")); plt.close()
-
-            # ——————— Evoluție distanță per UE ———————
-            # presupunem că run_scenario a populat res.distance_log cu câte un rând
-            # pentru fiecare slot (sau mini-slot) ca {'ue': ue, 'slot': slot, 'distance_m': dist}
-
-            dist_df = pd.DataFrame(res.distance_log)
-
-            # determinăm un pas de marcare la fiecare 10% din numărul total de puncte
-            mark_step = max(1, len(dist_df) // 10)
-
-            plt.figure(figsize=(10, 5))
-            for ue in sorted(dist_df['ue'].unique()):
-                sub = dist_df[dist_df['ue'] == ue]
-                x = sub['slot'].values
-                y = sub['distance_m'].values
-
-                # linie continuă, cu un marker la fiecare al n-lea punct
-                plt.plot(x, y,
-                         linewidth=2,
-                         label=f"UE{ue}",
-                         markevery=mark_step,
-                         marker='o', markersize=5)
-
-                # etichetăm punctele cheie: început, mijloc, sfârșit
-                mid_idx = len(x) // 2
-                for idx in [0, mid_idx, -1]:
-                    plt.text(x[idx], y[idx],
-                             f"{y[idx]:.1f}",
-                             fontsize=8,
-                             va='bottom', ha='right')
-
-            plt.xlabel("Slot index")
-            plt.ylabel("Distanță [m]")
-            plt.title("Evoluție distanță per UE")
-            plt.grid(True, linestyle='--', alpha=0.4)
-            plt.legend(bbox_to_anchor=(1.02, 1), loc='upper left', fontsize="small")
-            plt.tight_layout()
-            plt.savefig(os.path.join(images_dir, "distance_evolution.png"))
-            plt.close()
-
-            # Tabele latență și detalii
-            lat_df = pd.DataFrame({
-                "# Pachet": list(range(1, total+1)),
-                "Latență [ms]": [round(x,3) for x in res.latencies]
-            })
-            lat_table = lat_df.to_html(classes="table table-sm", index=False)
-
-            det_df = pd.DataFrame(res.delivered_logs).rename(columns={
-                "ue":"UE","slot":"Slot","latency_ms":"Latență (ms)",
-                "distance_m":"Distanță (m)","pathloss_db":"Pierdere cale (dB)",
-                "sinr_db":"SINR (dB)","cqi":"CQI","mcs_idx":"MCS",
-                "Qm":"Qm","code_rate":"Rată Cod","n_prbs":"PRB",
-                "tbs_teoretic":"TBS teoretic","tbs_bits":"TBS (biți)",
-                "first_tx":"1a TX?"
-            })
-            det_table = det_df.to_html(classes="table table-sm", index=False)
-
-            # Returnăm pagina cu rezultate
-            return render_template(
-                "results.html",
-                summary                = summary,
-                stats_table            = stats_html,
-                hist_image             = "images/histogram.png",
-                scatter_image          = "images/scatter.png",
-                cdf_image              = "images/cdf.png",
-                latdist_image          = "images/lat_vs_dist.png",
-                cqi_image              = "images/cqi_dist.png",
-                heatmap_image          = "images/prb_heatmap.png",
-                distance_evol_image    = "images/distance_evolution.png",
-                lat_table              = lat_table,
-                det_table              = det_table
-            )
-
-
+            t0 = time.perf_counter()
+            res: SimulationResult = run_scenario(dict(sim_params))
+            run_id = _record(res, sim_params, time.perf_counter() - t0)
+            return _render_classic(res, run_id)
 
     # GET: afișăm pagina principală
     return render_template("index.html", error=error)
 
 
+# ────────────────────────────────────────────────────────────
+#    RULĂRI ÎN FUNDAL CU PROGRES PRIN SERVER-SENT EVENTS
+# ────────────────────────────────────────────────────────────
+
+class _Job:
+    # O simulare pornită din /start: ultimul instantaneu de progres și rezultatul
+    def __init__(self):
+        self.cond     = threading.Condition()
+        self.snapshot = None
+        self.version  = 0
+        self.result   = None
+        self.run_id   = None
+        self.error    = None
+        self.done     = False
+        self.finished_at = None   # time.monotonic() la terminare (pentru expirare)
+
+    def publish(self, snapshot: dict):
+        # apelat din firul simulării, deja limitat în frecvență de ProgressReporter
+        with self.cond:
+            self.snapshot = snapshot
+            self.version += 1
+            self.cond.notify_all()
+
+    def finish(self, result=None, error=None, run_id=None):
+        with self.cond:
+            self.result, self.error, self.run_id, self.done = result, error, run_id, True
+            self.finished_at = time.monotonic()
+            self.cond.notify_all()
+
+
+# Joburile terminate rămân până la /result, dar nu la nesfârșit: un client care
+# nu mai cere rezultatul ar ține SimulationResult-ul în memorie pentru totdeauna
+JOB_TTL_S         = 600.0   # cât păstrăm un rezultat neridicat
+MAX_FINISHED_JOBS = 32      # peste atât, cele mai vechi rezultate pleacă primele
+
+jobs      = {}
+jobs_lock = threading.Lock()
+
+
+def _prune_jobs():
+    # Elimină joburile terminate expirate; cele în curs nu sunt atinse
+    now = time.monotonic()
+    with jobs_lock:
+        finished = sorted((job.finished_at, job_id) for job_id, job in jobs.items() if job.done)
+        for k, (t, job_id) in enumerate(finished):
+            if now - t > JOB_TTL_S or len(finished) - k > MAX_FINISHED_JOBS:
+                del jobs[job_id]
+
+
+def _run_job(job: _Job, params: dict):
+    try:
+        t0 = time.perf_counter()
+        res = run_scenario(dict(params), progress=job.publish)
+        job.finish(result=res, run_id=_record(res, params, time.perf_counter() - t0))
+    except Exception as exc:
+        job.finish(error=str(exc))
+
+
+@app.route("/start", methods=["POST"])
+def start():
+    # Pornește simularea în fundal; clientul urmărește /progress și apoi /result.
+    # Doar API (ex. scripturi, EventSource propriu): formularul din index.html
+    # folosește în continuare POST / sincron
+    _prune_jobs()
+    base_params, mode = _params_from_form(request.form)
+    if mode == "slice":
+        return jsonify({"error": "modul slice nu este disponibil în interfața web"}), 400
+    job_id = uuid.uuid4().hex
+    job = _Job()
+    with jobs_lock:
+        jobs[job_id] = job
+    threading.Thread(target=_run_job, args=(job, {**base_params, "scheduler_mode": mode}),
+                     daemon=True).start()
+    return jsonify({
+        "job_id":       job_id,
+        "progress_url": url_for("progress", job_id=job_id),
+        "result_url":   url_for("result", job_id=job_id),
+    })
+
+
+@app.route("/progress/<job_id>")
+def progress(job_id):
+    # Flux SSE: câte un eveniment 'message' per instantaneu nou, apoi 'done'
+    job = jobs.get(job_id)
+    if job is None:
+        abort(404)
+
+    def stream():
+        seen = 0
+        while True:
+            with job.cond:
+                job.cond.wait_for(lambda: job.version != seen or job.done, timeout=15.0)
+                snapshot, version, done, error = job.snapshot, job.version, job.done, job.error
+            if version != seen:
+                seen = version
+                yield f"data: {json.dumps(snapshot)}\n\n"
+            elif not done:
+                yield ": keep-alive\n\n"
+            if done:
+                yield f"event: done\ndata: {json.dumps({'error': error})}\n\n"
+                return
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/result/<job_id>")
+def result(job_id):
+    _prune_jobs()
+    job = jobs.get(job_id)
+    if job is None:
+        abort(404)
+    if not job.done:
+        return jsonify({"error": "simularea rulează încă"}), 409
+    with jobs_lock:
+        jobs.pop(job_id, None)
+    if job.error:
+        return render_template("index.html", error=job.error)
+    return _render_classic(job.result, job.run_id)
+
+
+# ────────────────────────────────────────────────────────────
+#    CATALOGUL RULĂRILOR: LISTARE, FILTRARE, COMPARARE
+# ────────────────────────────────────────────────────────────
+# Doar metadatele din SQLite; datele complete ale unei rulări nu sunt citite.
+
+@app.route("/runs")
+def runs():
+    # ex. /runs?slice=URLLC&scs_mu=2&p99_ms__lt=1&order_by=p99_ms&limit=50
+    args = request.args.to_dict()
+    slice_name = args.pop("slice", None)
+    order_by   = args.pop("order_by", "-created_at")
+    limit      = int(args.pop("limit", 100))
+    cat = _catalog()
+    try:
+        rows = cat.query(slice=slice_name, order_by=order_by, limit=limit, **args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    finally:
+        cat.close()
+    return jsonify(rows)
+
+
+@app.route("/runs/<int:run_id>")
+def run_detail(run_id):
+    cat = _catalog()
+    try:
+        return jsonify(cat.get(run_id))
+    except KeyError:
+        abort(404)
+    finally:
+        cat.close()
+
+
+@app.route("/runs/compare")
+def runs_compare():
+    # ex. /runs/compare?ids=3,7,9: metricile alăturate și parametrii care diferă
+    ids = [int(i) for i in request.args.get("ids", "").split(",") if i.strip()]
+    cat = _catalog()
+    try:
+        return jsonify(cat.compare(ids))
+    except KeyError:
+        abort(404)
+    finally:
+        cat.close()
+
+
 if __name__ == "__main__":
     app.run(debug=True)
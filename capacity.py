@@ -0,0 +1,238 @@
+# simulator/capacity.py
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from statistics import NormalDist
+
+from simulator.simulator import Simulation
+
+# ────────────────────────────────────────────────────────────
+#    TESTUL SECVENȚIAL AL UNUI SLA DE PERCENTILĂ
+# ────────────────────────────────────────────────────────────
+# „P99 ≤ X ms” e echivalent cu „cel mult 1% din pachete au latența > X”.
+# O sondă numără depășirile: pachetele livrate cu latență > X plus pachetele
+# încă în buffer mai vechi de X (la suprasarcină nu mai sunt livrate la timp,
+# dar știm deja că vor depăși) și pachetele abandonate de HARQ. Intervalul
+# Wilson al ratei de depășire decide: sub țintă → SLA îndeplinit, peste →
+# încălcat, altfel sonda continuă.
+
+
+def wilson_interval(k: int, n: int, confidence: float) -> tuple:
+    # Intervalul Wilson pentru o proporție binomială k / n
+    if n <= 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    p = k / n
+    den = 1.0 + z * z / n
+    mid = (p + z * z / (2 * n)) / den
+    hw = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / den
+    return max(0.0, mid - hw), min(1.0, mid + hw)
+
+
+class _Exceedances:
+    # Depășirile de la finalul warm-up-ului până acum; latențele livrate sunt
+    # parcurse incremental, buffer-ele (FIFO) doar până la primul pachet recent
+
+    def __init__(self, sim, sla_ms: float):
+        self.sim, self.sla_ms = sim, sla_ms
+        self.seen = self.k = 0
+        self.base = (0, 0, 0)          # (livrate, depășiri, abandonate) la warm-up
+
+    def _scan(self):
+        lat = self.sim.latencies
+        self.k += sum(1 for x in lat[self.seen:] if x > self.sla_ms)
+        self.seen = len(lat)
+
+    def mark_warmup(self):
+        self._scan()
+        self.base = (self.seen, self.k, self.sim.hm.n_dropped)
+
+    def count(self) -> tuple:
+        # (depășiri, eșantioane)
+        self._scan()
+        sim = self.sim
+        deadline = sim.slot * sim.fp.slot_duration_us / 1000.0 - self.sla_ms
+        pending = 0
+        for buf in sim.tm.buffers.values():
+            for ev in buf:
+                if ev["time_ms"] > deadline:
+                    break
+                pending += 1
+        dropped = sim.hm.n_dropped - self.base[2]
+        return (self.k - self.base[1] + pending + dropped,
+                self.seen - self.base[0] + pending + dropped)
+
+
+@dataclass
+class Probe:
+    value:       float          # valoarea parametrului căutat (ex. n_ues)
+    verdict:     str            # 'met' / 'violated' / 'undecided'
+    exceed:      int            # depășiri numărate
+    samples:     int            # pachete luate în calcul
+    rate_low:    float          # intervalul ratei de depășire
+    rate_high:   float
+    slots:       int            # sloturi simulate (din sim_time_ms al scenariului)
+    wall_s:      float
+
+    @property
+    def rate(self) -> float:
+        return self.exceed / self.samples if self.samples else math.nan
+
+
+def probe(params: dict, sla_ms: float, percentile: float = 99.0, confidence: float = 0.99,
+          warmup_slots: int = 200, check_every_slots: int = 200, min_samples: int = 200) -> Probe:
+    """
+    Rulează un scenariu (clasic, fără slicing) slot cu slot și se oprește de îndată ce SLA-ul
+    „percentila `percentile` a latenței ≤ sla_ms” e clar îndeplinit sau clar
+    încălcat (intervalul Wilson al ratei de depășire, la nivelul `confidence`,
+    e de aceeași parte a țintei), verificat la fiecare check_every_slots
+    sloturi după warm-up. Verificările repetate umflă eroarea de tip I, de
+    aceea nivelul implicit e 0.99. Dacă scenariul se termină fără decizie,
+    verdictul e 'undecided'.
+    """
+    t0     = time.perf_counter()
+    target = 1.0 - percentile / 100.0
+    # sondele nu scriu jurnale și nu țin telemetrie: contează doar latențele
+    sim    = Simulation({**params, "event_log_path": None, "telemetry_bin_slots": 0,
+                         "memory_every_slots": 0, "trace_sample_every": 0, "trace_ues": None})
+    exc    = _Exceedances(sim, sla_ms)
+    verdict, k, n, low, high = "undecided", 0, 0, 0.0, 1.0
+
+    while sim.step():
+        if sim.slot == warmup_slots:
+            exc.mark_warmup()
+        if sim.slot < warmup_slots or (sim.slot - warmup_slots) % check_every_slots:
+            continue
+        k, n = exc.count()
+        if n < min_samples:
+            continue
+        low, high = wilson_interval(k, n, confidence)
+        if high < target:
+            verdict = "met"
+            break
+        if low > target:
+            verdict = "violated"
+            break
+    else:
+        k, n = exc.count()
+        low, high = wilson_interval(k, n, confidence)
+        if n and high < target:
+            verdict = "met"
+        elif n and low > target:
+            verdict = "violated"
+
+    return Probe(None, verdict, k, n, low, high, sim.slot, time.perf_counter() - t0)
+
+
+def _probe(params, param, value, sla_ms, percentile, confidence, warmup_slots, check_every_slots,
+           min_samples):
+    p = probe({**params, param: value}, sla_ms, percentile, confidence, warmup_slots,
+              check_every_slots, min_samples)
+    p.value = value
+    return p
+
+
+# ────────────────────────────────────────────────────────────
+#    CĂUTAREA GENUNCHIULUI DE CAPACITATE
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class CapacityResult:
+    param:       str
+    capacity:    float            # cea mai mare valoare cu SLA clar îndeplinit (None dacă niciuna)
+    low:         float            # genunchiul e în (low, high]: low îndeplinit, high încălcat
+    high:        float
+    probes:      list = field(default_factory=list)
+    wall_s:      float = 0.0
+
+    @property
+    def simulated_slots(self) -> int:
+        return sum(p.slots for p in self.probes)
+
+    def format(self) -> str:
+        lines = [f"{self.param}: capacitate {self.capacity} (genunchi în ({self.low}, {self.high}]), "
+                 f"{len(self.probes)} sonde, {self.simulated_slots} sloturi, {self.wall_s:.1f} s"]
+        for p in sorted(self.probes, key=lambda p: p.value):
+            lines.append(f"  {p.value:>10g}  {p.verdict:<10} depășiri {p.exceed}/{p.samples} "
+                         f"[{p.rate_low:.4f}, {p.rate_high:.4f}]  {p.slots} sloturi")
+        return "\n".join(lines)
+
+
+def search_capacity(params: dict, sla_ms: float, percentile: float = 99.0, param: str = "n_ues",
+                    start: float = 1, max_value: float = 4096, tolerance: float = 1,
+                    confidence: float = 0.99, warmup_slots: int = 200, check_every_slots: int = 200,
+                    min_samples: int = 200, n_workers: int = None) -> CapacityResult:
+    """
+    Cea mai mare valoare a lui `param` (n_ues, sau un parametru de sarcină
+    oferită care crește cu valoarea, ex. lambda_per_ms, packet_size_bits)
+    pentru care percentila latenței rămâne ≤ sla_ms.
+      1) încadrare: sonde paralele la start, 2·start, 4·start, … până la
+         prima încălcare (sau max_value)
+      2) rafinare: n_workers sonde paralele egal distanțate în interiorul
+         intervalului (low, high], până când high - low ≤ tolerance
+    Sondele nedecise (aproape de genunchi) nu mută capetele; dacă o rundă
+    întreagă e nedecisă, căutarea se oprește, iar (low, high] rămâne
+    intervalul de încredere al genunchiului. Valorile întregi (ex. n_ues)
+    rămân întregi. Durata maximă a unei sonde e sim_time_ms din params.
+    """
+    t0      = time.perf_counter()
+    integer = isinstance(start, int) and isinstance(tolerance, int)
+    workers = n_workers or os.cpu_count() or 1
+    result  = CapacityResult(param, None, None, None)
+    seen    = {}
+
+    def run(pool, values):
+        values = [v for v in dict.fromkeys(values) if v not in seen]
+        futures = [pool.submit(_probe, params, param, v, sla_ms, percentile, confidence,
+                               warmup_slots, check_every_slots, min_samples) for v in values]
+        for fut in futures:
+            p = fut.result()
+            seen[p.value] = p
+            result.probes.append(p)
+        met      = [v for v, p in seen.items() if p.verdict == "met"]
+        violated = [v for v, p in seen.items() if p.verdict == "violated"]
+        hi = min(violated) if violated else None
+        lo = max((v for v in met if hi is None or v < hi), default=None)
+        return lo, hi, [seen[v].verdict for v in values]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 1) încadrare geometrică, câte `workers` puncte pe rundă
+        low = high = None
+        value = start
+        while high is None and value <= max_value:
+            batch = []
+            while len(batch) < workers and value <= max_value:
+                batch.append(value)
+                value = value * 2
+            low, high, _ = run(pool, batch)
+
+        # 2) rafinare k-secțiune în (low, high]
+        while low is not None and high is not None and high - low > tolerance:
+            step  = (high - low) / (workers + 1)
+            batch = [low + step * (i + 1) for i in range(workers)]
+            if integer:
+                batch = sorted({int(round(v)) for v in batch})
+            batch = [v for v in batch if low < v < high and v not in seen]
+            if not batch:
+                break
+            low, high, verdicts = run(pool, batch)
+            if all(v == "undecided" for v in verdicts):
+                break
+
+    result.capacity, result.low, result.high = low, low, high
+    result.wall_s = time.perf_counter() - t0
+    return result
+
+
+if __name__ == "__main__":
+    # python -m simulator.capacity '{"scs_mu": 1, "bandwidth_mhz": 20}' 5 [n_ues]
+    import json
+    import sys
+
+    params = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    sla = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    name = sys.argv[3] if len(sys.argv) > 3 else "n_ues"
+    print(search_capacity(params, sla, param=name).format())
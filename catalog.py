@@ -0,0 +1,342 @@
+# simulator/catalog.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import time
+
+import numpy as np
+
+from simulator.config import default_params
+from simulator.sweep import SweepStore, _decode, _encode, summarize
+
+# ────────────────────────────────────────────────────────────
+#    SCHEMA: METADATE INDEXATE + POINTER LA FIȘIERELE COLOANARE
+# ────────────────────────────────────────────────────────────
+# Baza ține doar ce trebuie căutat și afișat (parametrii principali, sămânța,
+# versiunea codului, metricile sumare); latențele și înregistrările de livrare
+# stau în <root>/<id>/delivered.npz, câte un tablou per coloană, citit doar la
+# cerere (np.load pe un .npz încarcă leneș fiecare coloană).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id               INTEGER PRIMARY KEY,
+    created_at       REAL    NOT NULL,
+    label            TEXT,
+    code_version     TEXT,
+    params_hash      TEXT    NOT NULL,
+    params           TEXT    NOT NULL,
+    seed             INTEGER,
+    scs_mu           INTEGER,
+    bandwidth_mhz    REAL,
+    n_ues            INTEGER,
+    sim_time_ms      REAL,
+    scheduler_mode   TEXT,
+    traffic_type     TEXT,
+    slot_type        TEXT,
+    delivered        INTEGER,
+    first_tx_ratio   REAL,
+    harq_dropped     INTEGER,
+    simulated_slots  INTEGER,
+    mean_ms          REAL,
+    p50_ms           REAL,
+    p95_ms           REAL,
+    p99_ms           REAL,
+    wall_s           REAL,
+    data_path        TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created  ON runs (created_at);
+CREATE INDEX IF NOT EXISTS runs_scenario ON runs (scheduler_mode, scs_mu, bandwidth_mhz, n_ues);
+CREATE INDEX IF NOT EXISTS runs_traffic  ON runs (traffic_type, scs_mu);
+CREATE INDEX IF NOT EXISTS runs_p99      ON runs (p99_ms);
+CREATE INDEX IF NOT EXISTS runs_hash     ON runs (params_hash);
+CREATE TABLE IF NOT EXISTS run_slices (
+    run_id           INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    slice            TEXT    NOT NULL,
+    delivered        INTEGER,
+    mean_ms          REAL,
+    p95_ms           REAL,
+    p99_ms           REAL,
+    PRIMARY KEY (run_id, slice)
+);
+CREATE INDEX IF NOT EXISTS run_slices_p99 ON run_slices (slice, p99_ms);
+"""
+
+# Parametrii copiați în coloane indexate (restul rămân doar în JSON)
+PARAM_COLUMNS = ("seed", "scs_mu", "bandwidth_mhz", "n_ues", "sim_time_ms",
+                 "scheduler_mode", "traffic_type", "slot_type")
+METRIC_COLUMNS = ("delivered", "first_tx_ratio", "harq_dropped", "simulated_slots",
+                  "mean_ms", "p50_ms", "p95_ms", "p99_ms", "wall_s")
+SLICE_COLUMNS = ("delivered", "mean_ms", "p95_ms", "p99_ms")
+
+# Operatorii acceptați în filtre: câmp__op=valoare (ex. p99_ms__lt=1)
+OPERATORS = {"eq": "=", "ne": "!=", "lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+
+_code_version = None
+
+
+def code_version() -> str:
+    """
+    Versiunea codului simulatorului: commit-ul git (cu sufixul -dirty dacă
+    arborele are modificări) sau, în afara unui depozit git, amprenta
+    surselor .py.
+    """
+    global _code_version
+    if _code_version is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        try:
+            _code_version = subprocess.run(
+                ["git", "describe", "--always", "--dirty"], cwd=here, capture_output=True,
+                text=True, timeout=5, check=True).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            h = hashlib.sha1()
+            for name in sorted(os.listdir(here)):
+                if name.endswith(".py"):
+                    with open(os.path.join(here, name), "rb") as f:
+                        h.update(f.read())
+            _code_version = "src-" + h.hexdigest()[:12]
+    return _code_version
+
+
+def _percentiles(lat: np.ndarray) -> dict:
+    if not len(lat):
+        return {"delivered": 0, "mean_ms": None, "p95_ms": None, "p99_ms": None}
+    p95, p99 = np.percentile(lat, [95, 99])
+    return {"delivered": int(len(lat)), "mean_ms": float(lat.mean()),
+            "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+def _slice_metrics(res, ue_slice_mapping) -> dict:
+    # Metricile per slice, din coloanele UE / latență ale livrărilor
+    if not ue_slice_mapping:
+        return {}
+    ue  = _column(res.delivered_logs, "ue").astype(np.int64)
+    lat = np.asarray(res.latencies, dtype=float)
+    out = {}
+    for sl in sorted(set(ue_slice_mapping.values())):
+        ues = [u for u, s in ue_slice_mapping.items() if s == sl]
+        out[sl] = _percentiles(lat[np.isin(ue, ues)])
+    return out
+
+
+def _column(logs, key) -> np.ndarray:
+    if isinstance(logs, np.ndarray):
+        return np.asarray(logs[key])
+    return np.asarray([r[key] for r in logs])
+
+
+def _write_columns(path: str, res):
+    # Câte un tablou per câmp al livrărilor: citirea unei singure coloane
+    # (ex. latency_ms) nu atinge restul datelor
+    logs = res.delivered_logs
+    if isinstance(logs, np.ndarray):
+        columns = {name: np.ascontiguousarray(logs[name]) for name in logs.dtype.names}
+    else:
+        keys = logs[0].keys() if logs else ("latency_ms",)
+        columns = {k: np.asarray([r[k] for r in logs]) for k in keys}
+    columns["latency_ms"] = np.asarray(res.latencies, dtype=float)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, **columns)
+
+
+# ────────────────────────────────────────────────────────────
+#    CATALOGUL
+# ────────────────────────────────────────────────────────────
+
+class RunCatalog:
+    """
+    Indexul local al rulărilor (SQLite, WAL) și fișierele lor de rezultate:
+      - record() adaugă o rulare: parametri, sămânță, versiunea codului,
+        metrici sumare (și per slice), plus coloanele livrărilor pe disc
+      - query() filtrează după coloanele indexate, fără a citi datele
+      - load() citește la cerere coloanele unei rulări
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.con = sqlite3.connect(os.path.join(root, "catalog.sqlite"), timeout=60.0,
+                                   isolation_level=None, check_same_thread=False)
+        self.con.row_factory = sqlite3.Row
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.execute("PRAGMA foreign_keys=ON")
+        self.con.executescript(SCHEMA)
+
+    def close(self):
+        self.con.close()
+
+    # ──── scriere ────
+
+    def _insert(self, params: dict, summary: dict, slices: dict, label=None, version=None,
+                created_at=None) -> int:
+        cfg  = {**default_params, **params}
+        if params.get("ue_slice_mapping"):
+            cfg["scheduler_mode"] = "slice"       # impus de run_scenario_slice
+        text = _encode(params)
+        row  = {"created_at":   created_at or time.time(),
+                "label":        label,
+                "code_version": version or code_version(),
+                "params_hash":  hashlib.sha1(text.encode()).hexdigest(),
+                "params":       text}
+        for k in PARAM_COLUMNS:
+            v = cfg.get(k)
+            row[k] = v if v is None or isinstance(v, (int, float, str)) else json.dumps(v)
+        row.update({k: summary.get(k) for k in METRIC_COLUMNS})
+        self.con.execute("BEGIN IMMEDIATE")
+        try:
+            cur = self.con.execute(f"INSERT INTO runs ({', '.join(row)}) VALUES "
+                                   f"({', '.join('?' * len(row))})", list(row.values()))
+            run_id = cur.lastrowid
+            self.con.executemany(
+                f"INSERT INTO run_slices (run_id, slice, {', '.join(SLICE_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, sl, *(m[k] for k in SLICE_COLUMNS)) for sl, m in slices.items()])
+            self.con.execute("COMMIT")
+        except BaseException:
+            self.con.execute("ROLLBACK")
+            raise
+        return run_id
+
+    def record(self, res, params: dict, label: str = None, wall_s: float = None,
+               keep_data: bool = True) -> int:
+        """
+        Adaugă o rulare terminată. `res` e un SimulationResult sau un
+        SliceSimulationResult; `params` sunt parametrii dați la rulare (cu
+        ue_slice_mapping pentru o rulare cu slicing).
+        Întoarce id-ul rulării.
+        """
+        base    = getattr(res, "base", res)
+        summary = summarize(base)
+        summary["wall_s"] = wall_s
+        slices  = _slice_metrics(base, params.get("ue_slice_mapping"))
+        run_id  = self._insert(params, summary, slices, label)
+        if keep_data:
+            rel = os.path.join(str(run_id), "delivered.npz")
+            _write_columns(os.path.join(self.root, rel), base)
+            self.con.execute("UPDATE runs SET data_path = ? WHERE id = ?", (rel, run_id))
+        return run_id
+
+    def import_sweep(self, sweep_db: str, sweep: str, label: str = None) -> int:
+        """
+        Indexează punctele terminate ale unui sweep (sweep.SweepStore): doar
+        rezumatele, fără date coloanare. Punctele deja importate (aceiași
+        parametri, aceeași etichetă) sunt sărite. Întoarce câte au fost adăugate.
+        """
+        store = SweepStore(sweep_db)
+        try:
+            rows = store.results(sweep)
+        finally:
+            store.close()
+        label = label or f"sweep:{sweep}"
+        added = 0
+        for r in rows:
+            params = r.pop("params")
+            h = hashlib.sha1(_encode(params).encode()).hexdigest()
+            if self.con.execute("SELECT 1 FROM runs WHERE params_hash = ? AND label = ?",
+                                (h, label)).fetchone():
+                continue
+            self._insert(params, r, {}, label, version="unknown")
+            added += 1
+        return added
+
+    def delete(self, run_id: int):
+        row = self.con.execute("SELECT data_path FROM runs WHERE id = ?", (run_id,)).fetchone()
+        self.con.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+        if row is not None and row["data_path"]:
+            path = os.path.join(self.root, row["data_path"])
+            if os.path.exists(path):
+                os.remove(path)
+
+    # ──── citire ────
+
+    def query(self, slice: str = None, order_by: str = "-created_at", limit: int = 100,
+              **filters) -> list:
+        """
+        Rulările care îndeplinesc filtrele, ex. toate rulările URLLC cu µ=2 și
+        P99 < 1 ms: query(slice='URLLC', scs_mu=2, p99_ms__lt=1).
+        Cu `slice`, metricile (delivered, mean/p95/p99) sunt cele ale slice-ului.
+        Filtrele acceptă coloanele din PARAM_COLUMNS, METRIC_COLUMNS, label și
+        code_version, cu sufixele __lt/__le/__gt/__ge/__ne.
+        """
+        allowed = set(PARAM_COLUMNS) | set(METRIC_COLUMNS) | {"id", "label", "code_version", "created_at"}
+        where, args = [], []
+        sliced = set(SLICE_COLUMNS)
+        for key, value in filters.items():
+            name, _, op = key.partition("__")
+            if name not in allowed or (op and op not in OPERATORS):
+                raise ValueError(f"filtru necunoscut: {key}")
+            table = "s" if slice is not None and name in sliced else "r"
+            where.append(f"{table}.{name} {OPERATORS[op or 'eq']} ?")
+            args.append(value)
+
+        cols = ", ".join(f"r.{c}" for c in ("id", "created_at", "label", "code_version") + PARAM_COLUMNS
+                         + tuple(c for c in METRIC_COLUMNS if slice is None or c not in sliced))
+        if slice is not None:
+            cols += ", s.slice, " + ", ".join(f"s.{c}" for c in SLICE_COLUMNS)
+            sql = f"SELECT {cols} FROM run_slices s JOIN runs r ON r.id = s.run_id"
+            where.insert(0, "s.slice = ?")
+            args.insert(0, slice)
+        else:
+            sql = f"SELECT {cols} FROM runs r"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+
+        desc, name = order_by.startswith("-"), order_by.lstrip("-")
+        if name not in allowed:
+            raise ValueError(f"coloană de sortare necunoscută: {order_by}")
+        table = "s" if slice is not None and name in sliced else "r"
+        sql += f" ORDER BY {table}.{name} {'DESC' if desc else 'ASC'} LIMIT ?"
+        args.append(int(limit))
+        return [dict(r) for r in self.con.execute(sql, args).fetchall()]
+
+    def get(self, run_id: int) -> dict:
+        # Metadatele complete ale unei rulări (cu parametrii și slice-urile), fără date
+        row = self.con.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(run_id)
+        out = dict(row)
+        out["params"] = _decode(out["params"])
+        out["slices"] = {r["slice"]: {k: r[k] for k in SLICE_COLUMNS} for r in self.con.execute(
+            "SELECT * FROM run_slices WHERE run_id = ? ORDER BY slice", (run_id,))}
+        return out
+
+    def compare(self, run_ids) -> dict:
+        """
+        Rulările alăturate: metricile fiecăreia și doar parametrii care diferă
+        între ele (None = valoarea implicită de la momentul rulării).
+        """
+        runs = [self.get(i) for i in run_ids]
+        keys = set().union(*(r["params"] for r in runs)) if runs else set()
+        differ = sorted(k for k in keys if len({_encode({"v": r["params"].get(k)}) for r in runs}) > 1)
+        return {"runs":   [{"id": r["id"], "label": r["label"], "code_version": r["code_version"],
+                            **{k: r[k] for k in METRIC_COLUMNS}, "slices": r["slices"]} for r in runs],
+                "params": {k: [r["params"].get(k) for r in runs] for k in differ}}
+
+    def load(self, run_id: int, columns=None) -> dict:
+        # Coloanele livrărilor unei rulări ({nume: ndarray}); doar cele cerute sunt citite
+        row = self.con.execute("SELECT data_path FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None or not row["data_path"]:
+            raise KeyError(f"rularea {run_id} nu are date salvate")
+        with np.load(os.path.join(self.root, row["data_path"])) as data:
+            return {k: data[k] for k in (columns or data.files)}
+
+
+# ────────────────────────────────────────────────────────────
+#    UTILIZARE DIN LINIA DE COMANDĂ
+# ────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    # python -m simulator.catalog runs/ slice=URLLC scs_mu=2 p99_ms__lt=1
+    # python -m simulator.catalog runs/ --import sweep.sqlite <nume_sweep>
+    import sys
+
+    cat = RunCatalog(sys.argv[1])
+    if len(sys.argv) > 2 and sys.argv[2] == "--import":
+        print(f"{cat.import_sweep(sys.argv[3], sys.argv[4])} rulări importate")
+    else:
+        filters = dict(arg.split("=", 1) for arg in sys.argv[2:])
+        for row in cat.query(slice=filters.pop("slice", None), **filters):
+            print(json.dumps(row))
+    cat.close()
@@ -1,28 +1,47 @@
 import math
 import random
+import numpy as np
 from simulator.config import default_params
 
 # Deviază canalul radio: pierdere de cale, shadowing și fading
 SIGMA_SHADOW_DB = 8.0  # deviație standard pentru slow-fading (shadowing) în dB
 
-def compute_pathloss(d_m, fc_ghz=3.5, model='log_distance'):
+# Constantele modelului log-distance (referință la 10 m, exponent 3.5, 3.5 GHz)
+PL_D0_KM     = 0.01
+PL_EXPONENT  = 3.5
+CARRIER_GHZ  = 3.5
+
+
+def reference_pathloss_db(fc_ghz=CARRIER_GHZ):
+    # Pierderea în spațiu liber la distanța de referință d0
+    return 20*math.log10(PL_D0_KM) + 20*math.log10(fc_ghz) + 32.44
+
+
+def compute_pathloss(d_m, fc_ghz=CARRIER_GHZ, model='log_distance', pl0_db=None):
     """
     Calculează pathloss în dB pe baza modelului log-distance:
     - d0_km: referință la 10 m
     - n: exponent de atenuare (3.5)
     - fc_ghz: frecvența portante în GHz
+    - pl0_db: pierderea la d0, dacă e deja calculată (SimConfig.pathloss_pl0_db)
     Folosim formula: PL0 + 10⋅n⋅log10(d/d0)
     """
-    d0_km = 0.01            # distanța de referință în km (10 m)
-    n = 3.5                 # exponentul de atenuare al canalului
+    d0_km = PL_D0_KM        # distanța de referință în km (10 m)
+    n = PL_EXPONENT         # exponentul de atenuare al canalului
     # transformăm distanța în km și evităm valori < d0
     d_km = max(d_m / 1000.0, d0_km)
     # calculăm PL la distanța de referință
-    pl0 = 20*math.log10(d0_km) + 20*math.log10(fc_ghz) + 32.44
+    pl0 = reference_pathloss_db(fc_ghz) if pl0_db is None else pl0_db
     # adăugăm termenul dependent de d
     return pl0 + 10*n*math.log10(d_km / d0_km)
 
 
+def pathloss_db_array(d_m, fc_ghz=CARRIER_GHZ) -> np.ndarray:
+    # Varianta vectorizată a compute_pathloss (log-distance)
+    d_km = np.maximum(np.asarray(d_m, dtype=float) / 1000.0, PL_D0_KM)
+    return reference_pathloss_db(fc_ghz) + 10 * PL_EXPONENT * np.log10(d_km / PL_D0_KM)
+
+
 def compute_shadowing():
     """
     Simulează fading lent (shadowing) ca un random gaussian în dB,
@@ -40,40 +59,57 @@ def compute_rayleigh_fading_db():
     return 10 * math.log10(fading_linear + 1e-12)
 
 
-def compute_sinr(d_m, n_prbs, bw_mhz, scs_khz, model='log_distance'):
+def prb_tx_power_dbm(tx_power_dbm, n_prbs):
+    # Puterea Tx împărțită egal pe n_prbs PRB-uri (dBm); -inf fără resurse
+    return tx_power_dbm - 10 * math.log10(n_prbs) if n_prbs > 0 else -math.inf
+
+
+def noise_floor_dbm(noise_density_dbm_hz, noise_figure_db, n_prbs, scs_khz):
+    # Zgomotul termic pe n_prbs PRB-uri (dBm): densitate + 10log BW + noise figure
+    bw_hz = n_prbs * 12 * (scs_khz * 1e3)
+    if bw_hz > 0:
+        return noise_density_dbm_hz + 10 * math.log10(bw_hz) + noise_figure_db
+    return -math.inf
+
+
+def compute_sinr(d_m, n_prbs, bw_mhz, scs_khz, model='log_distance', interference_mw=0.0,
+                 fast_fading=True, cfg=None, shadow_db=None, rayleigh_db=None):
     """
     Calculează SINR-ul linie de bază:
-    1) Pathloss + shadow + fast-fading în dB
+    1) Pathloss + shadow + fast-fading în dB (fast_fading=False: fără
+       Rayleigh, când fading-ul vine din modelul selectiv în frecvență)
     2) Putere Tx pe PRB (p_tx_dbm - 10*log10(n_prbs))
     3) Prag de zgomot: density + 10*log10(BW) + noise figure
-    4) SINR_dB = P_tx_PRB - PL_total - noise_floor
+       (+ interferența din celulele vecine, în mW, dacă e furnizată)
+    4) SINR_dB = P_tx_PRB - PL_total - (noise_floor + I)
     5) Returnăm SINR liniar (10^(dB/10)).
+    cfg: SimConfig-ul rulării; puterea per PRB, zgomotul și pierderea de
+    referință se citesc din tabelele lui. Fără cfg se folosesc default_params.
+    shadow_db, rayleigh_db: realizări date (ChannelRealizations) în locul
+    extragerilor din `random`.
     """
-    cfg = default_params
-
     # 1) Calculăm pierderile și fading-urile
-    pl_db = compute_pathloss(d_m, model=model) \
-            + compute_shadowing() \
-            + compute_rayleigh_fading_db()
-
-    # 2) Puterea transmisă per PRB (dBm)
-    p_tx_dbm = cfg['tx_power_dbm']
-    if n_prbs > 0:
-        p_prb_dbm = p_tx_dbm - 10 * math.log10(n_prbs)
-    else:
-        p_prb_dbm = -math.inf  # fără resurse
+    pl0_db = cfg.pathloss_pl0_db if cfg is not None else None
+    pl_db  = compute_pathloss(d_m, model=model, pl0_db=pl0_db) + \
+        (compute_shadowing() if shadow_db is None else shadow_db)
+    if fast_fading:
+        pl_db += compute_rayleigh_fading_db() if rayleigh_db is None else rayleigh_db
 
-    # 3) Calculăm noise floor (dBm): densitate + 10log BW + noise figure
-    noise_density_dbm_hz = cfg['noise_density_dbm_hz']
-    noise_figure_db     = cfg['noise_figure_db']
-    bw_hz = n_prbs * 12 * (scs_khz * 1e3)
-    if bw_hz > 0:
-        noise_floor_dbm = noise_density_dbm_hz + 10 * math.log10(bw_hz) + noise_figure_db
+    # 2-3) Puterea transmisă per PRB și noise floor (dBm)
+    if cfg is not None:
+        p_prb_dbm   = cfg.prb_tx_dbm[n_prbs]
+        noise_floor = cfg.noise_floor_dbm[n_prbs]
     else:
-        noise_floor_dbm = -math.inf
+        p_prb_dbm   = prb_tx_power_dbm(default_params['tx_power_dbm'], n_prbs)
+        noise_floor = noise_floor_dbm(default_params['noise_density_dbm_hz'],
+                                      default_params['noise_figure_db'], n_prbs, scs_khz)
+
+    # 3b) Interferența inter-celulă se adună liniar peste zgomot
+    if interference_mw > 0.0 and noise_floor > -math.inf:
+        noise_floor = 10 * math.log10(10 ** (noise_floor / 10.0) + interference_mw)
 
     # 4) SINR în dB și conversie la scala liniară
-    sinr_db = p_prb_dbm - pl_db - noise_floor_dbm
+    sinr_db = p_prb_dbm - pl_db - noise_floor
     return 10 ** (sinr_db / 10.0)
 
 
@@ -93,3 +129,166 @@ def sinr_to_cqi(sinr_db):
     if cqi > 15:
         return 15
     return cqi
+
+
+def sinr_to_cqi_array(sinr_db) -> np.ndarray:
+    # Varianta vectorizată a sinr_to_cqi (NaN / -inf → CQI 0)
+    cqi = np.floor(np.asarray(sinr_db, dtype=float) / 5.0)
+    return np.minimum(np.where(cqi >= 0, cqi, 0), 15).astype(np.int8)
+
+
+# ────────────────────────────────────────────────────────────
+#    REALIZĂRI COMUNE ALE CANALULUI (COMMON RANDOM NUMBERS)
+# ────────────────────────────────────────────────────────────
+# Fără ele, fiecare apel compute_sinr / test BLER consumă următoarea valoare
+# din `random`, deci ordinea extragerilor (și canalul văzut de un UE) depinde
+# de deciziile scheduler-ului. Aici fiecare (UE, slot) are o realizare fixă,
+# aceeași pentru orice scheduler care rulează cu aceeași sămânță.
+
+class SlotDraws:
+    """
+    Realizările unui slot, ca liste indexate după UE:
+      - shadow_db, rayleigh_db: termenii aleatori din compute_sinr
+      - shadow_z, fading:       N(0,1) pentru shadowing-ul suplimentar și
+                                |N(0,1)| pentru fading-ul din transmit_packet
+      - u_tx, u_harq:           uniformele testelor BLER (transmisie, feedback HARQ)
+    """
+    __slots__ = ('shadow_db', 'rayleigh_db', 'shadow_z', 'fading', 'u_tx', 'u_harq')
+
+    def __init__(self, shadow_db, rayleigh_db, shadow_z, fading, u_tx, u_harq):
+        self.shadow_db, self.rayleigh_db = shadow_db, rayleigh_db
+        self.shadow_z, self.fading       = shadow_z, fading
+        self.u_tx, self.u_harq           = u_tx, u_harq
+
+
+class ChannelRealizations:
+    """
+    Sursa realizărilor comune: blocul k de `block_slots` sloturi e generat
+    din np.random.default_rng([seed, k]), deci orice slot se obține la fel
+    indiferent de ordinea sau numărul cererilor. at(slot) păstrează blocul
+    și slotul curent (toate cererile dintr-un slot costă o conversie).
+    """
+
+    def __init__(self, n_ues: int, seed: int, block_slots: int = 64):
+        self.n_ues       = n_ues
+        self.seed        = int(seed)
+        self.block_slots = block_slots
+        self._block      = (None, None)     # (k, tablouri (block_slots, n_ues))
+        self._slot       = (None, None)     # (slot, SlotDraws)
+
+    def _generate(self, k: int) -> tuple:
+        rng   = np.random.default_rng([self.seed, k])
+        shape = (self.block_slots, self.n_ues)
+        return (rng.normal(0.0, SIGMA_SHADOW_DB, shape),
+                10 * np.log10(rng.exponential(1.0, shape) + 1e-12),
+                rng.standard_normal(shape),
+                np.abs(rng.standard_normal(shape)),
+                rng.random(shape),
+                rng.random(shape))
+
+    def at(self, slot: int) -> SlotDraws:
+        if self._slot[0] == slot:
+            return self._slot[1]
+        k, i = divmod(slot, self.block_slots)
+        if self._block[0] != k:
+            self._block = (k, self._generate(k))
+        draws = SlotDraws(*(a[i].tolist() for a in self._block[1]))
+        self._slot = (slot, draws)
+        return draws
+
+
+# ────────────────────────────────────────────────────────────
+#    CANAL SELECTIV ÎN FRECVENȚĂ (PER UE × PRB)
+# ────────────────────────────────────────────────────────────
+
+def subband_size(n_prbs: int) -> int:
+    """
+    Dimensiunea subbandei CQI (PRB-uri) după lățimea BWP, TS 38.214
+    Tabelul 5.2.1.4-2 (prima variantă): <24 PRB → doar raport wideband.
+    """
+    if n_prbs < 24:
+        return n_prbs
+    if n_prbs <= 72:
+        return 4
+    if n_prbs <= 144:
+        return 8
+    return 16
+
+
+def _bessel_j0(x: float) -> float:
+    # J0 prin seria de puteri (x mic: corelația Jakes pe durata unui slot)
+    term, total, m = 1.0, 1.0, 0
+    while abs(term) > 1e-12 and m < 60:
+        m += 1
+        term *= -(x / 2.0) ** 2 / (m * m)
+        total += term
+    return total
+
+
+class FrequencySelectiveChannel:
+    """
+    Fading Rayleigh selectiv în frecvență, per UE × PRB: un model cu
+    `channel_taps` căi (profil exponențial de întârziere, dispersie
+    `delay_spread_ns`), deci câștigul PRB-ului k e |Σ_l h_l·e^{-j2π f_k τ_l}|².
+    Căile evoluează AR(1) cu corelația Jakes J0(2π f_D T) per slot; un UE e
+    actualizat doar când e cerut, cu ρ^Δ pentru cele Δ sloturi trecute
+    (exact pentru AR(1)). Matricea câștigurilor pentru un grup de UE-uri e
+    un singur produs matriceal (UE × căi) · (căi × PRB).
+    """
+
+    def __init__(self, n_ues: int, n_prbs: int, scs_khz: float, slot_s: float, cfg: dict,
+                 rng: np.random.Generator):
+        self.n_prbs  = n_prbs
+        self.rng     = rng
+        n_taps       = max(1, int(cfg.get("channel_taps", 6)))
+        spread_s     = cfg.get("delay_spread_ns", 300.0) * 1e-9
+        # profilul de putere: întârzieri egal distanțate pe 3 dispersii, putere exponențială
+        tau          = np.linspace(0.0, 3.0 * spread_s, n_taps)
+        pdp          = np.exp(-tau / spread_s) if spread_s > 0 else np.r_[1.0, np.zeros(n_taps - 1)]
+        self.scale   = np.sqrt(pdp / pdp.sum())
+        f_k          = (np.arange(n_prbs) + 0.5) * 12 * scs_khz * 1e3
+        self.phase   = np.exp(-2j * np.pi * np.outer(tau, f_k))          # căi × PRB
+        self.rho     = _bessel_j0(2.0 * math.pi * cfg.get("doppler_hz", 10.0) * slot_s)
+        self.taps    = self._draw(n_ues)
+        self.updated = np.zeros(n_ues, dtype=np.int64)                   # slotul ultimei actualizări
+        self.sb_size = cfg.get("subband_prbs") or subband_size(n_prbs)
+        self.sb_starts = np.arange(0, n_prbs, self.sb_size)
+
+    def _draw(self, n: int) -> np.ndarray:
+        g = self.rng.standard_normal((n, len(self.scale), 2)) * math.sqrt(0.5)
+        return (g[..., 0] + 1j * g[..., 1]) * self.scale
+
+    def gains_db(self, ues, slot: int) -> np.ndarray:
+        # Câștigul de fading (dB) pe fiecare PRB, (len(ues), n_prbs), la slotul `slot`
+        ues = np.asarray(ues, dtype=np.int64)
+        dt  = slot - self.updated[ues]
+        if dt.any():
+            r = np.power(self.rho, dt)[:, None]
+            self.taps[ues] = r * self.taps[ues] + np.sqrt(np.maximum(1.0 - r * r, 0.0)) * self._draw(len(ues))
+            self.updated[ues] = slot
+        h = self.taps[ues] @ self.phase
+        return 10.0 * np.log10(np.maximum(h.real ** 2 + h.imag ** 2, 1e-12))
+
+    def wideband_sinr_db(self, distances_m, tx_power_dbm: float, noise_prb_dbm: float) -> np.ndarray:
+        # SINR-ul mediu pe PRB fără fading (puterea împărțită pe toată banda),
+        # baza rapoartelor CQI pe subbandă
+        return tx_power_dbm - 10 * math.log10(self.n_prbs) - pathloss_db_array(distances_m) - noise_prb_dbm
+
+    def subband_cqi(self, sinr_db: np.ndarray, method: str = "miesm") -> np.ndarray:
+        """
+        CQI-ul raportat pe fiecare subbandă, (UE, subbande), din matricea
+        SINR per PRB: SINR efectiv pe subbandă (MIESM, fără dependență de
+        MCS), mapat la CQI. Ultima subbandă poate fi mai scurtă.
+        """
+        from simulator.link_adaptation import effective_sinr_db
+        n = len(self.sb_starts)
+        pad = n * self.sb_size - self.n_prbs
+        x = np.pad(sinr_db, ((0, 0), (0, pad)), mode="edge") if pad else sinr_db
+        eff = effective_sinr_db(x.reshape(len(x), n, self.sb_size), method)
+        return sinr_to_cqi_array(eff)
+
+    def prb_order(self, sinr_db: np.ndarray) -> np.ndarray:
+        # Ordinea de preferință a PRB-urilor per UE: subbanda cu CQI mai mare
+        # întâi, iar în subbandă PRB-urile în ordine (scheduler-ul vede doar CQI-ul raportat)
+        cqi = np.repeat(self.subband_cqi(sinr_db), self.sb_size, axis=1)[:, :self.n_prbs]
+        return np.argsort(-cqi, axis=1, kind="stable")
@@ -0,0 +1,121 @@
+# simulator/checkpoint.py
+
+import os
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from simulator.simulator import Simulation, SimulationResult
+
+# ────────────────────────────────────────────────────────────
+#    SALVAREA ȘI RELUAREA STĂRII SIMULĂRII
+# ────────────────────────────────────────────────────────────
+
+CHECKPOINT_VERSION = 2
+
+# Parametrii care pot fi schimbați într-o variantă pornită dintr-un snapshot.
+# Restul (număr UE, numerologie, bandă, trafic generat) sunt fixați la inițializare.
+FORKABLE_PARAMS = {
+    "scheduler_mode",
+    "coding_time_us",
+    "decoding_time_us",
+    "feedback_delay_us",
+    "retransmission_duration_us",
+    "shadow_sigma_db",
+    "fast_fading",
+    "checkpoint_path",
+    "checkpoint_every_slots",
+    "event_log_path",
+}
+
+
+def save_checkpoint(sim: Simulation, path: str):
+    """
+    Scrie pe disc starea completă a simulării: buffer-e de trafic, procese HARQ,
+    poziții/direcții, rezultate acumulate și starea generatoarelor aleatoare
+    (`random` global; RNG-ul NumPy al mobilității face parte din obiect).
+    Scrierea e atomică (fișier temporar + os.replace).
+    """
+    payload = {
+        "version":      CHECKPOINT_VERSION,
+        "slot":         sim.slot,
+        "random_state": random.getstate(),
+        "sim":          sim,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str, restore_rng: bool = True) -> Simulation:
+    """
+    Reîncarcă o simulare salvată cu save_checkpoint. Cu restore_rng=True
+    (implicit) continuarea este identică bit cu bit cu rularea neîntreruptă.
+    """
+    with open(path, "rb") as f:
+        payload = pickle.load(f)
+    if payload.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"checkpoint {path}: versiune {payload.get('version')} incompatibilă "
+                         f"(așteptat {CHECKPOINT_VERSION})")
+    if restore_rng:
+        random.setstate(payload["random_state"])
+    return payload["sim"]
+
+
+def resume_scenario(path: str) -> SimulationResult:
+    # Reia o simulare întreruptă și o rulează până la final
+    return load_checkpoint(path).run()
+
+
+# ────────────────────────────────────────────────────────────
+#    VARIANTE PORNITE DINTR-UN SNAPSHOT COMUN (FORK)
+# ────────────────────────────────────────────────────────────
+
+def fork_checkpoint(path: str, overrides: dict = None) -> Simulation:
+    """
+    Pornește o variantă nouă dintr-un snapshot comun (de ex. după warm-up):
+      - overrides: parametri modificați (doar cei din FORKABLE_PARAMS); un
+        scheduler_mode nou reconstruiește ocaziile și structurile scheduler-ului
+      - 'seed' în overrides re-inițializează `random` pentru variantă;
+        fără el, toate variantele continuă cu aceeași stare RNG
+      - dacă simularea scrie un jurnal binar, fiecare variantă are nevoie de
+        propriul 'event_log_path'; jurnalul de până la snapshot e copiat acolo
+    """
+    overrides = dict(overrides or {})
+    seed = overrides.pop("seed", None)
+    bad = set(overrides) - FORKABLE_PARAMS
+    if bad:
+        raise ValueError(f"parametri nemodificabili după inițializare: {sorted(bad)}")
+
+    sim = load_checkpoint(path)
+    if sim.events is not None:
+        base = overrides.get("event_log_path")
+        if not base or base == sim.events.base:
+            raise ValueError("variantele unei simulări cu jurnal binar au nevoie de un 'event_log_path' propriu")
+        sim.events.copy_to(base)
+    mode    = sim.cfg["scheduler_mode"]
+    sim.cfg = sim.cfg.replace(**overrides)
+    if sim.cfg["scheduler_mode"] != mode:
+        # ocaziile, granturile SPS, heap-ul EDF și mulțimea activă țin de mod
+        sim._build_schedulers()
+        if sim.cfg["scheduler_mode"] != "slice" and {o.mode for o in sim.occasions} != {sim.cfg["scheduler_mode"]}:
+            raise RuntimeError(f"varianta nu a preluat scheduler_mode={sim.cfg['scheduler_mode']!r}")
+    if seed is not None:
+        random.seed(seed)
+    return sim
+
+
+def _run_fork(args):
+    path, overrides = args
+    return fork_checkpoint(path, overrides).run()
+
+
+def run_forks(path: str, variants: list, n_workers: int = None) -> list:
+    """
+    Rulează în paralel mai multe variante din același snapshot, fără a
+    repeta warm-up-ul. Returnează câte un SimulationResult per variantă,
+    în ordinea din `variants`.
+    """
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        return list(pool.map(_run_fork, [(path, v) for v in variants]))
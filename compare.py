@@ -0,0 +1,206 @@
+# simulator/compare.py
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from simulator.replication import confidence_interval, ConfidenceInterval
+from simulator.simconfig import compile_config
+from simulator.simulator import run_scenario
+
+# ────────────────────────────────────────────────────────────
+#    COMPARAȚIA SCHEDULER-ELOR CU VARIABILE ALEATOARE COMUNE (CRN)
+# ────────────────────────────────────────────────────────────
+# Replicarea r rulează toate configurațiile cu aceeași sămânță: traficul și
+# mobilitatea sunt generate identic la inițializare, iar canalul și testele
+# BLER vin din aceleași realizări per (UE, slot) (crn_seed, vezi
+# channel.ChannelRealizations). Diferențele pe perechi (varianta − referința
+# în aceeași replicare) elimină zgomotul comun, deci varianța diferenței e
+# var(A) + var(B) − 2·cov(A, B) în loc de var(A) + var(B).
+
+METRICS = ("mean_ms", "pXX_ms", "delivered", "first_tx_ratio")
+
+
+def _metric_names(percentile: float) -> tuple:
+    return tuple(m.replace("XX", f"{percentile:g}") for m in METRICS)
+
+
+def _run_variant(params: dict, seed: int, crn: bool, percentile: float, warmup_slots: int) -> dict:
+    """
+    O replicare a unei configurații: metricile pe grup ('all' și, dacă
+    params conține ue_slice_mapping, fiecare slice), după warm-up.
+    Fără CRN (crn=False), fiecare configurație își trage propriul canal.
+    """
+    res = run_scenario({**params, "seed": seed, "crn_seed": seed if crn else None})
+    ue_ids = np.asarray(res.ue_ids, dtype=np.int64)
+    keep   = np.asarray(res.slot_indices, dtype=np.int64) >= warmup_slots
+    lat    = np.asarray(res.latencies, dtype=float)[keep]
+    first  = np.asarray(res.first_tx, dtype=bool)[keep]
+    ue_ids = ue_ids[keep]
+
+    groups  = {"all": np.ones(len(lat), dtype=bool)}
+    mapping = params.get("ue_slice_mapping") or {}
+    if mapping:
+        slice_of = np.array([mapping.get(int(ue), "") for ue in ue_ids], dtype=object)
+        for sl in sorted(set(mapping.values())):
+            groups[sl] = slice_of == sl
+
+    names, out = _metric_names(percentile), {}
+    for name, mask in groups.items():
+        x = lat[mask]
+        out[name] = dict(zip(names, (
+            float(x.mean()) if len(x) else math.nan,
+            float(np.percentile(x, percentile)) if len(x) else math.nan,
+            float(len(x)),
+            float(first[mask].mean()) if len(x) else math.nan,
+        )))
+    return out
+
+
+@dataclass
+class PairedDifference:
+    variant:        str
+    group:          str
+    metric:         str
+    diff:           ConfidenceInterval   # media diferențelor varianta − referința
+    variance_ratio: float                # (var(A) + var(B)) / var(A − B): câștigul perechilor
+
+    @property
+    def significant(self) -> bool:
+        return self.diff.low > 0.0 or self.diff.high < 0.0
+
+
+@dataclass
+class ComparisonReport:
+    baseline:        str
+    variants:        list                           # numele configurațiilor, referința prima
+    n_replications:  int
+    crn:             bool
+    confidence:      float
+    values:          dict = field(default_factory=dict)   # variantă -> grup -> metrică -> [replicări]
+    differences:     list = field(default_factory=list)   # PairedDifference pentru fiecare variantă ≠ referința
+    wall_time_s:     float = 0.0
+
+    def interval(self, variant: str, group: str = "all", metric: str = "mean_ms") -> ConfidenceInterval:
+        # Intervalul valorii absolute a unei metrici pentru o configurație
+        return confidence_interval(self.values[variant][group][metric], self.confidence)
+
+    def replications_for(self, half_width: float, group: str = "all", metric: str = "mean_ms") -> dict:
+        """
+        Replicările necesare (estimate din varianța observată) pentru ca
+        intervalul diferenței față de referință să aibă semi-lățimea
+        half_width: {variantă: (cu perechi, independente)}.
+        """
+        out = {}
+        for d in self.differences:
+            if d.group != group or d.metric != metric:
+                continue
+            n, hw = d.diff.n, d.diff.half_width
+            if n < 2 or not math.isfinite(hw):
+                out[d.variant] = (math.nan, math.nan)
+                continue
+            paired = math.ceil(n * (hw / half_width) ** 2)
+            ratio  = d.variance_ratio if math.isfinite(d.variance_ratio) else 1.0
+            out[d.variant] = (paired, math.ceil(paired * ratio))
+        return out
+
+    def format(self, group: str = "all") -> str:
+        lines = [f"referință: {self.baseline}, {self.n_replications} replicări, "
+                 f"{'CRN' if self.crn else 'independente'}, interval {self.confidence:.0%}, "
+                 f"{self.wall_time_s:.1f} s"]
+        for d in self.differences:
+            if d.group != group:
+                continue
+            ci = d.diff
+            lines.append(f"  {d.variant:<18}{d.metric:<16}{ci.estimate:>+12.4f}  "
+                         f"[{ci.low:+.4f}, {ci.high:+.4f}]  câștig varianță ×{d.variance_ratio:.1f}"
+                         f"{'  *' if d.significant else ''}")
+        return "\n".join(lines)
+
+
+def _variance_ratio(a, b) -> float:
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    ok = np.isfinite(a) & np.isfinite(b)
+    if ok.sum() < 2:
+        return math.nan
+    a, b = a[ok], b[ok]
+    var_d = float(np.var(a - b, ddof=1))
+    var_s = float(np.var(a, ddof=1) + np.var(b, ddof=1))
+    if var_d == 0.0:
+        return math.inf if var_s > 0.0 else 1.0
+    return var_s / var_d
+
+
+def compare_schedulers(params: dict, variants, replications: int = 10, baseline: str = None,
+                       percentile: float = 99.0, confidence: float = 0.95, crn: bool = True,
+                       warmup_slots: int = 0, n_workers: int = None, base_seed: int = 0) -> ComparisonReport:
+    """
+    Compară mai multe configurații de scheduler pe aceleași realizări:
+      - variants: {nume: suprascrieri} peste params (ex. {'dyn': {'scheduler_mode': 'dynamic'},
+        'sps': {'scheduler_mode': 'semi-persistent'}}) sau o listă de scheduler_mode-uri
+      - replicări: seed = base_seed + r pentru toate configurațiile replicării r;
+        toate perechile (replicare, configurație) rulează în paralel
+      - crn=True: canal și teste BLER comune (crn_seed = seed); crn=False
+        dă fiecărei configurații semințe proprii (trafic, mobilitate și canal
+        independente), referința pentru câștigul CRN
+    Pentru modul 'slice', mapping-ul și share-urile stau în params (nu se trece
+    prin run_scenario_slice, ca traficul, inclusiv dimensiunea pachetelor, să
+    rămână identic între configurații). Referința implicită e prima variantă.
+    Toate configurațiile sunt validate înainte de prima rulare.
+    """
+    if not isinstance(variants, dict):
+        variants = {mode: {"scheduler_mode": mode} for mode in variants}
+    names    = list(variants)
+    baseline = baseline or names[0]
+    if baseline not in variants:
+        raise ValueError(f"referința {baseline!r} nu e printre variante: {names}")
+    if replications < 2:
+        raise ValueError("diferențele pe perechi au nevoie de cel puțin 2 replicări")
+    configs = {name: {**params, **variants[name]} for name in names}
+    for p in configs.values():
+        compile_config({**p, "seed": base_seed, "crn_seed": base_seed if crn else None})
+
+    names  = [baseline] + [n for n in names if n != baseline]
+    report = ComparisonReport(baseline, names, replications, crn, confidence)
+    t0     = time.perf_counter()
+    def seed(r, i):
+        return base_seed + r if crn else base_seed + r * len(names) + i
+
+    with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count() or 1) as pool:
+        futures = {(name, r): pool.submit(_run_variant, configs[name], seed(r, i), crn, percentile,
+                                          warmup_slots)
+                   for r in range(replications) for i, name in enumerate(names)}
+        for (name, r), fut in futures.items():
+            for group, metrics in fut.result().items():
+                acc = report.values.setdefault(name, {}).setdefault(group, {})
+                for metric, value in metrics.items():
+                    acc.setdefault(metric, []).append(value)
+
+    base = report.values[baseline]
+    for name in names[1:]:
+        for group, metrics in report.values[name].items():
+            for metric, values in metrics.items():
+                ref = base.get(group, {}).get(metric)
+                if ref is None:
+                    continue
+                diff = np.asarray(values, dtype=float) - np.asarray(ref, dtype=float)
+                report.differences.append(PairedDifference(
+                    name, group, metric, confidence_interval(diff, confidence),
+                    _variance_ratio(values, ref)))
+    report.wall_time_s = time.perf_counter() - t0
+    return report
+
+
+if __name__ == "__main__":
+    # python -m simulator.compare '{"n_ues": 20, "sim_time_ms": 2000}' dynamic semi-persistent [replicări]
+    import json
+    import sys
+
+    params = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    modes  = [a for a in sys.argv[2:] if not a.isdigit()] or ["dynamic", "semi-persistent"]
+    reps   = next((int(a) for a in sys.argv[2:] if a.isdigit()), 10)
+    print(compare_schedulers(params, modes, reps).format())
@@ -9,17 +9,24 @@ NUMEROLOGIES = {
     3: 120,
 }
 
+# Numărul maxim de PRB-uri (N_RB) per (lățime de bandă MHz, SCS kHz):
+# TS 38.101-1 Tabelul 5.3.2-1 (FR1) și TS 38.101-2 Tabelul 5.3.2-1 (FR2)
 PRB_TABLE = {
-    (5,   15): 25,
-    (10,  15): 52,
-    (15,  15): 79,
-    (20,  15): 106,
-    (10,  30): 24,
-    (20,  30): 51,
-    (40,  30): 106,
-    (20,  60): 24,
-    (40,  60): 51,
-    (80,  60): 106,
+    # FR1, SCS 15 kHz
+    (5,   15): 25,  (10,  15): 52,  (15,  15): 79,  (20,  15): 106, (25,  15): 133,
+    (30,  15): 160, (35,  15): 188, (40,  15): 216, (45,  15): 242, (50,  15): 270,
+    # FR1, SCS 30 kHz
+    (5,   30): 11,  (10,  30): 24,  (15,  30): 38,  (20,  30): 51,  (25,  30): 65,
+    (30,  30): 78,  (35,  30): 92,  (40,  30): 106, (45,  30): 119, (50,  30): 133,
+    (60,  30): 162, (70,  30): 189, (80,  30): 217, (90,  30): 245, (100, 30): 273,
+    # FR1, SCS 60 kHz
+    (10,  60): 11,  (15,  60): 18,  (20,  60): 24,  (25,  60): 31,  (30,  60): 38,
+    (35,  60): 44,  (40,  60): 51,  (45,  60): 58,  (50,  60): 65,  (60,  60): 79,
+    (70,  60): 93,  (80,  60): 107, (90,  60): 121, (100, 60): 135,
+    # FR2, SCS 60 / 120 kHz
+    (200, 60): 264,
+    (50, 120): 32,  (100, 120): 66, (200, 120): 132, (400, 120): 264,
+    # configurație mică păstrată pentru scenariile existente (nu e în 38.101)
     (10, 120): 6,
 }
 
@@ -41,7 +48,22 @@ default_params = {
     'lambda_per_ms':           0.1,
     'lambda_spread_pct':       0.2,
     'packet_size_bits':       512,
+    'traffic_trace_path':     None,
+    'traffic_generator':  'python',
+    'on_ms':                 100.0,
+    'off_ms':                400.0,
+    'on_rate_per_ms':          0.5,
+    'ftp_file_bits':       4000000,
+    'ftp_lambda_per_ms':     0.002,
+    'mtu_bits':              12000,
+    'xr_fps':                 60.0,
+    'xr_rate_mbps':           30.0,
+    'xr_size_std_pct':       0.105,
+    'xr_jitter_std_ms':        2.0,
+    'xr_jitter_max_ms':        4.0,
     'scheduler_mode':   'dynamic',
+    'delay_budget_ms':        10.0,
+    'edf_urgent_ms':           2.0,
     'slot_type':          'full',
     'mini_symbols':    [2, 4, 7],
     'coding_time_us':     100.0,
@@ -53,6 +75,31 @@ default_params = {
     'noise_density_dbm_hz': -174,
     'shadow_sigma_db':        8.0,
     'fast_fading':         True,
+    'channel_model':   'wideband',
+    'delay_spread_ns':      300.0,
+    'channel_taps':            6,
+    'doppler_hz':            10.0,
+    'subband_prbs':          None,
+    'esm_method':          'eesm',
+    'crn_seed':              None,
+    'mobility_model':   'random_walk',
+    'mobility_tick_slots':       1,
+    'distance_log_every_slots': 10,
+    'sps_enabled':          True,
+    'sps_mcs':              None,
+    'sps_margin_db':         8.0,
+    'sps_period_ms':        None,
+    'event_log_path':       None,
+    'event_log_flush_s':     1.0,
+    'telemetry_bin_slots':   100,
+    'telemetry_bins':       1024,
+    'telemetry_per_ue':     False,
+    'schedule_arrived_only': False,
+    'trace_sample_every':      0,
+    'trace_ues':            None,
+    'progress_interval_s':   0.5,
+    'memory_every_slots':      0,
+    'memory_tracemalloc':  False,
 }
 
 HARQ_MAX_ROUNDS = 3
@@ -66,19 +113,22 @@ slice_profiles = {
         "scheduler_mode":  "dynamic",
         "slot_type":       "full",
         "mini_symbols":    None,
-        "packet_size_bits": 2000
+        "packet_size_bits": 2000,
+        "delay_budget_ms":  50.0
     },
     "URLLC": {
         "scheduler_mode":  "semi-persistent",
         "slot_type":       "mini",
         "mini_symbols":    [7],
-        "packet_size_bits": 128
+        "packet_size_bits": 128,
+        "delay_budget_ms":  1.0
     },
     "mMTC": {
         "scheduler_mode":  "semi-persistent",
         "slot_type":       "full",
         "mini_symbols":    None,
-        "packet_size_bits": 1200
+        "packet_size_bits": 1200,
+        "delay_budget_ms":  1000.0
     },
 }
 
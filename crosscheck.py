@@ -0,0 +1,295 @@
+# simulator/crosscheck.py
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from simulator.simulator import run_scenario
+from simulator.simulator_slice import run_scenario_slice
+
+# ────────────────────────────────────────────────────────────
+#    MOTOARELE COMPARATE ȘI SUBSISTEMELE URMĂRITE
+# ────────────────────────────────────────────────────────────
+# Un „motor” e un set de parametri suprascriși peste scenariu. Referința e
+# implementarea scalară (mobilitate pas cu pas, generatoarele de trafic
+# Python); motorul rapid activează căile optimizate care trebuie să dea
+# aceleași rezultate. Opțiunile care schimbă modelul (ex. regula de
+# scheduling schedule_arrived_only) nu sunt căi rapide și nu intră aici.
+
+REFERENCE = {"precompute_mobility": False, "traffic_generator": "python"}
+FAST      = {"precompute_mobility": True, "traffic_generator": "python"}
+
+# Subsistemul -> (câmpul din înregistrarea de livrare care îl reflectă, per UE),
+# în ordinea cauzală: PRB-urile alocate depind de distanță, iar SINR-ul de
+# PRB-uri (banda zgomotului din compute_sinr), deci o divergență a scheduler-ului
+# apare și în aval, la canal și la adaptarea legăturii.
+# Pozițiile sunt o mărime per UE: pachetele aceluiași UE sunt puternic
+# corelate, așa că mobilitatea e testată pe media per (sămânță, UE).
+SUBSYSTEMS = {
+    "mobility":        ("distance_m", True),
+    "scheduler":       ("n_prbs",     False),
+    "channel":         ("sinr_db",    False),
+    "link_adaptation": ("mcs_idx",    False),
+    "latency":         ("latency_ms", False),
+}
+
+# Câmpurile comparate exact, pachet cu pachet (în ordinea livrării)
+EXACT_FIELDS = ("slot", "latency_ms", "distance_m", "sinr_db", "mcs_idx", "n_prbs",
+                "tbs_bits", "first_tx")
+
+
+# ────────────────────────────────────────────────────────────
+#    TESTE STATISTICE (FĂRĂ SCIPY)
+# ────────────────────────────────────────────────────────────
+
+def _kolmogorov_sf(x: float) -> float:
+    # P(K > x) pentru distribuția Kolmogorov (seria alternantă)
+    if x <= 0.0:
+        return 1.0
+    s = sum(2.0 * (-1) ** (k - 1) * math.exp(-2.0 * k * k * x * x) for k in range(1, 101))
+    return min(1.0, max(0.0, s))
+
+
+def ks_2samp(a, b) -> tuple:
+    """
+    Testul Kolmogorov-Smirnov cu două eșantioane: (D, p) cu p-valoarea
+    asimptotică (corecția Stephens). Pentru date discrete (CQI, PRB) testul
+    e conservator: p-valorile sunt supraestimate.
+    """
+    a = np.sort(np.asarray(a, dtype=float))
+    b = np.sort(np.asarray(b, dtype=float))
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return math.nan, math.nan
+    grid = np.concatenate([a, b])
+    d = float(np.max(np.abs(np.searchsorted(a, grid, side="right") / n1
+                            - np.searchsorted(b, grid, side="right") / n2)))
+    en = math.sqrt(n1 * n2 / (n1 + n2))
+    return d, _kolmogorov_sf((en + 0.12 + 0.11 / en) * d)
+
+
+def two_proportion_p(k1: int, n1: int, k2: int, n2: int) -> float:
+    # p-valoarea bilaterală a testului z pentru două proporții
+    if not n1 or not n2:
+        return math.nan
+    p = (k1 + k2) / (n1 + n2)
+    se = math.sqrt(p * (1 - p) * (1 / n1 + 1 / n2))
+    if se == 0:
+        return 1.0 if k1 / n1 == k2 / n2 else 0.0
+    z = abs(k1 / n1 - k2 / n2) / se
+    return math.erfc(z / math.sqrt(2))
+
+
+# ────────────────────────────────────────────────────────────
+#    O PERECHE DE RULĂRI PE ACEEAȘI SĂMÂNȚĂ
+# ────────────────────────────────────────────────────────────
+
+def _column(logs, key) -> np.ndarray:
+    # delivered_logs e o listă de dict-uri sau un tablou structurat (jurnal binar)
+    if isinstance(logs, np.ndarray):
+        return np.asarray(logs[key])
+    return np.asarray([r[key] for r in logs])
+
+
+def _outcomes(res) -> dict:
+    logs = res.delivered_logs
+    out = {k: _column(logs, k) for k in ("ue",) + EXACT_FIELDS}
+    harq = res.harq_stats
+    if isinstance(harq, np.ndarray):
+        dropped = int(harq["dropped"].sum())
+    else:
+        dropped = sum(1 for r in harq if r.get("dropped"))
+    out["harq_records"] = len(harq)
+    out["harq_dropped"] = dropped
+    out["slots"]        = int(res.simulated_slots)
+    return out
+
+
+def _run(params: dict, overrides: dict, seed: int) -> dict:
+    p = {**params, **overrides, "seed": seed}
+    if p.get("ue_slice_mapping"):
+        return _outcomes(run_scenario_slice(dict(p)).base)
+    return _outcomes(run_scenario(p))
+
+
+def _align(out: dict) -> np.ndarray:
+    # Cheia unui pachet: (UE, al câtelea pachet livrat al UE-ului). Buffer-ele
+    # sunt FIFO, deci cu același trafic cheia identifică aceeași sosire chiar
+    # dacă ordinea livrărilor între UE-uri diferă.
+    ue = out["ue"].astype(np.int64)
+    order = np.argsort(ue, kind="stable")
+    ordinal = np.empty(len(ue), dtype=np.int64)
+    starts = np.r_[0, np.flatnonzero(np.diff(ue[order])) + 1]
+    ordinal[order] = np.arange(len(ue)) - np.repeat(starts, np.diff(np.r_[starts, len(ue)]))
+    return ue * (1 << 32) + ordinal
+
+
+def _first_divergence(ref: dict, fast: dict):
+    """
+    Cel mai timpuriu pachet (după slotul de livrare) la care cele două rulări
+    diferă, cu câmpurile diferite, sau None dacă rezultatele sunt identice.
+    Pachetele sunt împerecheate după (UE, numărul de ordine al livrării).
+    """
+    kr, kf = _align(ref), _align(fast)
+    common, ir, jf = np.intersect1d(kr, kf, return_indices=True)
+    bad = np.zeros(len(common), dtype=bool)
+    for k in EXACT_FIELDS:
+        bad |= ref[k][ir] != fast[k][jf]
+    events = []                                   # (slot, ue, câmpuri)
+    if bad.any():
+        slots = np.minimum(ref["slot"][ir], fast["slot"][jf])
+        i = int(np.flatnonzero(bad)[np.argmin(slots[bad])])
+        fields = [k for k in EXACT_FIELDS if ref[k][ir[i]] != fast[k][jf[i]]]
+        events.append((int(slots[i]), int(ref["ue"][ir[i]]), fields))
+    for side, keys, other in ((ref, kr, kf), (fast, kf, kr)):
+        extra = np.flatnonzero(~np.isin(keys, other))
+        if len(extra):
+            i = int(extra[np.argmin(side["slot"][extra])])
+            events.append((int(side["slot"][i]), int(side["ue"][i]), ["count"]))
+    if not events and ref["harq_dropped"] != fast["harq_dropped"]:
+        events.append((0, -1, ["harq_dropped"]))
+    if not events:
+        return None
+    slot, ue, fields = min(events, key=lambda e: e[0])
+    return {"slot": slot, "ue": ue, "fields": fields, "subsystem": _blame(fields)}
+
+
+def _blame(fields) -> str:
+    # Cauza cea mai „din amonte” dintre câmpurile divergente, în ordinea în care
+    # se determină un pachet: slotul deservirii, poziția în acel slot, PRB-urile
+    # (care depind de poziție), SINR-ul (care depinde de PRB-uri), MCS, TBS, HARQ
+    order = (("count", "traffic"), ("harq_dropped", "harq"), ("slot", "scheduler"),
+             ("distance_m", "mobility"), ("n_prbs", "scheduler"), ("sinr_db", "channel"),
+             ("mcs_idx", "link_adaptation"), ("tbs_bits", "scheduler"), ("first_tx", "harq"),
+             ("latency_ms", "scheduler"))
+    for key, name in order:
+        if key in fields:
+            return name
+    return "unknown"
+
+
+def _ue_means(out: dict, key: str) -> np.ndarray:
+    _, inv = np.unique(out["ue"], return_inverse=True)
+    return np.bincount(inv, weights=out[key].astype(float)) / np.bincount(inv)
+
+
+def _pair(params: dict, reference: dict, fast: dict, seed: int) -> dict:
+    t0 = time.perf_counter()
+    ref = _run(params, reference, seed)
+    t1 = time.perf_counter()
+    out = _run(params, fast, seed)
+    t2 = time.perf_counter()
+    return {"seed": seed, "ref": ref, "fast": out, "divergence": _first_divergence(ref, out),
+            "ref_s": t1 - t0, "fast_s": t2 - t1}
+
+
+# ────────────────────────────────────────────────────────────
+#    RAPORTUL DIFERENȚIAL
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class CrossCheckReport:
+    seeds:          list
+    exact_seeds:    list                               # semințe cu rezultate identice pachet cu pachet
+    divergences:    dict = field(default_factory=dict) # seed -> primul punct de divergență
+    subsystems:     dict = field(default_factory=dict) # subsistem -> {d, p, ok, ...}
+    counts:         dict = field(default_factory=dict) # livrări / HARQ: referință vs rapid
+    alpha:          float = 0.01
+    ref_time_s:     float = 0.0
+    fast_time_s:    float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return all(s["ok"] for s in self.subsystems.values()) and all(c["ok"] for c in self.counts.values())
+
+    def format(self) -> str:
+        lines = [f"semințe: {len(self.seeds)}, identice pachet cu pachet: {len(self.exact_seeds)}",
+                 f"timp: referință {self.ref_time_s:.2f} s, rapid {self.fast_time_s:.2f} s"]
+        for seed, d in self.divergences.items():
+            lines.append(f"  seed {seed}: prima divergență la slotul {d['slot']} (UE {d['ue']}), "
+                         f"câmpuri {', '.join(d['fields'])} → {d['subsystem']}")
+        lines.append(f"{'subsistem':<18}{'KS D':>8}{'p':>10}  stare")
+        for name, s in self.subsystems.items():
+            state = "ok" if s["ok"] else "DIVERGENT"
+            if s.get("upstream"):
+                state += f" (din amonte: {s['upstream']})"
+            lines.append(f"{name:<18}{s['d']:>8.4f}{s['p']:>10.4f}  {state}")
+        for name, c in self.counts.items():
+            lines.append(f"{name:<18}{c['ref']:>10.4g} vs {c['fast']:<10.4g} p={c['p']:.4f}  "
+                         f"{'ok' if c['ok'] else 'DIVERGENT'}")
+        lines.append("REZULTAT: " + ("trecut" if self.passed else "EȘUAT"))
+        return "\n".join(lines)
+
+
+def crosscheck(params: dict = None, seeds=range(4), reference: dict = None, fast: dict = None,
+               alpha: float = 0.01, n_workers: int = None) -> CrossCheckReport:
+    """
+    Rulează referința și motorul rapid pe aceleași scenarii și semințe:
+      - exact: pentru fiecare sămânță, rezultatele pachet cu pachet; la prima
+        diferență se raportează slotul, câmpurile și subsistemul vinovat
+      - distribuții (când fluxurile RNG nu se aliniază): KS pe câmpurile
+        fiecărui subsistem, cumulate pe toate semințele, și teste de proporții
+        pentru rata livrărilor și rata HARQ drop / prima transmisie
+    Un subsistem e marcat divergent dacă p < alpha.
+    """
+    params    = dict(params or {})
+    reference = REFERENCE if reference is None else reference
+    fast      = FAST if fast is None else fast
+    seeds     = list(seeds)
+
+    with ProcessPoolExecutor(max_workers=n_workers or min(len(seeds), os.cpu_count() or 1)) as pool:
+        pairs = list(pool.map(_pair, [params] * len(seeds), [reference] * len(seeds),
+                              [fast] * len(seeds), seeds))
+
+    report = CrossCheckReport(seeds=seeds, exact_seeds=[], alpha=alpha)
+    for pr in pairs:
+        report.ref_time_s  += pr["ref_s"]
+        report.fast_time_s += pr["fast_s"]
+        if pr["divergence"] is None:
+            report.exact_seeds.append(pr["seed"])
+        else:
+            report.divergences[pr["seed"]] = pr["divergence"]
+
+    pooled = lambda side, key: np.concatenate([pr[side][key] for pr in pairs]) if pairs else np.empty(0)
+    for name, (key, per_ue) in SUBSYSTEMS.items():
+        if per_ue:
+            a = np.concatenate([_ue_means(pr["ref"], key) for pr in pairs])
+            b = np.concatenate([_ue_means(pr["fast"], key) for pr in pairs])
+        else:
+            a, b = pooled("ref", key), pooled("fast", key)
+        d, p = ks_2samp(a, b)
+        # primul subsistem divergent din amonte explică divergența celor din aval
+        upstream = next((u for u, s in report.subsystems.items() if not s["ok"]), None)
+        report.subsystems[name] = {"d": d, "p": p, "ok": not (p < alpha), "upstream": upstream}
+
+    # proporții: livrări per slot simulat, prima transmisie, HARQ drop
+    tot = lambda side, key: sum(int(pr[side][key]) for pr in pairs)
+    n_ref  = sum(len(pr["ref"]["ue"]) for pr in pairs)
+    n_fast = sum(len(pr["fast"]["ue"]) for pr in pairs)
+    first_ref, first_fast = int(pooled("ref", "first_tx").sum()), int(pooled("fast", "first_tx").sum())
+    for name, (k1, n1, k2, n2) in {
+        "delivered/slot": (n_ref, tot("ref", "slots"), n_fast, tot("fast", "slots")),
+        "first_tx_ratio": (first_ref, n_ref, first_fast, n_fast),
+        "harq_drop_rate": (tot("ref", "harq_dropped"), tot("ref", "harq_records"),
+                           tot("fast", "harq_dropped"), tot("fast", "harq_records")),
+    }.items():
+        p = two_proportion_p(k1, n1, k2, n2)
+        report.counts[name] = {"ref": k1 / n1 if n1 else math.nan, "fast": k2 / n2 if n2 else math.nan,
+                               "p": p, "ok": not (p < alpha)}
+    return report
+
+
+if __name__ == "__main__":
+    # python -m simulator.crosscheck '{"n_ues": 50}' [n_semințe]
+    import json
+    import sys
+
+    params = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    rep = crosscheck(params, range(n))
+    print(rep.format())
+    sys.exit(0 if rep.passed else 1)
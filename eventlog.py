@@ -0,0 +1,305 @@
+# simulator/eventlog.py
+
+import mmap
+import os
+import shutil
+import struct
+import threading
+
+import numpy as np
+
+from simulator.mobility import DistanceTrace
+
+# ────────────────────────────────────────────────────────────
+#    FORMATUL ÎNREGISTRĂRILOR (LĂȚIME FIXĂ)
+# ────────────────────────────────────────────────────────────
+
+DELIVERED_DTYPE = np.dtype([
+    ("ue",           "<i4"),
+    ("slot",         "<i4"),
+    ("latency_ms",   "<f8"),
+    ("distance_m",   "<f4"),
+    ("pathloss_db",  "<f4"),
+    ("sinr_db",      "<f4"),
+    ("cqi",          "<i1"),
+    ("mcs_idx",      "<i1"),
+    ("Qm",           "<i1"),
+    ("first_tx",     "?"),
+    ("code_rate",    "<f4"),
+    ("n_prbs",       "<i4"),
+    ("tbs_teoretic", "<i4"),
+    ("tbs_bits",     "<i4"),
+])
+
+HARQ_DTYPE = np.dtype([
+    ("ue_id",             "<i4"),
+    ("start_slot",        "<i4"),
+    ("ack_slot",          "<i4"),
+    ("arrival_time_ms",   "<f8"),
+    ("t_queue_ms",        "<f4"),
+    ("t_transmission_ms", "<f4"),
+    ("t_harq_ms",         "<f4"),
+    ("t_propagation_ms",  "<f4"),
+    ("t_total_ms",        "<f4"),
+    ("dropped",           "?"),
+])
+
+
+def distance_dtype(n_ues: int) -> np.dtype:
+    # Un eșantion de mobilitate: slotul și distanțele tuturor UE-urilor
+    return np.dtype([("slot", "<i8"), ("distance_m", "<f4", (n_ues,))])
+
+
+# Fiecare fișier e un .npy valid: antet de lungime fixă, rescris la fiecare
+# flush cu numărul curent de înregistrări, urmat de înregistrările brute.
+HEADER_BYTES = 512
+
+
+def npy_header(dtype: np.dtype, n: int) -> bytes:
+    # Antetul .npy v1.0 de HEADER_BYTES octeți pentru n înregistrări de tipul dtype
+    body = repr({"descr": np.lib.format.dtype_to_descr(dtype),
+                 "fortran_order": False, "shape": (n,)}).encode("latin1")
+    magic = b"\x93NUMPY\x01\x00"
+    hlen  = HEADER_BYTES - len(magic) - 2
+    if len(body) + 1 > hlen:
+        raise ValueError(f"descrierea tipului {dtype} nu încape în antetul de {HEADER_BYTES} octeți")
+    return magic + struct.pack("<H", hlen) + body + b" " * (hlen - len(body) - 1) + b"\n"
+
+
+# ────────────────────────────────────────────────────────────
+#    UN FIȘIER APPEND-ONLY MAPAT ÎN MEMORIE
+# ────────────────────────────────────────────────────────────
+
+class RecordFile:
+    """
+    Fișier append-only de înregistrări cu lățime fixă, mapat în memorie.
+    append() scrie direct în mmap (fără obiecte Python persistente); capacitatea
+    se dublează la nevoie. flush() rescrie antetul cu numărul de înregistrări,
+    deci fișierul poate fi deschis oricând cu np.load(..., mmap_mode='r').
+    """
+
+    def __init__(self, path: str, dtype: np.dtype, capacity: int = 4096, n: int = 0):
+        self.path     = path
+        self.dtype    = np.dtype(dtype)
+        self.n        = n
+        self.capacity = max(capacity, n, 1)
+        self._lock    = threading.Lock()
+        self._mm      = None
+        self._open()
+
+    def _open(self):
+        self._f = open(self.path, "r+b" if self.n else "w+b")
+        self._map(self.capacity)
+        self.flush()
+
+    def _map(self, capacity: int):
+        self.capacity = capacity
+        self._f.truncate(HEADER_BYTES + capacity * self.dtype.itemsize)
+        self._mm  = mmap.mmap(self._f.fileno(), 0)
+        self._arr = np.ndarray((capacity,), dtype=self.dtype, buffer=self._mm, offset=HEADER_BYTES)
+
+    def _grow(self):
+        with self._lock:
+            self._mm.flush()
+            del self._arr
+            self._mm.close()
+            self._map(self.capacity * 2)
+
+    def append(self, values: tuple):
+        if self._mm is None:
+            self._open()
+        if self.n == self.capacity:
+            self._grow()
+        self._arr[self.n] = values
+        self.n += 1
+
+    def flush(self):
+        with self._lock:
+            if self._mm is None or self._mm.closed:
+                return
+            self._mm[:HEADER_BYTES] = npy_header(self.dtype, self.n)
+            self._mm.flush()
+
+    def close(self):
+        # Scrie antetul final și taie capacitatea nefolosită
+        if self._mm is None:
+            self._open()
+        if self._mm.closed:
+            return
+        self.flush()
+        with self._lock:
+            del self._arr
+            self._mm.close()
+            self._f.truncate(HEADER_BYTES + self.n * self.dtype.itemsize)
+            self._f.close()
+
+    def view(self) -> np.ndarray:
+        # Vedere read-only, zero-copy, peste înregistrările scrise până acum
+        self.flush()
+        return open_records(self.path)[:self.n]
+
+    def copy_to(self, path: str):
+        """
+        Continuă jurnalul într-un fișier nou, care pornește cu o copie a
+        primelor n înregistrări (variante pornite din același checkpoint).
+        """
+        if self._mm is not None and not self._mm.closed:
+            self.close()
+        size = HEADER_BYTES + self.n * self.dtype.itemsize
+        with open(self.path, "rb") as src, open(path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+            dst.truncate(size)
+            dst.seek(0)
+            dst.write(npy_header(self.dtype, self.n))
+        self.path = path
+        self._mm  = None
+
+    def __len__(self):
+        return self.n
+
+    # La checkpoint păstrăm doar calea și numărul de înregistrări; la reluare
+    # fișierul e redeschis abia la prima scriere (și suprascris de la acel
+    # punct), ca un fork să-și poată muta jurnalul fără a atinge originalul
+    def __getstate__(self):
+        self.flush()
+        return {"path": self.path, "dtype": self.dtype, "n": self.n, "capacity": self.capacity}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._mm   = None
+
+
+def open_records(path: str) -> np.ndarray:
+    # Deschide un fișier de înregistrări ca np.memmap read-only
+    with open(path, "rb") as f:
+        np.lib.format.read_magic(f)
+        shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+    if not shape[0]:
+        return np.empty(0, dtype=dtype)   # mmap nu acceptă o regiune vidă
+    return np.load(path, mmap_mode="r")
+
+
+# ────────────────────────────────────────────────────────────
+#    JURNALUL DE EVENIMENTE AL UNEI SIMULĂRI
+# ────────────────────────────────────────────────────────────
+
+KINDS = ("delivered", "harq", "distance")
+
+
+def event_paths(base: str) -> dict:
+    return {kind: f"{base}.{kind}.npy" for kind in KINDS}
+
+
+class EventLog:
+    """
+    Jurnalul binar al unei rulări: câte un RecordFile pentru livrări,
+    înregistrările HARQ și eșantioanele de distanță (la fiecare
+    `every_slots` sloturi). Un fir de fundal face flush la fiecare
+    flush_interval_s secunde, deci memoria rămâne constantă indiferent de
+    durata rulării, iar fișierele pot fi citite chiar în timpul rulării.
+    Înlocuiește PositionRecorder (aceeași interfață record()/result()).
+    """
+
+    def __init__(self, base: str, n_ues: int, every_slots: int = 10, flush_interval_s: float = 1.0):
+        self.base             = base
+        self.every_slots      = max(1, int(every_slots))
+        self.flush_interval_s = flush_interval_s
+        paths = event_paths(base)
+        os.makedirs(os.path.dirname(os.path.abspath(base)), exist_ok=True)
+        self.delivered = RecordFile(paths["delivered"], DELIVERED_DTYPE)
+        self.harq      = RecordFile(paths["harq"], HARQ_DTYPE)
+        self.distance  = RecordFile(paths["distance"], distance_dtype(n_ues), capacity=1024)
+        self._start_flusher()
+
+    def _start_flusher(self):
+        self._stop   = threading.Event()
+        self._thread = None
+        if self.flush_interval_s:
+            self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._thread.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval_s):
+            self.flush()
+
+    @property
+    def files(self):
+        return (self.delivered, self.harq, self.distance)
+
+    def log_delivered(self, record: dict):
+        self.delivered.append(tuple(record[k] for k in DELIVERED_DTYPE.names))
+
+    def log_harq(self, record: dict):
+        self.harq.append(tuple(record.get(k, False) for k in HARQ_DTYPE.names))
+
+    def record(self, slot: int, distances: np.ndarray):
+        if slot % self.every_slots:
+            return
+        self.distance.append((slot, distances))
+
+    def result(self) -> DistanceTrace:
+        trace = self.distance.view()
+        return DistanceTrace(trace["slot"], trace["distance_m"])
+
+    def flush(self):
+        for f in self.files:
+            f.flush()
+
+    def copy_to(self, base: str):
+        # Mută jurnalul (cu înregistrările de până acum) la o bază nouă
+        os.makedirs(os.path.dirname(os.path.abspath(base)), exist_ok=True)
+        paths = event_paths(base)
+        for kind, f in zip(KINDS, self.files):
+            f.copy_to(paths[kind])
+        self.base = base
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for f in self.files:
+            f.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for k in ("_stop", "_thread"):
+            state.pop(k, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._start_flusher()
+
+
+def open_event_log(base: str) -> dict:
+    """
+    Deschide jurnalul unei rulări pentru analiză: {tip: np.memmap structurat},
+    fără a copia datele în memorie.
+    """
+    return {kind: open_records(path) for kind, path in event_paths(base).items()
+            if os.path.exists(path)}
+
+
+def to_arrow(base: str, kind: str = "delivered"):
+    """
+    Un tip de înregistrări ca pyarrow.Table, pentru unelte care lucrează cu
+    Arrow (câmpurile structurate sunt intercalate, deci fiecare coloană e
+    copiată o dată). Necesită pachetul opțional pyarrow.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("to_arrow necesită pachetul opțional 'pyarrow'") from exc
+    arr = open_records(event_paths(base)[kind])
+    columns = {}
+    for name in arr.dtype.names:
+        col = arr[name]
+        if col.ndim > 1:
+            # coloană vector (distanțele per UE): listă de lungime fixă
+            columns[name] = pa.FixedSizeListArray.from_arrays(
+                pa.array(np.ascontiguousarray(col).reshape(-1)), col.shape[1])
+        else:
+            columns[name] = pa.array(np.ascontiguousarray(col))
+    return pa.table(columns)
@@ -1,17 +1,17 @@
 from dataclasses import dataclass
-from simulator.config import NUMEROLOGIES
+from simulator.config import NUMEROLOGIES, default_params
 
-@dataclass
+@dataclass(frozen=True)
 class FrameParams:
     scs_khz: int
     symbol_duration_us: float
     slot_duration_us: float
     num_symbols_per_slot: int
-    mini_symbols: list
-    mini_slot_durations_us: list
+    mini_symbols: tuple
+    mini_slot_durations_us: tuple
 
 # Funcția de extragere a parametrilor cadrului (slot complet sau mini-slot)
-def get_frame_params(scs_mu: int, mini_symbols: list = None) -> FrameParams:
+def get_frame_params(scs_mu: int, mini_symbols: tuple = None) -> FrameParams:
     # 1) Alegerea sub-carrier spacing (SCS) pe baza indexului numerologiei
     scs_khz = NUMEROLOGIES[scs_mu]
     # 2) Durata simbolului în microsecunde (1 secunda / (SCS * 1000))
@@ -20,15 +20,15 @@ def get_frame_params(scs_mu: int, mini_symbols: list = None) -> FrameParams:
     slot_duration_us = 14 * symbol_duration_us
 
     # 4) Dacă nu s-au furnizat mini-symbols, preluăm valorile implicite din config
-    from simulator.config import default_params
     if mini_symbols is None:
         mini_symbols = default_params['mini_symbols']
+    mini_symbols = tuple(mini_symbols)
 
     # 5) Calculăm durata fiecărui mini-slot (număr de simboluri × durata simbol)
-    mini_slot_durations_us = [
+    mini_slot_durations_us = tuple(
         Nsymb * symbol_duration_us
         for Nsymb in mini_symbols
-    ]
+    )
 
     # 6) Returnăm un dataclass cu toți parametrii calculați
     return FrameParams(
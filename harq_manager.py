@@ -3,6 +3,7 @@ from simulator.config import HARQ_MAX_ROUNDS, HARQ_RTT_SLOTS
 from simulator.link_adaptation import estimate_bler, select_mcs
 from simulator.channel import sinr_to_cqi, compute_sinr
 from simulator.rb import compute_tbs
+from simulator.tracer import HARQ_RETX, HARQ_ACK, DROP
 
 # Clasa care reprezintă un singur proces HARQ pentru un UE
 class HarqProcess:
@@ -19,7 +20,8 @@ class HarqProcess:
         # următorul slot când așteptăm feedback (RTT HARQ)
         self.due_slot = start_slot + HARQ_RTT_SLOTS
 
-    def advance_round(self, current_slot, ue_distance, bw_mhz, scs_khz):
+    def advance_round(self, current_slot, ue_distance, bw_mhz, scs_khz, interference_mw=0.0, cfg=None,
+                      draws=None):
         """
         Încercare nouă de retransmisie:
         - Incrementăm numărul de rundă
@@ -35,7 +37,9 @@ class HarqProcess:
         # 1) Recalcul SINR pentru aceleași resurse PRB
         sinr_db = compute_sinr(
             ue_distance, self.n_prbs, bw_mhz, scs_khz,
-            model='log_distance'
+            model='log_distance', interference_mw=interference_mw, cfg=cfg,
+            shadow_db=None if draws is None else draws.shadow_db[self.ue_id],
+            rayleigh_db=None if draws is None else draws.rayleigh_db[self.ue_id]
         )
         # 2) Mapăm în CQI și alegem noul MCS
         cqi = sinr_to_cqi(sinr_db)
@@ -76,13 +80,18 @@ class HarqProcess:
 # Clasa care gestionează toate procesele HARQ active
 class HarqManager:
 
-    def __init__(self, n_ues, symbol_duration_ms, num_symbols_per_tx, full_slot_ms):
+    def __init__(self, n_ues, symbol_duration_ms, num_symbols_per_tx, full_slot_ms, cfg=None):
         self.active = {}  # dict ue_id -> HarqProcess activ
+        self.cfg = cfg    # SimConfig-ul rulării (tabelele canalului pentru SINR)
         self.n_ues = n_ues
         self.symbol_duration_ms = symbol_duration_ms
         self.num_symbols_per_tx = num_symbols_per_tx
         self.full_slot_ms = full_slot_ms
         self.latency_records = []  # lista dict-urilor cu statistici de latență
+        self.sink = None           # EventLog opțional: înregistrările merg pe disc, nu în listă
+        self.n_acked   = 0         # contoare cumulative (pentru telemetrie)
+        self.n_dropped = 0
+        self.tracer    = None      # PacketTracer opțional (pachetele urmărite)
 
     def start_harq_tx(self, ue_id, slot, n_prbs, mcs_idx, tbs_bits, arrival_time_ms):
         """
@@ -94,13 +103,17 @@ class HarqManager:
         self.active[ue_id] = proc
         return True
 
-    def check_feedback(self, slot_idx, ue_distances, bw_mhz, scs_khz, buffers, arrival_times):
+    def check_feedback(self, slot_idx, ue_distances, bw_mhz, scs_khz, buffers, arrival_times,
+                       interference=None, draws=None):
         """
-        La fiecare slot complet, verificăm feedback-ul pentru toate procesele care așteaptă:
+        La fiecare slot complet, verificăm feedback-ul pentru toate procesele care așteaptă
+        (interference: dict opțional ue_id -> interferență inter-celulă în mW;
+        draws: SlotDraws opțional, realizările comune ale canalului în slot):
         - Calculăm BLER actual și generăm un rand() pentru ACK/NACK
         - Dacă ACK: logăm latența și ștergem pachet din buffer
         - Dacă NACK și mai putem retry: advance_round()
         - Dacă NACK și am atins max rounds: drop + log
+        Returnează UE-urile ale căror procese s-au încheiat (ACK sau drop).
         """
         to_remove = []
         for ue_id, proc in list(self.active.items()):
@@ -109,16 +122,20 @@ class HarqManager:
                 continue
             # 1) Calcul SINR real și BLER pentru această rundă
             d_m = ue_distances[ue_id]
-            sinr_db = compute_sinr(d_m, proc.n_prbs, bw_mhz, scs_khz, model='log_distance')
+            i_mw = interference.get(ue_id, 0.0) if interference else 0.0
+            sinr_db = compute_sinr(d_m, proc.n_prbs, bw_mhz, scs_khz, model='log_distance',
+                                   interference_mw=i_mw, cfg=self.cfg,
+                                   shadow_db=None if draws is None else draws.shadow_db[ue_id],
+                                   rayleigh_db=None if draws is None else draws.rayleigh_db[ue_id])
             bler = estimate_bler(sinr_db, proc.mcs_idx)
-            rnd = random.random()
+            rnd = random.random() if draws is None else draws.u_harq[ue_id]
            # print(f"[HARQ DEBUG] UE{ue_id} slot={slot_idx} rnd={rnd:.3f} BLER={bler:.3f}")
             # 2) Decizie ACK/NACK
             if rnd > bler:
             #    print(f"[HARQ DEBUG]   → UE{ue_id} ACK at slot {slot_idx}")
                 lat_dict = proc.compute_latency_dict(d_m, self.full_slot_ms)
                 # Logăm record-ul de latență (fără câmp dropped)
-                self.latency_records.append({
+                self._log({
                     "ue_id": ue_id,
                     "start_slot": proc.start_slot,
                     "ack_slot": slot_idx,
@@ -127,16 +144,20 @@ class HarqManager:
                 })
                 # Scoatem pachetul din buffer dacă există
                 if buffers.get(ue_id) and buffers[ue_id]:
+                    self._trace(buffers[ue_id][0], HARQ_ACK, slot_idx, proc.round_idx)
                     buffers[ue_id].popleft()
+                self.n_acked += 1
                 to_remove.append(ue_id)
             else:
                 # 3) NACK: încercăm retransmisie sau drop dacă s-au epuizat runde HARQ
-                can_retx = proc.advance_round(slot_idx, d_m, bw_mhz, scs_khz)
+                can_retx = proc.advance_round(slot_idx, d_m, bw_mhz, scs_khz, i_mw, self.cfg, draws)
+                if can_retx and buffers.get(ue_id):
+                    self._trace(buffers[ue_id][0], HARQ_RETX, slot_idx, proc.round_idx)
                 if not can_retx:
                   #  print(f"[HARQ DEBUG]   → UE{ue_id} NACK, max rounds reached – dropping")
                     lat_dict = proc.compute_latency_dict(d_m, self.full_slot_ms)
                     lat_dict["dropped"] = True
-                    self.latency_records.append({
+                    self._log({
                         "ue_id": ue_id,
                         "start_slot": proc.start_slot,
                         "ack_slot": slot_idx,
@@ -144,16 +165,32 @@ class HarqManager:
                         **lat_dict
                     })
                     if buffers.get(ue_id) and buffers[ue_id]:
+                        self._trace(buffers[ue_id][0], DROP, slot_idx, proc.round_idx)
                         buffers[ue_id].popleft()
+                    self.n_dropped += 1
                     to_remove.append(ue_id)
         # 4) Eliminăm procesele terminate din lista activă
         for ue_id in to_remove:
             self.active.pop(ue_id, None)
+        return to_remove
+
+    def _trace(self, ev: dict, kind: int, slot_idx: int, round_idx: int):
+        if self.tracer is not None:
+            self.tracer.log(ev, kind, slot_idx, round_idx)
+
+    def _log(self, record: dict):
+        if self.sink is not None:
+            self.sink.log_harq(record)
+        else:
+            self.latency_records.append(record)
 
     def has_pending(self) -> bool:
         # Returnează True dacă mai există procese HARQ active
         return len(self.active) > 0
 
     def get_latency_stats(self):
-        # Returnează lista completă de înregistrări latență (ACK/NACK/drop)
+        # Returnează lista completă de înregistrări latență (ACK/NACK/drop);
+        # cu jurnal binar, un memmap structurat peste fișierul HARQ
+        if self.sink is not None:
+            return self.sink.harq.view()
         return self.latency_records
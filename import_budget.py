@@ -0,0 +1,132 @@
+# simulator/import_budget.py
+
+import os
+import subprocess
+import sys
+
+# ────────────────────────────────────────────────────────────
+#    BUGETUL DE TIMP LA IMPORTUL NUCLEULUI
+# ────────────────────────────────────────────────────────────
+# Worker-ii de sweep / replicare sunt procese de scurtă durată: importul
+# nucleului trebuie să rămână ieftin și să nu tragă după el stiva de
+# raportare. check_import_budget() rulează importul într-un interpretor
+# proaspăt (python -X importtime) și verifică ambele condiții.
+#
+# Timpul cumulat al unui modul include tot ce importă primul: numpy (≈ 65 –
+# 120 ms, după build) apărea ca „link_adaptation ≈ 100 ms”, fiindcă acesta e
+# primul modul din nucleu care îl importă (timpul propriu e ≈ 2 ms). De aceea
+# timpul propriu al fiecărui import e atribuit celui mai apropiat modul
+# simulator.* care l-a cerut, numpy separat, iar bugetul privește nucleul
+# fără numpy (≈ 65 ms măsurat): numpy e o dependență obligatorie, al cărei
+# cost nu ține de acest cod și ar ascunde o regresie proprie în variația lui.
+
+CORE_MODULES = (
+    "simulator.config",
+    "simulator.frames",
+    "simulator.link_adaptation",
+    "simulator.rb",
+    "simulator.channel",
+    "simulator.harq_manager",
+    "simulator.traffic",
+    "simulator.scheduler",
+    "simulator.simconfig",
+    "simulator.simulator",
+)
+
+# Pachete care nu au voie să fie încărcate de nucleu
+FORBIDDEN = ("flask", "pandas", "matplotlib", "scipy", "pyarrow", "sqlite3")
+
+DEFAULT_BUDGET_MS = 150.0     # nucleul fără numpy
+
+
+def _import_tree(lines):
+    # Ieșirea -X importtime e în post-ordine (copiii înaintea părintelui), cu
+    # adâncimea dată de indentare: reconstruim arborele de importuri
+    pending = []
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        depth = len(name) - len(name.lstrip())
+        node  = {"name": name.strip(), "self_us": int(self_us), "cum_us": int(cumulative),
+                 "depth": depth, "children": []}
+        while pending and pending[-1]["depth"] > depth:
+            node["children"].insert(0, pending.pop())
+        pending.append(node)
+    return pending
+
+
+def _attribute(node, owner, out):
+    # Timpul propriu al fiecărui import merge la cel mai apropiat modul simulator.*
+    # care l-a cerut; tot ce importă numpy rămâne la numpy
+    name = node["name"]
+    if name.startswith("simulator."):
+        owner = name
+    elif name == "numpy" or name.startswith("numpy."):
+        owner = "numpy"
+    out[owner] = out.get(owner, 0) + node["self_us"]
+    for child in node["children"]:
+        _attribute(child, owner, out)
+
+
+def measure_import(modules=CORE_MODULES, python: str = sys.executable) -> dict:
+    """
+    Importă `modules` într-un proces nou și întoarce:
+      - total_ms: timpul cumulat al importurilor de nivel superior
+      - numpy_ms: partea datorată numpy (inclusiv modulele standard cerute de el)
+      - core_ms:  total_ms fără numpy_ms
+      - slowest:  modulele proprii cu cel mai mare timp atribuit [(modul, ms)]
+      - loaded:   pachetele de nivel superior încărcate
+    """
+    parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [parent, os.environ.get("PYTHONPATH")]))}
+    code = (f"import {', '.join(modules)}; import sys; "
+            "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))")
+    proc = subprocess.run([python, "-X", "importtime", "-c", code], env=env,
+                          capture_output=True, text=True, check=True)
+
+    spent = {}
+    roots = _import_tree(proc.stderr.splitlines())
+    for root in roots:
+        _attribute(root, "alte", spent)
+    total_us = sum(root["cum_us"] for root in roots)
+    numpy_us = spent.pop("numpy", 0)
+    own = [(name, us / 1000.0) for name, us in spent.items() if name.startswith("simulator.")]
+    return {
+        "total_ms": total_us / 1000.0,
+        "numpy_ms": numpy_us / 1000.0,
+        "core_ms":  (total_us - numpy_us) / 1000.0,
+        "slowest":  sorted(own, key=lambda x: x[1], reverse=True)[:10],
+        "loaded":   proc.stdout.split(),
+    }
+
+
+def check_import_budget(budget_ms: float = DEFAULT_BUDGET_MS, modules=CORE_MODULES) -> list:
+    """
+    Lista problemelor găsite (goală = în buget): depășirea timpului de
+    import al nucleului fără numpy și pachetele interzise încărcate de nucleu.
+    """
+    report = measure_import(modules)
+    problems = []
+    if report["core_ms"] > budget_ms:
+        slow = ", ".join(f"{m} {ms:.1f} ms" for m, ms in report["slowest"][:5])
+        problems.append(f"importul nucleului (fără numpy) durează {report['core_ms']:.1f} ms "
+                        f"> {budget_ms:.0f} ms ({slow})")
+    heavy = sorted(set(FORBIDDEN) & set(report["loaded"]))
+    if heavy:
+        problems.append(f"nucleul încarcă pachete opționale: {', '.join(heavy)}")
+    return problems
+
+
+if __name__ == "__main__":
+    # python -m simulator.import_budget [buget_ms]  → cod de ieșire 1 la depășire
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    rep = measure_import()
+    print(f"import nucleu: {rep['total_ms']:.1f} ms (numpy {rep['numpy_ms']:.1f} ms, "
+          f"fără numpy {rep['core_ms']:.1f} ms)")
+    for mod, ms in rep["slowest"]:
+        print(f"  {mod:<32}{ms:8.1f} ms")
+    problems = check_import_budget(budget)
+    for p in problems:
+        print("EȘEC:", p)
+    sys.exit(1 if problems else 0)
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 import math
+import numpy as np
 from simulator.config import MCS_TABLE
+from simulator.channel import sinr_to_cqi_array
 
 @dataclass
 class MCSParams:
@@ -46,3 +48,64 @@ def estimate_bler(sinr_db: float, mcs_idx: int) -> float:
         bler = 1.0
 
     return bler
+
+# ────────────────────────────────────────────────────────────
+#    SINR EFECTIV PESTE PRB-URILE ALOCATE (EESM / MIESM)
+# ────────────────────────────────────────────────────────────
+
+# β-ul EESM per indice MCS. În calibrările de nivel legătură β e de ordinul
+# SINR-ului liniar de la pragul MCS-ului (raport ~1.5 pentru QPSK, ~0.8 pentru
+# 16QAM, ~0.7 pentru 64QAM, ~0.6 pentru 256QAM); aici pragul MCS-ului m este
+# 5·m dB, ca în sinr_to_cqi.
+_QM = np.array([MCS_TABLE[i][0] for i in sorted(MCS_TABLE)], dtype=float)
+_BETA_RATIO = {2: 1.5, 4: 0.8, 6: 0.7, 8: 0.6}
+EESM_BETA = np.array([_BETA_RATIO[int(q)] for q in _QM]) * np.maximum(1.0, 10.0 ** (0.5 * np.arange(len(_QM))))
+
+
+def effective_sinr_db(sinr_db, method: str = "eesm", beta=1.0, Qm=None) -> np.ndarray:
+    """
+    SINR-ul efectiv (dB) al unui bloc transmis pe mai multe PRB-uri, peste
+    ultima axă a lui `sinr_db`:
+      - 'eesm': -β·ln(mean(exp(-γ/β)))
+      - 'miesm': informația mutuală medie, cu maparea de capacitate
+        min(log2(1 + γ), Qm) (fără Qm: Shannon), inversată la SINR
+    `beta` / `Qm` pot fi tablouri care se difuzează peste axele din față.
+    """
+    g = 10.0 ** (np.asarray(sinr_db, dtype=float) / 10.0)
+    if method == "eesm":
+        beta = np.asarray(beta, dtype=float)[..., None]
+        # log-sum-exp stabil: γ mari dau exp(-γ/β) ≈ 0
+        x = -g / beta
+        m = x.max(axis=-1, keepdims=True)
+        eff = -beta[..., 0] * (m[..., 0] + np.log(np.exp(x - m).mean(axis=-1)))
+    elif method == "miesm":
+        info = np.log2(1.0 + g)
+        if Qm is not None:
+            info = np.minimum(info, np.asarray(Qm, dtype=float)[..., None])
+        eff = 2.0 ** info.mean(axis=-1) - 1.0
+    else:
+        raise ValueError(f"metodă ESM necunoscută: {method!r}")
+    return 10.0 * np.log10(np.maximum(eff, 1e-12))
+
+
+def select_mcs_effective(sinr_db, method: str = "eesm") -> tuple:
+    """
+    Cel mai mare MCS m pentru care SINR-ul efectiv corespunde unui CQI ≥ m.
+    Cu EESM, SINR-ul efectiv depinde de β-ul lui m, așa că toate MCS-urile sunt
+    evaluate într-o singură operație (16 × n_prbs); MIESM folosește maparea de
+    capacitate fără plafonul Qm (pragurile de 5 dB / CQI din acest model
+    depășesc capacitatea modulațiilor), deci un singur SINR efectiv.
+    Returnează (MCSParams, sinr_efectiv_dB).
+    """
+    if method == "miesm":
+        eff = float(effective_sinr_db(sinr_db, "miesm"))
+        return select_mcs(int(sinr_to_cqi_array(eff))), eff
+    if method != "eesm":
+        raise ValueError(f"metodă ESM necunoscută: {method!r}")
+    # EESM pentru toate β-urile deodată (log-sum-exp stabil pe fiecare rând)
+    x    = -(10.0 ** (np.asarray(sinr_db, dtype=float).reshape(1, -1) / 10.0)) / EESM_BETA[:, None]
+    top  = x.max(axis=1)
+    eff  = 10.0 * np.log10(np.maximum(-EESM_BETA * (top + np.log(np.exp(x - top[:, None]).mean(axis=1))), 1e-12))
+    ok   = np.flatnonzero(sinr_to_cqi_array(eff) >= np.arange(len(EESM_BETA)))
+    m    = int(ok[-1]) if len(ok) else 0
+    return select_mcs(m), float(eff[m])
@@ -0,0 +1,244 @@
+# simulator/memory.py
+
+import os
+import sys
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# ────────────────────────────────────────────────────────────
+#    ESTIMAREA DIMENSIUNII STRUCTURILOR
+# ────────────────────────────────────────────────────────────
+# Estimări ieftine (eșantionare), nu parcurgeri complete: o listă de dict-uri
+# e evaluată după cel mult SAMPLE elemente. Tablourile mapate pe disc
+# (np.memmap, jurnalul binar) nu ocupă heap și sunt numărate cu 0.
+
+SAMPLE = 32
+
+
+def _nbytes(arr) -> int:
+    if arr is None or isinstance(arr, np.memmap):
+        return 0
+    base = arr
+    while isinstance(base, np.ndarray) and base.base is not None:
+        base = base.base
+    if not isinstance(base, np.ndarray):       # vedere peste un mmap / buffer extern
+        return 0
+    return int(arr.nbytes)
+
+
+def _dict_bytes(d: dict) -> int:
+    # cheile sunt șiruri internate, comune tuturor pachetelor: doar valorile
+    return sys.getsizeof(d) + sum(sys.getsizeof(v) for v in d.values())
+
+
+def _seq_bytes(seq, item_bytes=sys.getsizeof) -> int:
+    n = len(seq)
+    if isinstance(seq, np.ndarray):
+        return _nbytes(seq)
+    total = sys.getsizeof(seq)
+    if not n:
+        return total
+    step = max(1, n // SAMPLE)
+    sample = [item_bytes(seq[i]) for i in range(0, n, step)][:SAMPLE]
+    return total + int(sum(sample) / len(sample) * n)
+
+
+def _buffers_bytes(buffers: dict) -> int:
+    total, sources = sys.getsizeof(buffers), {}
+    for buf in buffers.values():
+        if isinstance(buf, deque):
+            total += _seq_bytes(buf, _dict_bytes)
+        else:
+            # TraceBuffer: doar pachetele materializate + sursa comună, o dată
+            total += sys.getsizeof(buf) + _seq_bytes(buf._head, _dict_bytes)
+            sources[id(buf.source)] = buf.source
+    for src in sources.values():
+        total += _nbytes(src._records) + _nbytes(getattr(src, "_order", None))
+    return total
+
+
+def _rss_bytes() -> int:
+    # RSS-ul curent al procesului (Linux); altfel vârful raportat de getrusage
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def structure_sizes(sim) -> dict:
+    """
+    Dimensiunea estimată (octeți) a fiecărei structuri mari a unei Simulation.
+    """
+    hm = sim.hm
+    procs = list(hm.active.values())[:SAMPLE]
+    per_proc = sum(sys.getsizeof(p) + sys.getsizeof(vars(p)) for p in procs) / len(procs) if procs else 0
+    sizes = {
+        "traffic_buffers": _buffers_bytes(sim.tm.buffers),
+        "arrival_times":   sys.getsizeof(sim.arrival_times) + sys.getsizeof(sim.tm.arrival_slots),
+        "result_lists":    sum(_seq_bytes(x) for x in (sim.latencies, sim.ue_ids, sim.slots, sim.first_tx)),
+        "delivered_logs":  _seq_bytes(sim.delivered_logs, _dict_bytes),
+        "harq_records":    0 if hm.sink is not None else _seq_bytes(hm.latency_records, _dict_bytes),
+        "harq_processes":  sys.getsizeof(hm.active) + int(per_proc * len(hm.active)),
+        "distance_log":    0 if sim.events is not None else
+                           _nbytes(sim.recorder.slots) + _nbytes(sim.recorder.distance_m),
+    }
+    if sim.active is not None:
+        sizes["active_set"] = (sys.getsizeof(sim.active.ready) + sys.getsizeof(sim.active._heap)
+                               + 64 * len(sim.active._heap))
+    if sim.edf is not None:
+        sizes["edf_queues"] = sum(sys.getsizeof(q.heap) + sys.getsizeof(q.pos) + sys.getsizeof(q.keys)
+                                  + 64 * len(q) for q in sim.edf.queues.values())
+    if sim.telemetry is not None:
+        t = sim.telemetry
+        sizes["telemetry"] = sum(_nbytes(a) for a in (t.slot_start, t.prb_allocated, t.backlog_bits,
+                                                      t.harq_active, t.delivered, t.dropped, t.ue_bits,
+                                                      t._ue_bits))
+    if sim.tracer is not None:
+        sizes["tracer"] = _nbytes(sim.tracer._buf)
+    return sizes
+
+
+def _subsystem(filename: str) -> str:
+    # Gruparea alocărilor tracemalloc: modulul simulatorului sau biblioteca
+    parts = filename.replace("\\", "/").split("/")
+    if "site-packages" in parts:
+        return parts[parts.index("site-packages") + 1]
+    name = os.path.splitext(parts[-1])[0]
+    here = os.path.dirname(os.path.abspath(__file__))
+    return name if os.path.dirname(os.path.abspath(filename)) == here else "other"
+
+
+# ────────────────────────────────────────────────────────────
+#    RAPORTUL ȘI EȘANTIONAREA PERIODICĂ
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class MemoryReport:
+    slots:       np.ndarray           # sloturile eșantioanelor
+    time_s:      np.ndarray           # timpul simulat al eșantioanelor (s)
+    structures:  dict                 # nume -> (n_eșantioane,) octeți estimați
+    rss:         np.ndarray           # RSS-ul procesului la fiecare eșantion
+    subsystems:  dict = field(default_factory=dict)   # modul -> octeți (tracemalloc), opțional
+    extra:       dict = field(default_factory=dict)   # structuri măsurate o dată, după rulare
+
+    def add(self, name: str, nbytes: int):
+        # Structuri din afara simulării (ex. copiile pandas din interfața web)
+        self.extra[name] = int(nbytes)
+
+    def _series(self) -> dict:
+        out = {name: s for name, s in self.structures.items()}
+        out.update({f"tracemalloc:{name}": s for name, s in self.subsystems.items()})
+        out["process_rss"] = self.rss
+        return out
+
+    def peak(self) -> dict:
+        out = {name: int(s.max()) if len(s) else 0 for name, s in self._series().items()}
+        out.update(self.extra)
+        return out
+
+    def growth_bytes_per_s(self) -> dict:
+        # Panta regresiei liniare octeți ~ timp simulat (creștere per secundă simulată)
+        out = {}
+        for name, s in self._series().items():
+            if len(s) < 2 or np.ptp(self.time_s) == 0:
+                out[name] = 0.0
+            else:
+                out[name] = float(np.polyfit(self.time_s, s.astype(float), 1)[0])
+        return out
+
+    def rows(self) -> list:
+        # Câte un rând per structură, sortat după vârf: {structure, last_mb, peak_mb, growth_mb_s}
+        peak, growth = self.peak(), self.growth_bytes_per_s()
+        series = self._series()
+        rows = []
+        for name in sorted(peak, key=peak.get, reverse=True):
+            last = series[name][-1] if name in series and len(series[name]) else self.extra.get(name, 0)
+            rows.append({"structure":   name,
+                         "last_mb":     round(last / 2**20, 3),
+                         "peak_mb":     round(peak[name] / 2**20, 3),
+                         "growth_mb_s": round(growth.get(name, 0.0) / 2**20, 4) + 0.0})
+        return rows
+
+    def format(self) -> str:
+        lines = [f"{'structură':<28}{'ultim [MB]':>12}{'vârf [MB]':>12}{'creștere [MB/s]':>18}"]
+        for r in self.rows():
+            lines.append(f"{r['structure']:<28}{r['last_mb']:>12.3f}{r['peak_mb']:>12.3f}{r['growth_mb_s']:>18.4f}")
+        return "\n".join(lines)
+
+
+class MemoryAccountant:
+    """
+    Eșantionează la fiecare `every_slots` sloturi dimensiunea estimată a
+    structurilor mari ale simulării și RSS-ul procesului; cu tracemalloc=True
+    ia și un snapshot tracemalloc, grupat pe modul (subsistem). tracemalloc
+    încetinește vizibil rularea, de aceea e opțional.
+    """
+
+    def __init__(self, every_slots: int, use_tracemalloc: bool = False):
+        self.every_slots     = max(1, int(every_slots))
+        self.use_tracemalloc = use_tracemalloc
+        self.slots, self.time_s, self.rss = [], [], []
+        self.structures, self.subsystems  = {}, {}
+        self._started = False
+
+    def _start_tracing(self):
+        if self.use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+    def sample(self, sim):
+        self._start_tracing()
+        n = len(self.slots)
+        self.slots.append(sim.slot)
+        self.time_s.append(sim.slot * sim.fp.slot_duration_us / 1e6)
+        self.rss.append(_rss_bytes())
+        for name, nbytes in structure_sizes(sim).items():
+            self.structures.setdefault(name, [0] * n).append(nbytes)
+        if self.use_tracemalloc and tracemalloc.is_tracing():
+            grouped = {}
+            for stat in tracemalloc.take_snapshot().statistics("filename"):
+                key = _subsystem(stat.traceback[0].filename)
+                grouped[key] = grouped.get(key, 0) + stat.size
+            for name in set(grouped) | set(self.subsystems):
+                self.subsystems.setdefault(name, [0] * n).append(grouped.get(name, 0))
+
+    def end_slot(self, sim):
+        if sim.slot % self.every_slots == 0:
+            self.sample(sim)
+
+    def result(self, sim) -> MemoryReport:
+        if not self.slots or self.slots[-1] != sim.slot:
+            self.sample(sim)
+        if self._started and sim.done:
+            tracemalloc.stop()
+            self._started = False
+        as_arr = lambda d: {k: np.asarray(v, dtype=np.int64) for k, v in d.items()}
+        return MemoryReport(np.asarray(self.slots), np.asarray(self.time_s), as_arr(self.structures),
+                            np.asarray(self.rss, dtype=np.int64), as_arr(self.subsystems))
+
+    def __getstate__(self):
+        # tracemalloc nu trece prin checkpoint: e repornit la primul eșantion
+        state = self.__dict__.copy()
+        state["_started"] = False
+        return state
+
+
+# ────────────────────────────────────────────────────────────
+#    UTILIZARE DIN LINIA DE COMANDĂ
+# ────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    # python -m simulator.memory '{"n_ues": 200, "sim_time_ms": 10000}'
+    import json
+    from simulator.simulator import run_scenario
+
+    params = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    params.setdefault("memory_every_slots", 100)
+    res = run_scenario(params)
+    print(res.memory.format())
@@ -0,0 +1,401 @@
+# simulator/mobility.py
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# ────────────────────────────────────────────────────────────
+#    INIȚIALIZAREA STĂRII DE MOBILITATE (VECTORIZAT)
+# ────────────────────────────────────────────────────────────
+
+def init_positions(n_ues: int, R: float, rng: np.random.Generator) -> np.ndarray:
+    # Poziții uniforme pe aria cercului de rază R → tablou (n_ues, 2)
+    r = R * np.sqrt(rng.random(n_ues))
+    theta = rng.random(n_ues) * 2 * math.pi
+    return np.column_stack([r * np.cos(theta), r * np.sin(theta)])
+
+def init_speeds(n_ues: int, rng: np.random.Generator) -> np.ndarray:
+    # 70% pietoni (0.5–1.5 m/s), 30% vehicule (10–15 m/s)
+    return np.where(rng.random(n_ues) < 0.7,
+                    rng.uniform(0.5, 1.5, n_ues),
+                    rng.uniform(10.0, 15.0, n_ues))
+
+def init_headings(n_ues: int, rng: np.random.Generator) -> np.ndarray:
+    # Direcții random [0, 2π) pentru fiecare UE
+    return rng.random(n_ues) * 2 * math.pi
+
+
+# ────────────────────────────────────────────────────────────
+#    MODELE DE MOBILITATE
+# ────────────────────────────────────────────────────────────
+
+class RandomWalk:
+    """
+    Random walk cu direcție constantă: la fiecare tick, cu probabilitatea
+    turn_prob UE-ul alege o direcție nouă; la ieșirea din zonă se întoarce
+    (θ + π), ca în modelul original din run_scenario.
+    """
+
+    def __init__(self, turn_prob: float = 0.0):
+        self.turn_prob = turn_prob
+
+    def init(self, engine):
+        pass
+
+    def step(self, engine, dt_s):
+        st = engine.state
+        if self.turn_prob > 0.0:
+            turn = engine.draws().random(len(st["heading"])) < self.turn_prob
+            st["heading"][turn] = engine.draws(turn).random(int(turn.sum())) * 2 * math.pi
+        step = st["speed"] * dt_s
+        new_xy = st["xy"] + np.column_stack([step * np.cos(st["heading"]),
+                                             step * np.sin(st["heading"])])
+        outside = engine.outside(new_xy)
+        if outside.any():
+            st["heading"][outside] = (st["heading"][outside] + math.pi) % (2 * math.pi)
+            h = st["heading"][outside]
+            new_xy[outside] = st["xy"][outside] + np.column_stack([step[outside] * np.cos(h),
+                                                                   step[outside] * np.sin(h)])
+        st["xy"] = new_xy
+
+
+class RandomWaypoint:
+    """
+    Random waypoint: fiecare UE merge în linie dreaptă spre o destinație
+    uniformă în zonă, face o pauză de pause_s secunde și alege o nouă
+    destinație și o nouă viteză.
+    """
+
+    def __init__(self, pause_s: float = 0.0):
+        self.pause_s = pause_s
+
+    def init(self, engine):
+        n = len(engine.state["speed"])
+        engine.state["waypoint"] = engine.center + init_positions(n, engine.radius_m, engine.draws())
+        engine.state["pause"] = np.zeros(n)
+
+    def step(self, engine, dt_s):
+        st = engine.state
+        # 1) UE-urile în pauză doar consumă timp
+        st["pause"] = np.maximum(st["pause"] - dt_s, 0.0)
+        moving = st["pause"] <= 0.0
+
+        # 2) Deplasare spre destinație
+        delta = st["waypoint"] - st["xy"]
+        dist  = np.hypot(delta[:, 0], delta[:, 1])
+        step  = st["speed"] * dt_s
+        st["heading"] = np.where(dist > 0, np.arctan2(delta[:, 1], delta[:, 0]), st["heading"])
+        frac  = np.where(dist > 0, np.minimum(step / np.maximum(dist, 1e-12), 1.0), 1.0)
+        frac  = np.where(moving, frac, 0.0)
+        st["xy"] = st["xy"] + delta * frac[:, None]
+
+        # 3) Sosire: pauză, destinație și viteză noi (extragerile se fac și fără
+        #    sosiri, ca numărul lor pe tick să nu depindă de UE-urile motorului)
+        arrived = moving & (step >= dist)
+        n_arr = int(arrived.sum())
+        rng   = engine.draws(arrived)
+        st["waypoint"][arrived] = engine.center + init_positions(n_arr, engine.radius_m, rng)
+        st["speed"][arrived]    = init_speeds(n_arr, rng)
+        st["pause"][arrived]    = self.pause_s
+
+
+class TraceMobility:
+    """
+    Mobilitate citită dintr-un fișier de urme:
+      - CSV cu coloanele time_s, ue, x, y (antet pe primul rând)
+      - .npz cu tablourile 't' (T,) și 'xy' (T, n_ues, 2)
+    Urmele sunt aduse la o grilă comună de timp la încărcare, astfel încât
+    fiecare tick este o interpolare liniară vectorizată între două rânduri.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path.endswith(".npz"):
+            data = np.load(path)
+            self.t, self.xy = np.asarray(data["t"], dtype=float), np.asarray(data["xy"], dtype=float)
+            return
+        raw  = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+        t    = np.unique(raw[:, 0])
+        ues  = np.unique(raw[:, 1]).astype(np.int64)
+        grid = np.empty((len(t), int(ues.max()) + 1, 2))
+        for ue in ues:
+            rows = raw[raw[:, 1] == ue]
+            rows = rows[np.argsort(rows[:, 0], kind="stable")]
+            grid[:, ue, 0] = np.interp(t, rows[:, 0], rows[:, 2])
+            grid[:, ue, 1] = np.interp(t, rows[:, 0], rows[:, 3])
+        self.t, self.xy = t, grid
+
+    def positions_at(self, t_s: float, ues: np.ndarray) -> np.ndarray:
+        # Pozițiile UE-urilor cu ID-urile `ues` la momentul t_s
+        i = int(np.searchsorted(self.t, t_s, side="right")) - 1
+        if i < 0:
+            return self.xy[0, ues]
+        if i >= len(self.t) - 1:
+            return self.xy[-1, ues]
+        w = (t_s - self.t[i]) / (self.t[i + 1] - self.t[i])
+        return (1.0 - w) * self.xy[i, ues] + w * self.xy[i + 1, ues]
+
+    def init(self, engine):
+        ues = engine.ids
+        if len(ues) and self.xy.shape[1] <= ues.max():
+            raise ValueError(f"urma de mobilitate {self.path} conține doar {self.xy.shape[1]} UE-uri")
+        engine.state["xy"] = self.positions_at(0.0, ues)
+
+    def step(self, engine, dt_s):
+        prev = engine.state["xy"]
+        engine.state["xy"] = self.positions_at(engine.t_s + dt_s, engine.ids)
+        delta = engine.state["xy"] - prev
+        engine.state["heading"] = np.arctan2(delta[:, 1], delta[:, 0])
+
+
+MOBILITY_MODELS = {
+    "random_walk":     RandomWalk,
+    "random_waypoint": RandomWaypoint,
+    "trace":           TraceMobility,
+}
+
+def make_mobility_model(cfg: dict):
+    """
+    Construiește modelul de mobilitate din parametrii simulării:
+      - 'mobility_model':      'random_walk' | 'random_waypoint' | 'trace'
+      - 'mobility_turn_prob':  probabilitatea de schimbare a direcției per tick
+      - 'mobility_pause_s':    pauza la destinație (random waypoint)
+      - 'mobility_trace_path': fișierul de urme (trace)
+    """
+    name = cfg.get("mobility_model", "random_walk")
+    if name == "random_walk":
+        return RandomWalk(cfg.get("mobility_turn_prob", 0.0))
+    if name == "random_waypoint":
+        return RandomWaypoint(cfg.get("mobility_pause_s", 0.0))
+    if name == "trace":
+        return TraceMobility(cfg["mobility_trace_path"])
+    raise ValueError(f"model de mobilitate necunoscut: {name!r}; opțiuni: {sorted(MOBILITY_MODELS)}")
+
+
+# ────────────────────────────────────────────────────────────
+#    EXTRAGERI INDEXATE DUPĂ UE (INDEPENDENTE DE PARTIȚIONARE)
+# ────────────────────────────────────────────────────────────
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    # Finalizatorul SplitMix64, vectorizat pe uint64 (depășirile se pliază modulo 2^64)
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class KeyedRng:
+    """
+    RNG fără stare secvențială pentru MobilityEngine: extragerea a k-a din
+    tick-ul t pentru UE-ul u e un hash SplitMix64 al (cheie, u, t, k), deci
+    nu depinde de ce alte UE-uri ține motorul. Un shard multi-celulă care
+    mișcă doar UE-urile proprii trage astfel exact valorile motorului cu
+    toată populația, indiferent de numărul de workeri.
+    """
+
+    def __init__(self, key: int):
+        self.key = np.uint64(key)
+        self._at = (None, 0)        # (tick, următoarea extragere din tick)
+
+    def for_ues(self, ue_ids, tick: int) -> "_KeyedDraws":
+        return _KeyedDraws(self, np.asarray(ue_ids, dtype=np.uint64), tick)
+
+    def _next_draw(self, tick: int) -> int:
+        t, k = self._at
+        k = k if t == tick else 0
+        self._at = (tick, k + 1)
+        return k
+
+    def uniform01(self, ue_ids: np.ndarray, tick: int, k: int) -> np.ndarray:
+        h = _splitmix64(_splitmix64(_splitmix64(ue_ids ^ self.key) ^ np.uint64(tick)) ^ np.uint64(k))
+        return (h >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+class _KeyedDraws:
+    # Subsetul din np.random.Generator folosit de modele, peste UE-urile date
+    def __init__(self, owner: KeyedRng, ue_ids: np.ndarray, tick: int):
+        self.owner, self.ue_ids, self.tick = owner, ue_ids, tick
+
+    def _u(self, size):
+        if size is not None and size != len(self.ue_ids):
+            raise ValueError(f"extragere de {size} valori pentru {len(self.ue_ids)} UE-uri")
+        return self.owner.uniform01(self.ue_ids, self.tick, self.owner._next_draw(self.tick))
+
+    def random(self, size=None) -> np.ndarray:
+        return self._u(size)
+
+    def uniform(self, low=0.0, high=1.0, size=None) -> np.ndarray:
+        return low + (high - low) * self._u(size)
+
+
+# ────────────────────────────────────────────────────────────
+#    MOTORUL DE MOBILITATE
+# ────────────────────────────────────────────────────────────
+
+class MobilityEngine:
+    """
+    Ține starea tuturor UE-urilor ca tablouri NumPy (poziții, viteze,
+    direcții + starea specifică modelului) și le actualizează pe toate
+    dintr-o dată la fiecare tick de mobilitate.
+    ue_ids: ID-urile UE-urilor ținute (implicit 0..n-1), când motorul are doar
+    o parte din populație; rândurile rămân ordonate după ID.
+    extra_state: starea specifică modelului deja inițializată (de exemplu
+    partea unui shard dintr-un motor cu toată populația); model.init nu mai
+    e apelat.
+    """
+
+    def __init__(self, model, xy, speed, heading, radius_m, rng, center=(0.0, 0.0),
+                 ue_ids=None, extra_state=None):
+        self.model    = model
+        self.radius_m = radius_m
+        self.center   = np.asarray(center, dtype=float)
+        self.rng      = rng
+        self.t_s      = 0.0
+        self.ue_ids   = None if ue_ids is None else np.asarray(ue_ids, dtype=np.int64)
+        self.state    = {
+            "xy":      np.asarray(xy, dtype=float).reshape(-1, 2),
+            "speed":   np.asarray(speed, dtype=float),
+            "heading": np.asarray(heading, dtype=float),
+        }
+        self._trajectory = None
+        self._tick       = 0
+        self._steps      = 0        # tick-uri simulate (cheia extragerilor KeyedRng)
+        if extra_state is None:
+            model.init(self)
+        else:
+            self.state.update({k: np.asarray(v, dtype=float) for k, v in extra_state.items()})
+
+    @classmethod
+    def from_config(cls, n_ues: int, cfg: dict, rng: np.random.Generator):
+        # Inițializare uniformă pe celula de rază cell_radius (ca în run_scenario)
+        radius = cfg.get("cell_radius", 500)
+        return cls(make_mobility_model(cfg),
+                   init_positions(n_ues, radius, rng),
+                   init_speeds(n_ues, rng),
+                   init_headings(n_ues, rng),
+                   radius, rng)
+
+    @property
+    def xy(self) -> np.ndarray:
+        return self.state["xy"]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return np.arange(len(self.state["speed"])) if self.ue_ids is None else self.ue_ids
+
+    def draws(self, mask=None):
+        """
+        Sursa extragerilor modelului pentru UE-urile `mask` (implicit toate):
+        generatorul secvențial al motorului sau, cu un KeyedRng, extrageri
+        determinate de ID-urile acestor UE-uri și de tick.
+        """
+        if isinstance(self.rng, KeyedRng):
+            return self.rng.for_ues(self.ids if mask is None else self.ids[mask], self._steps)
+        return self.rng
+
+    def outside(self, xy: np.ndarray) -> np.ndarray:
+        d = xy - self.center
+        return np.hypot(d[:, 0], d[:, 1]) > self.radius_m
+
+    def distances(self, origin=(0.0, 0.0)) -> np.ndarray:
+        d = self.state["xy"] - np.asarray(origin, dtype=float)
+        return np.hypot(d[:, 0], d[:, 1])
+
+    def step(self, dt_s: float):
+        # Avansăm toate UE-urile cu dt_s; dacă avem traiectorii precalculate, doar le citim
+        if self._trajectory is not None:
+            self._tick = min(self._tick + 1, len(self._trajectory) - 1)
+            self.state["xy"] = self._trajectory[self._tick].copy()
+        else:
+            self._steps += 1
+            self.model.step(self, dt_s)
+        self.t_s += dt_s
+
+    def precompute(self, n_ticks: int, dt_s: float) -> np.ndarray:
+        """
+        Calculează dinainte traiectoriile complete: tablou float64
+        (n_ticks + 1, n_ues, 2), rândul 0 fiind poziția curentă.
+        Apelurile ulterioare ale step() redau traiectoria fără calcule.
+        RNG-ul motorului e folosit doar de model, deci tragerile au aceeași
+        ordine ca pas cu pas; păstrând float64, rularea e identică cu cea
+        fără precalculare (cu prețul a 16 octeți per UE și tick).
+        """
+        traj = np.empty((n_ticks + 1, len(self.state["speed"]), 2))
+        traj[0] = self.state["xy"]
+        t0, steps0, saved = self.t_s, self._steps, {k: v.copy() for k, v in self.state.items()}
+        for k in range(1, n_ticks + 1):
+            self._steps += 1
+            self.model.step(self, dt_s)
+            self.t_s += dt_s
+            traj[k] = self.state["xy"]
+        self.state, self.t_s, self._steps = saved, t0, steps0
+        self._trajectory, self._tick = traj, 0
+        return traj
+
+    def remove(self, mask: np.ndarray) -> dict:
+        # Extrage UE-urile selectate (ex. handover către alt proces) cu toată starea lor
+        if self._trajectory is not None:
+            raise RuntimeError("UE-urile nu pot fi mutate când traiectoriile sunt precalculate")
+        out = {k: v[mask] for k, v in self.state.items()}
+        self.state = {k: v[~mask] for k, v in self.state.items()}
+        if self.ue_ids is not None:
+            self.ue_ids = self.ue_ids[~mask]
+        return out
+
+    def add(self, states: dict, ue_ids=None):
+        # Cu ue_ids, rândurile noi se intercalează astfel încât ordinea după ID să rămână
+        if self._trajectory is not None:
+            raise RuntimeError("UE-urile nu pot fi mutate când traiectoriile sunt precalculate")
+        for k in self.state:
+            self.state[k] = np.concatenate([self.state[k], np.asarray(states[k], dtype=float)])
+        if self.ue_ids is not None:
+            ids   = np.concatenate([self.ue_ids, np.asarray(ue_ids, dtype=np.int64)])
+            order = np.argsort(ids, kind="stable")
+            self.ue_ids = ids[order]
+            self.state  = {k: v[order] for k, v in self.state.items()}
+
+
+# ────────────────────────────────────────────────────────────
+#    ÎNREGISTRAREA COMPACTĂ A DISTANȚELOR
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class DistanceTrace:
+    slots:      np.ndarray     # (n_samples,) indicele slotului eșantionat
+    distance_m: np.ndarray     # (n_samples, n_ues) distanța UE–gNB, float32
+
+    def __len__(self):
+        return len(self.slots)
+
+    def to_records(self) -> list:
+        # Formatul vechi (listă de dict-uri), util pentru DataFrame-uri mici
+        return [
+            {"ue": ue, "slot": int(slot), "distance_m": round(float(d), 2)}
+            for slot, row in zip(self.slots, self.distance_m)
+            for ue, d in enumerate(row)
+        ]
+
+
+class PositionRecorder:
+    """
+    Eșantionează distanțele tuturor UE-urilor la fiecare `every_slots`
+    sloturi într-un tablou prealocat, în loc de câte un dict per mișcare.
+    """
+
+    def __init__(self, n_ues: int, total_slots: int, every_slots: int = 10):
+        self.every_slots = max(1, int(every_slots))
+        n_samples        = total_slots // self.every_slots + 1
+        self.slots       = np.empty(n_samples, dtype=np.int64)
+        self.distance_m  = np.empty((n_samples, n_ues), dtype=np.float32)
+        self.n           = 0
+
+    def record(self, slot: int, distances: np.ndarray):
+        if slot % self.every_slots or self.n >= len(self.slots):
+            return
+        self.slots[self.n]      = slot
+        self.distance_m[self.n] = distances
+        self.n += 1
+
+    def result(self) -> DistanceTrace:
+        return DistanceTrace(self.slots[:self.n], self.distance_m[:self.n])
@@ -0,0 +1,559 @@
+# simulator/multicell.py
+
+import math
+import os
+import random
+import multiprocessing as mp
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from simulator.channel import pathloss_db_array, ChannelRealizations
+from simulator.simconfig import compile_config
+from simulator.scheduler import allocate_rb, EdfScheduler, EDF_MODES
+from simulator.traffic import TrafficManager
+from simulator.harq_manager import HarqManager
+from simulator.resource_grid import build_occasions
+from simulator.mobility import MobilityEngine, KeyedRng, make_mobility_model, init_speeds, init_headings
+from simulator.simulator import transmit_packet, prepare_packet
+
+# ────────────────────────────────────────────────────────────
+#    CLUSTER DE CELULE (LAYOUT HEXAGONAL, 7 – 57 CELULE)
+# ────────────────────────────────────────────────────────────
+
+# Număr de celule omnidirecționale (1, 2, 3 inele) și tri-sectorizate (7 / 19 site-uri × 3)
+OMNI_CLUSTER_SIZES      = (7, 19, 37)
+SECTORED_CLUSTER_SIZES  = (21, 57)
+
+SECTOR_AZIMUTHS_DEG     = (30.0, 150.0, 270.0)
+SECTOR_BEAMWIDTH_DEG    = 70.0     # lățimea lobului la -3 dB (3GPP TR 38.901)
+SECTOR_FRONT_BACK_DB    = 20.0     # atenuarea maximă în spatele sectorului
+
+HANDOVER_HYSTERESIS_DB  = 3.0
+
+# Direcțiile vecinilor în coordonate axiale (q, r)
+_HEX_DIRECTIONS = ((1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1))
+
+
+@dataclass
+class CellLayout:
+    cell_xy:      np.ndarray   # (n_cells, 2) poziția gNB-ului fiecărei celule [m]
+    cell_az_deg:  np.ndarray   # (n_cells,) azimut sector; NaN = antenă omnidirecțională
+    site_xy:      np.ndarray   # (n_sites, 2) pozițiile site-urilor
+    isd_m:        float        # inter-site distance
+    radius_m:     float        # raza exterioară a clusterului (limită de mobilitate)
+
+
+def hex_site_positions(n_sites: int, isd_m: float) -> np.ndarray:
+    """
+    Pozițiile a n_sites site-uri pe o rețea hexagonală, inel cu inel
+    (1, 7, 19, 37 ...), cu distanța dintre vecini egală cu isd_m.
+    """
+    axial = [(0, 0)]
+    ring = 1
+    while len(axial) < n_sites:
+        # pornim din colțul inelului și parcurgem cele 6 laturi
+        q, r = -ring, ring
+        for dq, dr in _HEX_DIRECTIONS:
+            for _ in range(ring):
+                axial.append((q, r))
+                q, r = q + dq, r + dr
+        ring += 1
+    axial = np.array(axial[:n_sites], dtype=float)
+    x = isd_m * (axial[:, 0] + axial[:, 1] / 2.0)
+    y = isd_m * (math.sqrt(3) / 2.0) * axial[:, 1]
+    return np.column_stack([x, y])
+
+
+def build_cluster(n_cells: int, isd_m: float = 500.0) -> CellLayout:
+    """
+    Construiește clusterul de celule:
+      - 7 / 19 / 37 celule → site-uri omnidirecționale
+      - 21 / 57 celule     → 7 / 19 site-uri cu câte 3 sectoare
+    """
+    if n_cells in OMNI_CLUSTER_SIZES:
+        sites   = hex_site_positions(n_cells, isd_m)
+        cell_xy = sites
+        cell_az = np.full(n_cells, np.nan)
+    elif n_cells in SECTORED_CLUSTER_SIZES:
+        sites   = hex_site_positions(n_cells // 3, isd_m)
+        cell_xy = np.repeat(sites, 3, axis=0)
+        cell_az = np.tile(np.array(SECTOR_AZIMUTHS_DEG), len(sites))
+    else:
+        raise ValueError(
+            f"n_cells={n_cells} nesuportat; valori permise: "
+            f"{OMNI_CLUSTER_SIZES + SECTORED_CLUSTER_SIZES}"
+        )
+    radius = float(np.max(np.hypot(sites[:, 0], sites[:, 1]))) + isd_m / math.sqrt(3)
+    return CellLayout(cell_xy, cell_az, sites, isd_m, radius)
+
+
+def _pathloss_db(d_m: np.ndarray) -> np.ndarray:
+    # Varianta vectorizată a channel.compute_pathloss (log-distance, n=3.5, fc=3.5 GHz)
+    return pathloss_db_array(d_m)
+
+
+def link_gains_db(ue_xy: np.ndarray, layout: CellLayout):
+    """
+    Calculează, ca o singură operație NumPy, distanțele (n_ues, n_cells)
+    și câștigul de legătură = -pathloss + câștigul antenei de sector.
+    """
+    dx = ue_xy[:, None, 0] - layout.cell_xy[None, :, 0]
+    dy = ue_xy[:, None, 1] - layout.cell_xy[None, :, 1]
+    dist = np.hypot(dx, dy)
+    gain = -_pathloss_db(dist)
+
+    sectored = ~np.isnan(layout.cell_az_deg)
+    if sectored.any():
+        bearing = np.degrees(np.arctan2(dy, dx))
+        off = (bearing - np.nan_to_num(layout.cell_az_deg)[None, :] + 180.0) % 360.0 - 180.0
+        att = -np.minimum(12.0 * (off / SECTOR_BEAMWIDTH_DEG) ** 2, SECTOR_FRONT_BACK_DB)
+        gain = gain + np.where(sectored[None, :], att, 0.0)
+    return dist, gain
+
+
+# ────────────────────────────────────────────────────────────
+#    DATACLASS PENTRU REZULTATELE SIMULĂRII MULTI-CELULĂ
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class MultiCellResult:
+    latencies:      list
+    ue_ids:         list
+    cell_ids:       list
+    slot_indices:   list
+    first_tx:       list
+    delivered_logs: list
+    harq_stats:     list
+    handovers:      list           # (slot, ue, celula_sursă, celula_țintă)
+    cell_load:      np.ndarray     # gradul mediu de ocupare PRB per celulă [0, 1]
+    n_workers:      int
+
+
+# ────────────────────────────────────────────────────────────
+#    STAREA DE MOBILITATE ÎN MEMORIA PARTAJATĂ
+# ────────────────────────────────────────────────────────────
+
+def _state_columns(state: dict) -> list:
+    # (cheie, prima coloană, lățime) pentru fiecare tablou de stare al motorului
+    cols, start = [], 0
+    for key, arr in state.items():
+        width = 1 if arr.ndim == 1 else arr.shape[1]
+        cols.append((key, start, width))
+        start += width
+    return cols
+
+
+def _gather_state(block: np.ndarray, cols: list, ue_ids: np.ndarray) -> dict:
+    return {key: block[ue_ids, s] if w == 1 else block[ue_ids, s:s + w] for key, s, w in cols}
+
+
+def _scatter_state(block: np.ndarray, cols: list, ue_ids: np.ndarray, state: dict):
+    for key, s, w in cols:
+        if w == 1:
+            block[ue_ids, s] = state[key]
+        else:
+            block[ue_ids, s:s + w] = state[key]
+
+
+# ────────────────────────────────────────────────────────────
+#    SHARD: UN SUBSET DE CELULE SIMULAT ÎNTR-UN PROCES
+# ────────────────────────────────────────────────────────────
+
+class CellShard:
+    """
+    Simulează celulele `cells` și UE-urile deservite de ele.
+    Interferența provine din gradul de ocupare PRB al tuturor celulelor
+    în slotul precedent (citit din memoria partajată).
+
+    Fiecare shard mișcă doar UE-urile proprii. Starea lor de mobilitate e
+    scrisă la fiecare slot în blocul partajat `mobility_block` (un rând per
+    ID de UE, coloanele din `mobility_cols`), de unde shard-ul țintă o
+    preia la handover.
+
+    Niciun flux aleator nu depinde de împărțirea pe workeri: extragerile
+    mobilității sunt indexate după (UE, tick) prin KeyedRng, traficul vine
+    gata generat din procesul părinte, iar canalul și testele BLER folosesc
+    realizările per (UE, slot) din ChannelRealizations.
+    """
+
+    def __init__(self, wid, cells, cell_owner, layout, cfg, ue_ids, ue_serving, n_total,
+                 mobility_block, mobility_cols, mobility_key, traffic, periods, seed):
+        self.wid        = wid
+        self.cells      = list(cells)
+        self.cell_owner = cell_owner
+        self.layout     = layout
+        self.cfg        = cfg
+
+        self.fp        = cfg.frame
+        self.total_prbs = cfg.total_prbs
+        # puterea medie transmisă per PRB de fiecare celulă (dBm)
+        self.p_prb_dbm = cfg.prb_tx_dbm[self.total_prbs]
+
+        # starea UE-urilor locale: ID-uri (sortate) și celula de deservire; motorul
+        # de mobilitate ține doar aceste UE-uri, în aceeași ordine
+        self.ue_ids    = np.asarray(ue_ids, dtype=np.int64)
+        self.serving   = np.asarray(ue_serving, dtype=np.int64)
+        self.mob_block = mobility_block
+        self.mob_cols  = mobility_cols
+        state = _gather_state(mobility_block, mobility_cols, self.ue_ids)
+        self.mobility = MobilityEngine(make_mobility_model(cfg), state.pop("xy"), state.pop("speed"),
+                                       state.pop("heading"), layout.radius_m, KeyedRng(mobility_key),
+                                       ue_ids=self.ue_ids, extra_state=state)
+        self.crn = ChannelRealizations(n_total, cfg["crn_seed"] if cfg["crn_seed"] is not None
+                                       else np.random.SeedSequence([seed, 2]).generate_state(1)[0])
+
+        self.tm = TrafficManager(len(ue_ids), cfg["traffic_type"], cfg, ue_ids=list(ue_ids))
+        self.tm.buffers       = {ue: traffic[ue] for ue in self.tm.buffers}
+        self.tm.ue_periods_ms = {ue: periods[ue] for ue in self.tm.buffers if ue in periods}
+        self.hm = HarqManager(len(ue_ids), self.fp.symbol_duration_us / 1000.0,
+                              self.fp.num_symbols_per_slot, cfg.slot_ms, cfg)
+        self.arrival_times = {}
+
+        # ocaziile de transmisie ale slotului (slot complet sau mini-sloturi consecutive)
+        self.occasions = build_occasions(cfg, self.fp.num_symbols_per_slot)
+        self.edf = EdfScheduler.from_config(cfg) if cfg["scheduler_mode"] in EDF_MODES else None
+
+        # rezultate
+        self.latencies, self.res_ues, self.res_cells = [], [], []
+        self.res_slots, self.first_tx, self.delivered_logs = [], [], []
+        self.handovers = []
+        self.load_sum  = {c: 0.0 for c in self.cells}
+
+    # ── migrarea UE-urilor către alt shard (handover inter-proces) ──
+    def export_ues(self, mask):
+        # starea de mobilitate rămâne în blocul partajat, scrisă în acest slot
+        self.mobility.remove(mask)
+        out = []
+        for i in np.flatnonzero(mask):
+            ue = int(self.ue_ids[i])
+            out.append({
+                "ue":       ue,
+                "serving":  int(self.serving[i]),
+                "buffer":   self.tm.buffers.pop(ue),
+                "arrival":  self.arrival_times.pop(ue, None),
+            })
+        self.ue_ids, self.serving = self.ue_ids[~mask], self.serving[~mask]
+        return out
+
+    def import_ues(self, states):
+        if not states:
+            return
+        # păstrăm ordinea după ID, ca ordinea de scheduling să nu depindă de shard
+        new_ids = np.array([s["ue"] for s in states], dtype=np.int64)
+        ue_ids  = np.concatenate([self.ue_ids,  new_ids])
+        serving = np.concatenate([self.serving, [s["serving"] for s in states]])
+        order   = np.argsort(ue_ids, kind="stable")
+        self.ue_ids, self.serving = ue_ids[order], serving[order]
+        self.mobility.add(_gather_state(self.mob_block, self.mob_cols, new_ids), new_ids)
+        for s in states:
+            self.tm.buffers[s["ue"]] = s["buffer"]
+            if s["arrival"] is not None:
+                self.arrival_times[s["ue"]] = s["arrival"]
+
+    def step(self, slot, load_prev):
+        """
+        Un slot complet pentru celulele locale. Returnează
+        (ocuparea PRB per celulă locală, listă de UE-uri de migrat per shard țintă).
+        """
+        cfg, fp = self.cfg, self.fp
+        # 0) Mobilitatea UE-urilor proprii; starea lor e publicată pentru
+        #    shard-ul care le preia dacă pleacă la sfârșitul slotului
+        self.mobility.step(fp.slot_duration_us / 1e6)
+        _scatter_state(self.mob_block, self.mob_cols, self.ue_ids, self.mobility.state)
+        draws = self.crn.at(slot)
+
+        # 1) Câștiguri către toate celulele și RSRP per PRB
+        dist, gain = link_gains_db(self.mobility.xy, self.layout)
+        rx_dbm = self.p_prb_dbm + gain
+        rows   = np.arange(len(self.ue_ids))
+
+        # 2) Handover: cea mai bună celulă depășește celula curentă cu histerezis
+        #    (amânăm handover-ul cât timp UE-ul are un proces HARQ activ)
+        best = np.argmax(rx_dbm, axis=1) if len(rows) else np.zeros(0, dtype=np.int64)
+        ho = (best != self.serving) & (rx_dbm[rows, best] > rx_dbm[rows, self.serving] + HANDOVER_HYSTERESIS_DB)
+        if ho.any():
+            for i in np.flatnonzero(ho):
+                ue = int(self.ue_ids[i])
+                if ue in self.hm.active:
+                    ho[i] = False
+                    continue
+                self.handovers.append((slot, ue, int(self.serving[i]), int(best[i])))
+            self.serving[ho] = best[ho]
+
+        # 3) Interferența: suma puterilor celulelor vecine ponderată cu ocuparea lor
+        rx_mw = 10 ** (rx_dbm / 10.0) * load_prev[None, :]
+        rx_mw[rows, self.serving] = 0.0
+        interf_mw = rx_mw.sum(axis=1)
+
+        serving_dist = dist[rows, self.serving]
+        ue_dist  = dict(zip(self.ue_ids.tolist(), serving_dist.tolist()))
+        ue_inter = dict(zip(self.ue_ids.tolist(), interf_mw.tolist()))
+        # UE-urile cu handover în acest slot sunt deservite de noua celulă abia din
+        # slotul următor (altfel ar conta dacă celula țintă e în același shard)
+        members  = {c: [] for c in self.cells}
+        for ue, c, moved in zip(self.ue_ids.tolist(), self.serving.tolist(), ho.tolist()):
+            if c in members and not moved:
+                members[c].append(ue)
+
+        # 4) Scheduling și transmisie, celulă cu celulă
+        load_now = {}
+        for cell in self.cells:
+            bufs  = {ue: self.tm.buffers[ue] for ue in members[cell]}
+            used  = 0
+            for occ in self.occasions:
+                dur_us = occ.n_sym * fp.symbol_duration_us
+                now_ms = (slot * fp.slot_duration_us
+                          + (occ.start_sym + occ.n_sym) * fp.symbol_duration_us) / 1000.0
+                alloc = allocate_rb(bufs, ue_dist, self.total_prbs, fp, cfg["scheduler_mode"],
+                                    edf=self.edf, now_ms=now_ms, n_sym=occ.n_sym, cfg=cfg,
+                                    draws=draws)
+                for ue, n_prbs in alloc.items():
+                    buf = bufs[ue]
+                    if n_prbs == 0 or not buf or buf[0]["time_ms"] > now_ms:
+                        continue
+                    used += n_prbs
+                    ev = self.tm.pop_packet(ue)
+                    prepare_packet(ev, ue, self.arrival_times)
+
+                    out = transmit_packet(ev, ue, slot, n_prbs, dur_us, occ.n_sym, ue_dist[ue],
+                                          fp.scs_khz, cfg, self.tm, self.hm, self.arrival_times,
+                                          interference_mw=ue_inter[ue], draws=draws)
+                    if out is not None:
+                        latency, record = out
+                        record["cell"] = cell
+                        self.latencies.append(latency)
+                        self.res_ues.append(ue)
+                        self.res_cells.append(cell)
+                        self.res_slots.append(slot)
+                        self.first_tx.append(record["first_tx"])
+                        self.delivered_logs.append(record)
+            load_now[cell] = min(used / (self.total_prbs * len(self.occasions)), 1.0)
+            self.load_sum[cell] += load_now[cell]
+
+        # 5) Feedback HARQ cu SINR care include interferența
+        self.hm.check_feedback(slot, ue_dist, cfg["bandwidth_mhz"], fp.scs_khz,
+                               self.tm.buffers, self.arrival_times, interference=ue_inter, draws=draws)
+
+        # 6) UE-urile a căror celulă de deservire aparține altui shard pleacă
+        owner = self.cell_owner[self.serving]
+        leaving = owner != self.wid
+        outgoing = {}
+        if leaving.any():
+            for state in self.export_ues(leaving):
+                outgoing.setdefault(int(self.cell_owner[state["serving"]]), []).append(state)
+        return load_now, outgoing
+
+    def result(self):
+        return {
+            "latencies":      self.latencies,
+            "ue_ids":         self.res_ues,
+            "cell_ids":       self.res_cells,
+            "slot_indices":   self.res_slots,
+            "first_tx":       self.first_tx,
+            "delivered_logs": self.delivered_logs,
+            "harq_stats":     self.hm.get_latency_stats(),
+            "handovers":      self.handovers,
+            "load_sum":       self.load_sum,
+        }
+
+
+# ────────────────────────────────────────────────────────────
+#    PROCESUL WORKER: BUCLA PE SLOTURI CU SCHIMB PRIN MEMORIE PARTAJATĂ
+# ────────────────────────────────────────────────────────────
+
+def _shard_main(wid, n_workers, shard_kwargs, n_cells, total_slots,
+                load_name, count_name, mobility_name, barrier, queues, result_queue):
+    """
+    Rulează un shard pe toate sloturile. Memoria partajată conține:
+      - load[2, n_cells]: ocuparea PRB per celulă (dublu buffer după paritatea slotului)
+      - counts[2, W, W]:  câte UE-uri migrează de la shard-ul i la j în slotul curent
+      - mobility[n_ues, k]: starea de mobilitate a fiecărui UE, scrisă de shard-ul
+        care îl deservește (un singur scriitor per rând)
+    O singură barieră per slot separă scrierile slotului s de citirile din s+1.
+    """
+    load_shm  = shared_memory.SharedMemory(name=load_name)
+    count_shm = shared_memory.SharedMemory(name=count_name)
+    mob_shm   = shared_memory.SharedMemory(name=mobility_name)
+    try:
+        load   = np.ndarray((2, n_cells), dtype=np.float64, buffer=load_shm.buf)
+        counts = np.ndarray((2, n_workers, n_workers), dtype=np.int64, buffer=count_shm.buf)
+        width  = sum(w for _, _, w in shard_kwargs["mobility_cols"])
+        mob    = np.ndarray((shard_kwargs["n_total"], width), dtype=np.float64, buffer=mob_shm.buf)
+        shard  = CellShard(wid, mobility_block=mob, **shard_kwargs)
+
+        for slot in range(total_slots):
+            cur, prev = slot % 2, (slot - 1) % 2
+
+            # 1) Primim UE-urile migrate în slotul anterior
+            if slot > 0:
+                n_in = int(counts[prev, :, wid].sum())
+                shard.import_ues([queues[wid].get() for _ in range(n_in)])
+
+            # 2) Simulăm slotul cu ocuparea vecinilor din slotul anterior
+            load_prev = load[prev].copy() if slot > 0 else np.zeros(n_cells)
+            load_now, outgoing = shard.step(slot, load_prev)
+
+            # 3) Publicăm ocuparea proprie și trimitem UE-urile care pleacă
+            for cell, val in load_now.items():
+                load[cur, cell] = val
+            counts[cur, wid, :] = 0
+            for dst, states in outgoing.items():
+                counts[cur, wid, dst] = len(states)
+                for st in states:
+                    queues[dst].put(st)
+            barrier.wait()
+
+        # UE-urile migrate în ultimul slot nu mai sunt simulate, dar golim coada
+        n_in = int(counts[(total_slots - 1) % 2, :, wid].sum()) if total_slots else 0
+        for _ in range(n_in):
+            queues[wid].get()
+
+        res = shard.result()
+        res["wid"] = wid
+        result_queue.put(res)
+    except Exception as exc:
+        # deblocăm ceilalți workeri și raportăm eroarea procesului părinte
+        barrier.abort()
+        result_queue.put({"wid": wid, "error": f"{type(exc).__name__}: {exc}"})
+    finally:
+        load_shm.close()
+        count_shm.close()
+        mob_shm.close()
+
+
+# ────────────────────────────────────────────────────────────
+#    FUNCȚIA PRINCIPALĂ DE SIMULARE MULTI-CELULĂ
+# ────────────────────────────────────────────────────────────
+
+def run_multicell(params: dict = None) -> MultiCellResult:
+    """
+    Simulează un cluster de celule cu interferență inter-celulă și handover.
+    Parametri suplimentari față de run_scenario:
+      - 'n_cells':       7, 19, 37 (omni) sau 21, 57 (tri-sectorizat)
+      - 'isd_m':         distanța dintre site-uri (implicit 500 m)
+      - 'ues_per_cell':  UE-uri per celulă (implicit 'n_ues')
+      - 'n_workers':     procese worker; celulele se împart în blocuri contigue
+      - 'seed':          sămânța RNG (opțional)
+    Modul de scheduling trebuie să fie 'dynamic' sau 'semi-persistent'.
+    Cu aceeași sămânță rezultatul nu depinde de n_workers.
+    """
+    cfg = compile_config(params)
+    if cfg["scheduler_mode"] == "slice":
+        raise ValueError("run_multicell suportă doar modurile 'dynamic' și 'semi-persistent'")
+
+    n_cells   = cfg.get("n_cells", 7)
+    layout    = build_cluster(n_cells, cfg.get("isd_m", 500.0))
+    n_workers = max(1, min(cfg.get("n_workers") or os.cpu_count() or 1, n_cells))
+    # fără sămânță alegem una aici, ca toate shard-urile să pornească din aceeași
+    seed      = np.random.SeedSequence(cfg.get("seed")).entropy
+    rng       = np.random.default_rng(seed)
+
+    # 1) Poziții inițiale: uniform în jurul unui site ales aleator
+    n_total = cfg.get("ues_per_cell", cfg["n_ues"]) * n_cells
+    site    = rng.integers(0, len(layout.site_xy), n_total)
+    r       = (layout.isd_m / math.sqrt(3)) * np.sqrt(rng.random(n_total))
+    phi     = rng.random(n_total) * 2 * math.pi
+    ue_xy   = layout.site_xy[site] + np.column_stack([r * np.cos(phi), r * np.sin(phi)])
+    heading = init_headings(n_total, rng)
+    speed   = init_speeds(n_total, rng)
+    _, gain = link_gains_db(ue_xy, layout)
+    serving = np.argmax(gain, axis=1)
+
+    # Starea de mobilitate inițială (inclusiv cea a modelului, ex. destinațiile
+    # random waypoint), cu extrageri indexate după UE; shard-urile o preiau din
+    # memoria partajată
+    mob_key  = np.random.SeedSequence([seed, 1]).generate_state(1, np.uint64)[0]
+    mobility = MobilityEngine(make_mobility_model(cfg), ue_xy, speed, heading, layout.radius_m,
+                              KeyedRng(mob_key), ue_ids=np.arange(n_total))
+    mob_cols = _state_columns(mobility.state)
+
+    # Traficul tuturor UE-urilor, generat o singură dată; shard-urile primesc buffer-ele
+    random.seed(seed)
+    tm = TrafficManager(n_total, cfg["traffic_type"], cfg)
+    tm.initialize()
+
+    # 2) Împărțim celulele între workeri și UE-urile după celula de deservire
+    shards     = np.array_split(np.arange(n_cells), n_workers)
+    cell_owner = np.empty(n_cells, dtype=np.int64)
+    for wid, cells in enumerate(shards):
+        cell_owner[cells] = wid
+    ue_owner = cell_owner[serving]
+
+    total_slots = cfg.total_slots
+
+    def kwargs_for(wid):
+        idx = np.flatnonzero(ue_owner == wid)
+        return {
+            "cells":      shards[wid].tolist(),
+            "cell_owner": cell_owner,
+            "layout":     layout,
+            "cfg":        cfg,
+            "ue_ids":        idx.tolist(),
+            "ue_serving":    serving[idx],
+            "n_total":       n_total,
+            "mobility_cols": mob_cols,
+            "mobility_key":  mob_key,
+            "traffic":       {ue: tm.buffers[ue] for ue in idx.tolist()},
+            "periods":    tm.ue_periods_ms,
+            "seed":       seed,
+        }
+
+    # 3) Memoria partajată pentru schimbul de stare la fiecare slot
+    ctx = mp.get_context()
+    width     = sum(w for _, _, w in mob_cols)
+    load_shm  = shared_memory.SharedMemory(create=True, size=2 * n_cells * 8)
+    count_shm = shared_memory.SharedMemory(create=True, size=2 * n_workers * n_workers * 8)
+    mob_shm   = shared_memory.SharedMemory(create=True, size=n_total * width * 8)
+    try:
+        np.ndarray((2, n_cells), dtype=np.float64, buffer=load_shm.buf)[:] = 0.0
+        np.ndarray((2, n_workers, n_workers), dtype=np.int64, buffer=count_shm.buf)[:] = 0
+        _scatter_state(np.ndarray((n_total, width), dtype=np.float64, buffer=mob_shm.buf),
+                       mob_cols, np.arange(n_total), mobility.state)
+        barrier      = ctx.Barrier(n_workers)
+        queues       = [ctx.Queue() for _ in range(n_workers)]
+        result_queue = ctx.Queue()
+
+        if n_workers == 1:
+            _shard_main(0, n_workers, kwargs_for(0), n_cells, total_slots,
+                        load_shm.name, count_shm.name, mob_shm.name, barrier, queues, result_queue)
+            results = [result_queue.get()]
+        else:
+            procs = [
+                ctx.Process(target=_shard_main,
+                            args=(wid, n_workers, kwargs_for(wid), n_cells, total_slots,
+                                  load_shm.name, count_shm.name, mob_shm.name, barrier, queues,
+                                  result_queue))
+                for wid in range(n_workers)
+            ]
+            for p in procs:
+                p.start()
+            # colectăm rezultatele înainte de join, ca să nu blocăm pe coada plină
+            results = [result_queue.get() for _ in procs]
+            for p in procs:
+                p.join()
+    finally:
+        load_shm.close()
+        load_shm.unlink()
+        count_shm.close()
+        count_shm.unlink()
+        mob_shm.close()
+        mob_shm.unlink()
+
+    # 4) Combinăm rezultatele shard-urilor (ordonate după wid pentru determinism)
+    errors = [res["error"] for res in results if "error" in res]
+    if errors:
+        raise RuntimeError("simularea multi-celulă a eșuat: " + "; ".join(errors))
+    results.sort(key=lambda res: res["wid"])
+    merged = {k: [] for k in ("latencies", "ue_ids", "cell_ids", "slot_indices", "first_tx",
+                              "delivered_logs", "harq_stats", "handovers")}
+    cell_load = np.zeros(n_cells)
+    for res in results:
+        for k in merged:
+            merged[k].extend(res[k])
+        for cell, total in res["load_sum"].items():
+            cell_load[cell] = total / max(total_slots, 1)
+    merged["handovers"].sort()
+
+    return MultiCellResult(cell_load=cell_load, n_workers=n_workers, **merged)
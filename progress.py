@@ -0,0 +1,99 @@
+# simulator/progress.py
+
+import math
+import time
+
+import numpy as np
+
+# ────────────────────────────────────────────────────────────
+#    HISTOGRAMĂ DE LATENȚĂ PENTRU PERCENTILE ÎN TIMP REAL
+# ────────────────────────────────────────────────────────────
+
+class LatencyHistogram:
+    """
+    Histogramă cu bin-uri logaritmice (10 µs … 100 s, ~1% lățime relativă):
+    add() costă O(1), iar percentilele se citesc în O(bin-uri), indiferent
+    de câte pachete au fost livrate.
+    """
+
+    LOW_MS, HIGH_MS, PER_DECADE = 0.01, 1e5, 240
+
+    def __init__(self):
+        self.n_bins = int(math.log10(self.HIGH_MS / self.LOW_MS) * self.PER_DECADE) + 2
+        self.counts = np.zeros(self.n_bins, dtype=np.int64)
+        self.total  = 0
+        self._scale = self.PER_DECADE / math.log(10)
+
+    def add(self, latency_ms: float):
+        if latency_ms <= self.LOW_MS:
+            i = 0
+        else:
+            i = min(int(math.log(latency_ms / self.LOW_MS) * self._scale) + 1, self.n_bins - 1)
+        self.counts[i] += 1
+        self.total += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.total:
+            return math.nan
+        i = int(np.searchsorted(np.cumsum(self.counts), math.ceil(q / 100.0 * self.total)))
+        # mijlocul geometric al bin-ului i
+        return self.LOW_MS * 10 ** ((i - 0.5) / self.PER_DECADE) if i else self.LOW_MS
+
+
+# ────────────────────────────────────────────────────────────
+#    INSTANTANEE PERIODICE ALE UNEI SIMULĂRI ÎN CURS
+# ────────────────────────────────────────────────────────────
+
+class ProgressReporter:
+    """
+    Strânge contoare ieftine slot cu slot și apelează callback(snapshot)
+    cel mult o dată la interval_s secunde. Ceasul e citit doar la fiecare
+    `check_every_slots` sloturi, deci costul per slot rămâne neglijabil.
+    Snapshot-ul e un dict JSON-serializabil: slot, timp simulat, pachete
+    livrate, percentilele latenței, utilizarea PRB din ultima fereastră.
+    """
+
+    def __init__(self, callback, interval_s: float = 0.5, check_every_slots: int = 16,
+                 percentiles=(50, 95, 99)):
+        self.callback          = callback
+        self.interval_s        = interval_s
+        self.check_every_slots = max(1, int(check_every_slots))
+        self.percentiles       = tuple(percentiles)
+        self.histogram         = LatencyHistogram()
+        self._t0 = self._last  = time.perf_counter()
+        self._util_sum         = 0.0
+        self._util_slots       = 0
+
+    def on_delivery(self, latency_ms: float):
+        self.histogram.add(latency_ms)
+
+    def end_slot(self, sim, utilization: float):
+        self._util_sum   += utilization
+        self._util_slots += 1
+        if sim.slot % self.check_every_slots:
+            return
+        now = time.perf_counter()
+        if now - self._last >= self.interval_s:
+            self._last = now
+            self.callback(self.snapshot(sim))
+
+    def snapshot(self, sim, done: bool = False) -> dict:
+        slot_ms = sim.fp.slot_duration_us / 1000.0
+        snap = {
+            "slot":            sim.slot,
+            "total_slots":     sim.total_slots,
+            "progress":        round(sim.slot / sim.total_slots, 4) if sim.total_slots else 1.0,
+            "sim_time_ms":     round(sim.slot * slot_ms, 3),
+            "delivered":       self.histogram.total,
+            "prb_utilization": round(self._util_sum / self._util_slots, 4) if self._util_slots else 0.0,
+            "wall_s":          round(time.perf_counter() - self._t0, 3),
+            "done":            done,
+        }
+        for q in self.percentiles:
+            v = self.histogram.percentile(q)
+            snap[f"p{q:g}_ms"] = None if math.isnan(v) else round(v, 3)
+        self._util_sum, self._util_slots = 0.0, 0
+        return snap
+
+    def finish(self, sim):
+        self.callback(self.snapshot(sim, done=True))
@@ -0,0 +1,393 @@
+# simulator/queueing.py
+
+import math
+from dataclasses import dataclass, field
+from statistics import NormalDist
+
+import numpy as np
+
+from simulator.config import HARQ_MAX_ROUNDS, MCS_TABLE, slice_profiles
+from simulator.channel import SIGMA_SHADOW_DB, pathloss_db_array, sinr_to_cqi_array
+from simulator.link_adaptation import select_mcs
+from simulator.rb import compute_tbs
+from simulator.resource_grid import build_occasions
+from simulator.scheduler import split_slice_prbs
+from simulator.simconfig import compile_config
+
+# ────────────────────────────────────────────────────────────
+#    ESTIMAREA ANALITICĂ A COZII ÎNAINTE DE SIMULARE
+# ────────────────────────────────────────────────────────────
+# Fiecare grup de UE-uri (celula întreagă sau un slice) e tratat ca o coadă
+# M/G/1 cu server-ul = PRB-urile grupului. Un „client” e o sosire: un pachet
+# (periodic, poisson, on_off), un fișier (ftp3) sau un cadru (xr), cu toate
+# segmentele MTU sosite deodată. Un grant servește un singur pachet, deci un
+# pachet de b biți ocupă ceil(b / TBS_1PRB) PRB-uri dintr-o ocazie (compute_tbs
+# la MCS-ul UE-ului), iar timpul de serviciu al clientului e T × PRB-urile lui
+# × durata unui PRB-ocazie a server-ului, cu T = numărul de transmisii HARQ.
+# Distribuția MCS-ului și a BLER-ului vine dintr-o cuadratură fixă peste
+# poziția în celulă, shadowing și fading, cu aceleași formule ca
+# transmit_packet; rundele HARQ sunt independente, cu BLER-ul mediu.
+# Așteptarea în coadă e Pollaczek-Khinchine (M/G/1), iar varianta M/D/1
+# (serviciu constant, egal cu media) e dată ca referință.
+#
+# Latența raportată de simulare (latency_ms) adună doar componentele fixe
+# (SR, grant, transmisie, procesare, HARQ, propagare) = overhead_us; timpul
+# petrecut în buffer nu intră în ea, ci apare ca backlog (capacity.probe
+# numără pachetele vechi din buffer ca depășiri). delay_us = wait_us +
+# overhead_us e întârzierea reală a unui pachet.
+#
+# Aproximări: superpoziția surselor periodice e tratată ca Poisson (estimare
+# pesimistă pentru puțini UE-i), canalul selectiv în frecvență ca wideband,
+# granturile SPS ca dinamice, iar perforarea eMBB de către URLLC e ignorată.
+
+N_SAMPLES         = 4096       # punctele cuadraturii canalului
+QUADRATURE_SEED   = 0          # cuadratura e deterministă: aceeași estimare la fiecare apel
+MIN_TAIL_SAMPLES  = 100        # pachete peste percentilă dorite în fereastra de măsură
+RELAXATION_WARMUP = 5.0        # warm-up-ul recomandat, în timpi de relaxare
+RELAXATION_WINDOW = 100.0      # fereastra minimă de măsură (≈ 20 de loturi de 5 relaxări)
+SPEED_OF_LIGHT    = 3e8
+
+
+@dataclass
+class GroupEstimate:
+    group:          str
+    n_ues:          int
+    server_prbs:    int
+    grant_prbs:     int            # PRB-urile unui grant tipic (server / UE-uri cu backlog)
+    arrivals_per_ms: float         # clienți pe ms (pachete / fișiere / cadre)
+    packets_per_ms: float
+    load:           float          # ρ = λ · E[S]
+    service_us:     float          # E[S]
+    service_scv:    float          # coeficientul de variație pătratic al lui S
+    wait_us:        float          # M/G/1 (Pollaczek-Khinchine); inf la ρ ≥ 1
+    wait_md1_us:    float          # M/D/1, serviciu constant E[S]
+    wait_var_us2:   float          # Var(W)
+    overhead_us:    float          # media latenței raportate de simulare (fără așteptare)
+    budget_us:      float          # delay_budget_ms al grupului
+    first_tx_ratio: float          # 1 − BLER mediu la prima transmisie
+    relaxation_us:  float          # timpul de relaxare al cozii (inf la ρ ≥ 1)
+    base_us:        float = 0.0    # overhead-ul fără retransmisii
+    harq_step_us:   float = 0.0    # feedback + retransmisie, per rundă HARQ
+    harq_pmf:       tuple = ()     # P(T = k) transmisii, k = 1..HARQ_MAX_ROUNDS
+
+    @property
+    def overloaded(self) -> bool:
+        return self.load >= 1.0
+
+    @property
+    def delay_us(self) -> float:
+        return self.wait_us + self.overhead_us
+
+    def exceed_prob(self, t_us: float) -> float:
+        """
+        P(întârziere > t_us): așteptarea are atomul 1 − ρ în zero și o coadă
+        exponențială cu media condiționată E[W] / ρ; la ea se adaugă
+        overhead-ul fiecărui număr de transmisii HARQ.
+        """
+        if self.overloaded:
+            return 1.0
+        p = 0.0
+        for k, pk in enumerate(self.harq_pmf):
+            t = t_us - self.base_us - k * self.harq_step_us
+            if t < 0.0:
+                p += pk
+            elif self.wait_us > 0.0:
+                p += pk * self.load * math.exp(-self.load * t / self.wait_us)
+        return min(1.0, p)
+
+    @property
+    def tail_risk(self) -> float:
+        # Probabilitatea de a depăși bugetul de întârziere al grupului
+        return self.exceed_prob(self.budget_us)
+
+    def percentile_us(self, percentile: float) -> float:
+        # Percentila întârzierii (bisecție pe exceed_prob); inf la suprasarcină
+        target = 1.0 - percentile / 100.0
+        if self.overloaded:
+            return math.inf
+        lo, hi = 0.0, self.base_us + len(self.harq_pmf) * self.harq_step_us + 1.0
+        while self.exceed_prob(hi) > target:
+            hi *= 2.0
+        for _ in range(60):
+            mid = 0.5 * (lo + hi)
+            if self.exceed_prob(mid) > target:
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+
+@dataclass
+class QueueEstimate:
+    groups:          list = field(default_factory=list)   # GroupEstimate per celulă / slice
+    percentile:      float = 99.0
+    sim_time_ms:     float = math.nan   # durata recomandată (warm-up + măsură)
+    warmup_slots:    int = 0
+    replications:    int = 0
+    slot_ms:         float = 0.0
+
+    @property
+    def load(self) -> float:
+        # Cea mai mare încărcare dintre grupuri
+        return max((g.load for g in self.groups), default=0.0)
+
+    @property
+    def overloaded(self) -> bool:
+        return any(g.overloaded for g in self.groups)
+
+    def recommended(self) -> dict:
+        # Suprascrierile pentru run_scenario / run_adaptive (gol la suprasarcină)
+        if self.overloaded:
+            return {}
+        return {"sim_time_ms": self.sim_time_ms}
+
+    def format(self) -> str:
+        lines = []
+        for g in self.groups:
+            if g.overloaded:
+                lines.append(f"{g.group:<8} ρ={g.load:.3f}  SUPRASARCINĂ  ({g.n_ues} UE, {g.server_prbs} PRB, "
+                             f"{g.arrivals_per_ms:.3f} sosiri/ms, E[S]={g.service_us:.1f} µs)")
+                continue
+            lines.append(f"{g.group:<8} ρ={g.load:.3f}  E[S]={g.service_us:.1f} µs  "
+                         f"W={g.wait_us:.1f} µs (M/D/1 {g.wait_md1_us:.1f})  "
+                         f"overhead={g.overhead_us:.1f} µs  "
+                         f"P{self.percentile:g}={g.percentile_us(self.percentile):.1f} µs  "
+                         f"P(>{g.budget_us:g} µs)={g.tail_risk:.2e}  first_tx={g.first_tx_ratio:.2f}")
+        if self.overloaded:
+            lines.append("suprasarcină: nicio recomandare (coada crește fără limită)")
+        else:
+            lines.append(f"recomandare: sim_time_ms={self.sim_time_ms:g} "
+                         f"(warm-up {self.warmup_slots} sloturi), {self.replications} replicări")
+        return "\n".join(lines)
+
+
+# ────────────────────────────────────────────────────────────
+#    TRAFICUL OFERIT
+# ────────────────────────────────────────────────────────────
+
+def _offered(cfg, ue: int, size) -> tuple:
+    """
+    Sursa unui UE: (clienți pe ms, pachete per client, biții medii ai unui
+    client b̄, E[b²] / b̄², E[b³] / b̄³). Variațiile ±spread uniforme per UE
+    sunt mediate.
+    """
+    traffic = cfg["traffic_type"]
+    if traffic == "periodic":
+        p = cfg["period_spread_pct"]
+        scale = math.log((1.0 + p) / (1.0 - p)) / (2.0 * p) if 0.0 < p < 1.0 else 1.0
+        return scale / cfg["period_ms"], 1, size, 1.0, 1.0
+    if traffic in ("aperiodic", "poisson"):
+        return cfg["lambda_per_ms"], 1, size, 1.0, 1.0
+    if traffic == "on_off":
+        duty = cfg["on_ms"] / (cfg["on_ms"] + cfg["off_ms"])
+        return cfg["on_rate_per_ms"] * duty, 1, size, 1.0, 1.0
+    if traffic == "ftp3":
+        b = cfg["ftp_file_bits"]
+        return cfg["ftp_lambda_per_ms"], math.ceil(b / cfg["mtu_bits"]), b, 1.0, 1.0
+    if traffic == "xr":
+        m  = cfg["xr_rate_mbps"] * 1e3 / cfg["xr_fps"]
+        cv = cfg["xr_size_std_pct"]
+        return cfg["xr_fps"] / 1000.0, math.ceil(m / cfg["mtu_bits"]), m, 1.0 + cv ** 2, 1.0 + 3 * cv ** 2
+    raise ValueError(f"estimarea analitică nu acoperă traffic_type={traffic!r}")
+
+
+def _size_of(cfg, ue: int) -> int:
+    size = cfg["packet_size_bits"]
+    return int(size.get(ue, 0)) if isinstance(size, dict) else int(size)
+
+
+# ────────────────────────────────────────────────────────────
+#    CANALUL: DISTRIBUȚIA MCS-ULUI ȘI A BLER-ULUI
+# ────────────────────────────────────────────────────────────
+
+class _Quadrature:
+    # Realizări fixe ale poziției, shadowing-ului și fading-ului, ca în transmit_packet
+
+    def __init__(self, cfg):
+        rng = np.random.default_rng(QUADRATURE_SEED)
+        n = N_SAMPLES
+        self.distance_m = cfg.get("cell_radius", 500) * np.sqrt(rng.random(n))
+        loss = pathloss_db_array(self.distance_m) + rng.normal(0.0, SIGMA_SHADOW_DB, n)
+        if cfg["channel_model"] == "wideband":
+            loss += 10 * np.log10(rng.exponential(1.0, n) + 1e-12)
+        loss += rng.normal(0.0, cfg["shadow_sigma_db"], n)
+        if cfg["fast_fading"]:
+            loss -= 10 * np.log10(np.abs(rng.normal(0.0, 1.0, n)) + 1e-12)
+        self.loss_db = loss
+
+    def link(self, cfg, n_prbs: int) -> tuple:
+        # (indicele MCS, BLER) per realizare pentru un grant de n_prbs PRB-uri
+        sinr_db = cfg.prb_tx_dbm[n_prbs] - cfg.noise_floor_dbm[n_prbs] - self.loss_db
+        mcs = np.clip(sinr_to_cqi_array(sinr_db), min(MCS_TABLE), max(MCS_TABLE)).astype(np.int64)
+        bler = np.minimum(1.0, np.exp(-0.5 * (sinr_db - 5.0 * mcs)))
+        return mcs, bler
+
+
+def _harq_pmf(bler: float) -> np.ndarray:
+    # P(T = k), k = 1..HARQ_MAX_ROUNDS: fiecare rundă vede un canal nou (eșec cu BLER-ul
+    # mediu), iar ultima rundă permisă încheie pachetul
+    pmf = bler ** np.arange(HARQ_MAX_ROUNDS) * (1.0 - bler)
+    pmf[-1] = bler ** (HARQ_MAX_ROUNDS - 1)
+    return pmf
+
+
+# ────────────────────────────────────────────────────────────
+#    COADA UNUI GRUP
+# ────────────────────────────────────────────────────────────
+
+def _group(cfg, quad, name, ues, server_prbs, n_syms, budget_ms) -> GroupEstimate:
+    slot_us = cfg.frame.slot_duration_us
+    sources = {}
+    for ue in ues:
+        rate, n_pkt, bits, r2, r3 = _offered(cfg, ue, _size_of(cfg, ue))
+        key = (n_pkt, bits, r2, r3)
+        sources[key] = sources.get(key, 0.0) + rate
+    lam_ms   = sum(sources.values())
+    pkts_ms  = sum(rate * key[0] for key, rate in sources.items())
+    pkt_bits = sum(rate * key[1] for key, rate in sources.items()) / pkts_ms if pkts_ms > 0 else 0.0
+
+    # biții unui PRB în fiecare ocazie a slotului, per indice MCS: un grant
+    # servește un singur pachet, deci un pachet ocupă ceil(biți / TBS_1PRB) PRB-uri
+    tbs1 = np.array([[compute_tbs(1, select_mcs(m), n) for n in n_syms]
+                     for m in sorted(MCS_TABLE)], dtype=float).reshape(len(MCS_TABLE), len(n_syms))
+    se   = np.array([MCS_TABLE[m][0] * MCS_TABLE[m][1] for m in sorted(MCS_TABLE)])
+    k    = np.arange(1, HARQ_MAX_ROUNDS + 1, dtype=float)
+
+    def demand_us(n_pkt, bits, mcs):
+        # Timpul de server al unui client, per realizare: slotul servește
+        # Σ_ocazii server_prbs / ceil(segment / TBS_1PRB) segmente
+        with np.errstate(divide="ignore"):
+            prbs     = np.ceil(bits / n_pkt / tbs1[mcs])      # inf în ocaziile fără simboluri de date
+            per_slot = server_prbs * (1.0 / prbs).sum(axis=1)
+            return np.where(per_slot > 0, n_pkt * slot_us / per_slot, math.inf)
+
+    # punct fix: grantul tipic depinde de câți UE-i au backlog, care depinde de coadă
+    busy, grant = 1.0, None
+    for _ in range(8):
+        n_grant = max(1, min(server_prbs, int(round(server_prbs / busy))))
+        if n_grant == grant:
+            break
+        grant = n_grant
+        mcs, bler = quad.link(cfg, grant)
+        pmf = _harq_pmf(float(bler.mean()))
+        s1 = s2 = s3 = 0.0
+        for (n_pkt, bits, r2, r3), rate in sources.items():
+            if not bits or not rate:
+                continue
+            d = demand_us(n_pkt, bits, mcs)
+            w = rate / lam_ms
+            s1 += w * float(pmf @ k) * float(d.mean())
+            s2 += w * r2 * float(pmf @ k ** 2) * float(np.mean(d ** 2))
+            s3 += w * r3 * float(pmf @ k ** 3) * float(np.mean(d ** 3))
+        lam = lam_ms / 1000.0                                                 # clienți / µs
+        rho = lam * s1
+        if not rho < 1.0:
+            rho  = rho if rho >= 1.0 else math.inf
+            wait = wait_md1 = wait_var = math.inf
+            busy = float(len(ues))
+        else:
+            wait     = lam * s2 / (2.0 * (1.0 - rho))
+            wait_md1 = rho * s1 / (2.0 * (1.0 - rho))
+            wait_var = wait * wait + lam * s3 / (3.0 * (1.0 - rho))
+            busy     = min(float(len(ues)), max(1.0, lam * (wait + s1)))
+
+    scv       = s2 / (s1 * s1) - 1.0 if s1 > 0 and math.isfinite(s2) else math.nan
+    harq_step = cfg["feedback_delay_us"] + cfg["retransmission_duration_us"]
+    tx_us     = pkt_bits * float(np.mean(1.0 / se[mcs])) / (cfg["bandwidth_mhz"] * 1e6) * 1e6
+    base_us   = (2 * slot_us + tx_us + cfg["coding_time_us"] + cfg["decoding_time_us"]
+                 + float(np.mean(quad.distance_m)) / SPEED_OF_LIGHT * 1e6)
+    if rho < 1.0 and s1 > 0:
+        relax = s1 * (1.0 + scv) / 2.0 / (1.0 - math.sqrt(rho)) ** 2
+    else:
+        relax = math.inf if rho >= 1.0 else 0.0
+
+    return GroupEstimate(
+        group=name, n_ues=len(ues), server_prbs=server_prbs, grant_prbs=grant,
+        arrivals_per_ms=lam_ms, packets_per_ms=pkts_ms, load=rho,
+        service_us=s1, service_scv=scv, wait_us=wait, wait_md1_us=wait_md1, wait_var_us2=wait_var,
+        overhead_us=base_us + harq_step * float(pmf @ (k - 1.0)), budget_us=budget_ms * 1000.0,
+        first_tx_ratio=float(pmf[0]),
+        relaxation_us=relax, base_us=base_us, harq_step_us=harq_step,
+        harq_pmf=tuple(float(p) for p in pmf))
+
+
+def _groups(cfg, quad) -> list:
+    occasions = build_occasions(cfg)
+    if cfg["scheduler_mode"] != "slice":
+        return [_group(cfg, quad, "all", list(range(cfg["n_ues"])), cfg.total_prbs,
+                       [o.n_sym for o in occasions], cfg["delay_budget_ms"])]
+
+    profiles = cfg.get("slice_profiles_static", slice_profiles)
+    prbs     = split_slice_prbs(cfg.total_prbs, cfg.slice_shares)
+    out = []
+    for sl in sorted(set(cfg.slice_mapping.values())):
+        ues = sorted(ue for ue, s in cfg.slice_mapping.items() if s == sl)
+        if profiles[sl].get("slot_type") == "mini":
+            n_syms = [o.n_sym for o in occasions if o.group == sl]
+        else:
+            n_syms = [o.n_sym for o in occasions if o.preemptible]
+        out.append(_group(cfg, quad, sl, ues, prbs.get(sl, 0), n_syms, profiles[sl]["delay_budget_ms"]))
+    return out
+
+
+# ────────────────────────────────────────────────────────────
+#    RECOMANDAREA DURATEI ȘI A REPLICĂRILOR
+# ────────────────────────────────────────────────────────────
+
+def estimate(params: dict, percentile: float = 99.0, rel_width: float = 0.05,
+             confidence: float = 0.95, min_tail_samples: int = MIN_TAIL_SAMPLES) -> QueueEstimate:
+    """
+    Estimează analitic, fără a simula, încărcarea, întârzierea medie și riscul
+    de cozi lungi (µs) ale fiecărui grup (celula sau fiecare slice) și
+    recomandă durata rulării și numărul de replicări:
+      - warm-up: RELAXATION_WARMUP timpi de relaxare ai celei mai lente cozi,
+        τ ≈ E[S] · (1 + c²) / 2 / (1 − √ρ)²
+      - măsură: cel puțin min_tail_samples pachete peste percentila
+        `percentile` în fiecare grup și cel puțin RELAXATION_WINDOW · τ
+      - replicări: câte sunt necesare ca intervalul (la `confidence`) al
+        întârzierii medii să aibă lățimea relativă rel_width, cu eșantioanele
+        efective ale unei rulări λT / (1 + 2λτ); cel puțin 2
+    La suprasarcină (ρ ≥ 1 într-un grup) nu se face nicio recomandare.
+    Ridică ValueError pentru configurații invalide și pentru traficul din trace.
+    """
+    cfg  = compile_config(params)
+    quad = _Quadrature(cfg)
+    est  = QueueEstimate(_groups(cfg, quad), percentile, slot_ms=cfg.slot_ms)
+    if est.overloaded:
+        return est
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    tau_ms  = max(g.relaxation_us for g in est.groups) / 1000.0
+    warmup  = RELAXATION_WARMUP * tau_ms
+    measure = RELAXATION_WINDOW * tau_ms
+    for g in est.groups:
+        if g.packets_per_ms > 0:
+            measure = max(measure, min_tail_samples / (1.0 - percentile / 100.0) / g.packets_per_ms)
+
+    reps = 2
+    for g in est.groups:
+        if g.arrivals_per_ms <= 0 or g.delay_us <= 0:
+            continue
+        pmf = np.asarray(g.harq_pmf)
+        ks  = np.arange(len(pmf))
+        var = g.wait_var_us2 - g.wait_us ** 2 + g.harq_step_us ** 2 * float(pmf @ ks ** 2 - (pmf @ ks) ** 2)
+        cv  = math.sqrt(max(var, 0.0)) / g.delay_us
+        lam = g.arrivals_per_ms / 1000.0
+        n_eff = lam * measure * 1000.0 / (1.0 + 2.0 * lam * g.relaxation_us)
+        reps = max(reps, math.ceil((z * cv / rel_width) ** 2 / n_eff))
+
+    slots = math.ceil((warmup + measure) / cfg.slot_ms)
+    est.sim_time_ms  = round(slots * cfg.slot_ms, 6)
+    est.warmup_slots = math.ceil(warmup / cfg.slot_ms)
+    est.replications = reps
+    return est
+
+
+if __name__ == "__main__":
+    # python -m simulator.queueing '{"n_ues": 40, "traffic_type": "poisson", "lambda_per_ms": 0.5}' [percentilă]
+    import json
+    import sys
+
+    params = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    pct = float(sys.argv[2]) if len(sys.argv) > 2 else 99.0
+    print(estimate(params, pct).format())
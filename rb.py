@@ -1,4 +1,5 @@
-from simulator.link_adaptation import MCSParams
+import math
+from simulator.link_adaptation import MCSParams, select_mcs
 
 # Numărul fix de subcarrier-uri într-un Resource Block (RB)
 def n_subcarriers_per_rb() -> int:
@@ -19,3 +20,13 @@ def compute_tbs(n_prbs: int, mcs: MCSParams, num_symbols: int) -> int:
     # 4) Întotdeauna rotunjim în jos la cel mai apropiat octet (8 biți)
     tbs_bits = int((raw_bits // 8) * 8)
     return tbs_bits
+
+
+# Numărul minim de PRB-uri pentru a transmite `bits` pe `num_symbols` simboluri
+# cu MCS-ul dat (implicit cel mai robust; folosit de mini-sloturile URLLC ca să
+# nu ceară tot canalul și de granturile configurate SPS)
+def prbs_for_bits(bits: int, num_symbols: int, mcs_idx: int = 0) -> int:
+    per_prb = compute_tbs(1, select_mcs(mcs_idx), num_symbols)
+    if per_prb <= 0:
+        return 0
+    return max(1, math.ceil(bits / per_prb))
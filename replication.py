@@ -0,0 +1,180 @@
+# simulator/replication.py
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from statistics import NormalDist
+
+import numpy as np
+
+from simulator.simulator import run_scenario
+from simulator.simulator_slice import run_scenario_slice
+
+# ────────────────────────────────────────────────────────────
+#    INTERVALE DE ÎNCREDERE
+# ────────────────────────────────────────────────────────────
+
+def t_quantile(p: float, df: int) -> float:
+    """
+    Cuantila distribuției Student t (expansiunea Cornish-Fisher în jurul
+    cuantilei normale); eroare < 1e-3 pentru df ≥ 4.
+    """
+    z = NormalDist().inv_cdf(p)
+    if df <= 0:
+        return math.inf
+    g1 = (z**3 + z) / 4
+    g2 = (5 * z**5 + 16 * z**3 + 3 * z) / 96
+    g3 = (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384
+    g4 = (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / 92160
+    return z + g1 / df + g2 / df**2 + g3 / df**3 + g4 / df**4
+
+
+@dataclass
+class ConfidenceInterval:
+    estimate: float
+    low:      float
+    high:     float
+    n:        int          # numărul de observații independente (replicări sau batch-uri)
+
+    @property
+    def half_width(self) -> float:
+        return (self.high - self.low) / 2.0
+
+    @property
+    def rel_width(self) -> float:
+        # semi-lățimea relativă la estimare (inf dacă estimarea e 0 sau lipsește)
+        if not self.estimate or not math.isfinite(self.half_width):
+            return math.inf
+        return self.half_width / abs(self.estimate)
+
+
+def confidence_interval(samples, confidence: float = 0.95) -> ConfidenceInterval:
+    # Interval t pentru media unor observații independente, aproximativ normale
+    x = np.asarray(samples, dtype=float)
+    x = x[np.isfinite(x)]
+    n = len(x)
+    if n < 2:
+        est = float(x.mean()) if n else math.nan
+        return ConfidenceInterval(est, -math.inf, math.inf, n)
+    mean = float(x.mean())
+    hw = t_quantile(0.5 + confidence / 2.0, n - 1) * float(x.std(ddof=1)) / math.sqrt(n)
+    return ConfidenceInterval(mean, mean - hw, mean + hw, n)
+
+
+# ────────────────────────────────────────────────────────────
+#    O REPLICARE: STATISTICI PE GRUP (TOTAL / SLICE)
+# ────────────────────────────────────────────────────────────
+
+def _group_stats(latencies, percentile):
+    lat = np.asarray(latencies, dtype=float)
+    if not len(lat):
+        return math.nan, math.nan
+    return float(lat.mean()), float(np.percentile(lat, percentile))
+
+
+def _replicate(params: dict, seed: int, percentile: float, method: str,
+               batch_count: int, warmup_slots: int) -> dict:
+    """
+    Rulează o replicare și întoarce doar statisticile pe grup (nu toate
+    latențele), ca transferul între procese să rămână mic:
+      - 'independent': câte o pereche (medie, percentilă) per grup
+      - 'batch_means': câte o pereche per batch de sloturi, după warm-up
+    """
+    t0 = time.process_time()
+    p = {**params, "seed": seed}
+    mapping = p.get("ue_slice_mapping")
+    if mapping:
+        res = run_scenario_slice(dict(p)).base
+    else:
+        res = run_scenario(p)
+
+    ue_ids = np.asarray(res.ue_ids, dtype=np.int64)
+    slots  = np.asarray(res.slot_indices, dtype=np.int64)
+    lat    = np.asarray(res.latencies, dtype=float)
+    keep   = slots >= warmup_slots
+    ue_ids, slots, lat = ue_ids[keep], slots[keep], lat[keep]
+
+    groups = {"all": np.ones(len(lat), dtype=bool)}
+    if mapping:
+        slice_of = np.array([mapping.get(int(ue), "") for ue in ue_ids], dtype=object)
+        for sl in sorted(set(mapping.values())):
+            groups[sl] = slice_of == sl
+
+    stats = {}
+    for name, mask in groups.items():
+        if method == "batch_means":
+            edges = np.linspace(warmup_slots, max(res.simulated_slots, warmup_slots + 1), batch_count + 1)
+            idx = np.clip(np.searchsorted(edges, slots[mask], side="right") - 1, 0, batch_count - 1)
+            stats[name] = [_group_stats(lat[mask][idx == b], percentile) for b in range(batch_count)]
+        else:
+            stats[name] = [_group_stats(lat[mask], percentile)]
+    return {"stats": stats, "slots": res.simulated_slots, "cpu_s": time.process_time() - t0}
+
+
+# ────────────────────────────────────────────────────────────
+#    REPLICĂRI ADAPTIVE PÂNĂ LA CONVERGENȚA INTERVALELOR
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class ReplicationReport:
+    converged:        bool
+    n_replications:   int
+    intervals:        dict = field(default_factory=dict)  # grup -> {'mean': CI, 'pXX': CI}
+    simulated_slots:  int = 0
+    cpu_time_s:       float = 0.0
+    wall_time_s:      float = 0.0
+
+
+def run_adaptive(params: dict, percentile: float = 99.0, rel_width: float = 0.05,
+                 confidence: float = 0.95, method: str = "independent", batch_count: int = 10,
+                 warmup_slots: int = 0, min_replications: int = 4, max_replications: int = 200,
+                 n_workers: int = None, base_seed: int = 0) -> ReplicationReport:
+    """
+    Rulează replicări independente ale run_scenario (sau run_scenario_slice,
+    dacă params conține 'ue_slice_mapping' și 'slice_prb_shares') în paralel,
+    câte un val de n_workers odată, până când intervalele de încredere pentru
+    media și percentila latenței (global și per slice) au semi-lățimea relativă
+    ≤ rel_width, sau până la max_replications.
+      - method='independent': fiecare replicare e o observație
+      - method='batch_means': fiecare replicare contribuie batch_count medii
+        de batch (după warmup_slots), pentru replicări lungi și puține
+    """
+    if method not in ("independent", "batch_means"):
+        raise ValueError(f"metodă necunoscută: {method!r}")
+    pname = f"p{percentile:g}"
+    samples = {}
+    report = ReplicationReport(converged=False, n_replications=0)
+    t0 = time.perf_counter()
+
+    wave = n_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=wave) as pool:
+        while report.n_replications < max_replications:
+            n = min(wave, max_replications - report.n_replications)
+            seeds = range(base_seed + report.n_replications, base_seed + report.n_replications + n)
+            futures = [pool.submit(_replicate, params, s, percentile, method, batch_count, warmup_slots)
+                       for s in seeds]
+            for fut in futures:
+                out = fut.result()
+                report.simulated_slots += out["slots"]
+                report.cpu_time_s += out["cpu_s"]
+                for name, pairs in out["stats"].items():
+                    acc = samples.setdefault(name, {"mean": [], pname: []})
+                    for m, q in pairs:
+                        acc["mean"].append(m)
+                        acc[pname].append(q)
+            report.n_replications += n
+
+            report.intervals = {
+                name: {k: confidence_interval(v, confidence) for k, v in acc.items()}
+                for name, acc in samples.items()
+            }
+            widths = [ci.rel_width for group in report.intervals.values() for ci in group.values()]
+            if (report.n_replications >= min_replications and widths
+                    and max(widths) <= rel_width):
+                report.converged = True
+                break
+
+    report.wall_time_s = time.perf_counter() - t0
+    return report
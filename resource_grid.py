@@ -0,0 +1,214 @@
+# simulator/resource_grid.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulator.config import slice_profiles
+
+# ────────────────────────────────────────────────────────────
+#    GRILA DE RESURSE PRB × SIMBOL PENTRU UN SLOT
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class GridAllocation:
+    prb_mask:    int      # bitul p setat = PRB-ul p este folosit
+    start_sym:   int
+    n_sym:       int
+    preemptible: bool     # alocare eMBB care poate fi perforată de URLLC
+
+
+def _take_lowest(mask: int, k: int) -> int:
+    # Primele k PRB-uri libere (bițiii setați cei mai puțin semnificativi)
+    out = 0
+    while k > 0 and mask:
+        low = mask & -mask
+        out |= low
+        mask ^= low
+        k -= 1
+    return out
+
+
+def mask_indices(mask: int) -> np.ndarray:
+    # Indicii PRB-urilor setate într-un bitset, crescător
+    if not mask:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(mask.to_bytes((mask.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+
+
+def _take_preferred(mask: int, k: int, order) -> int:
+    # Primele k PRB-uri libere în ordinea de preferință `order` (indici PRB)
+    if k <= 0 or not mask:
+        return 0
+    order = np.asarray(order)
+    free  = np.zeros(len(order), dtype=bool)
+    free[mask_indices(mask)] = True
+    bits  = np.zeros(len(order), dtype=bool)
+    bits[order[free[order]][:k]] = True
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+class ResourceGrid:
+    """
+    Grila unui slot: câte un bitset (int Python) de PRB-uri per simbol.
+    Alocările ocupă un set de PRB-uri pe un interval de simboluri; o alocare
+    URLLC cu preempt=True poate lua PRB-uri deja acordate unor alocări
+    preemptibile (eMBB), ale căror RE-uri pierdute sunt contabilizate.
+    Toate operațiile costă O(simboluri) operații pe întregi, independent de
+    numărul de PRB-uri.
+    """
+
+    def __init__(self, n_prbs: int, n_symbols: int = 14):
+        self.n_prbs    = n_prbs
+        self.n_symbols = n_symbols
+        self.full_mask = (1 << n_prbs) - 1
+        self.reset()
+
+    def reset(self):
+        self.used        = [0] * self.n_symbols   # RE ocupate, per simbol
+        self.preemptible = [0] * self.n_symbols   # RE ocupate de alocări preemptibile
+        self.allocs      = {}                     # owner -> [GridAllocation]
+        self.punctured   = {}                     # owner -> RE pierdute (PRB × simbol)
+
+    def _span(self, masks, start_sym, n_sym) -> int:
+        acc = 0
+        for sym in range(start_sym, min(start_sym + n_sym, self.n_symbols)):
+            acc |= masks[sym]
+        return acc
+
+    def free_mask(self, start_sym: int, n_sym: int) -> int:
+        # PRB-urile libere pe TOATE simbolurile intervalului
+        return self.full_mask & ~self._span(self.used, start_sym, n_sym)
+
+    def free_prbs(self, start_sym: int, n_sym: int) -> int:
+        return self.free_mask(start_sym, n_sym).bit_count()
+
+    def allocate(self, owner, n_prbs: int, start_sym: int, n_sym: int,
+                 preemptible: bool = False, preempt: bool = False, prefer=None) -> int:
+        """
+        Alocă până la n_prbs PRB-uri pe simbolurile [start_sym, start_sym + n_sym).
+        Cu preempt=True, dacă nu există destule PRB-uri libere, le ia din
+        alocările preemptibile. `prefer` (indici PRB în ordinea preferinței,
+        ex. după CQI-ul pe subbandă) alege PRB-urile libere; implicit cele mai
+        mici. Returnează numărul de PRB-uri acordate.
+        """
+        free = self.free_mask(start_sym, n_sym)
+        take = _take_lowest(free, n_prbs) if prefer is None else _take_preferred(free, n_prbs, prefer)
+        missing = n_prbs - take.bit_count()
+        if missing > 0 and preempt:
+            victims = self._span(self.preemptible, start_sym, n_sym) & ~take
+            extra = _take_lowest(victims, missing)
+            if extra:
+                self._puncture(extra, start_sym, n_sym)
+                take |= extra
+        if not take:
+            return 0
+
+        for sym in range(start_sym, min(start_sym + n_sym, self.n_symbols)):
+            self.used[sym] |= take
+            if preemptible:
+                self.preemptible[sym] |= take
+        self.allocs.setdefault(owner, []).append(GridAllocation(take, start_sym, n_sym, preemptible))
+        return take.bit_count()
+
+    def _puncture(self, mask: int, start_sym: int, n_sym: int):
+        # Contabilizăm RE-urile pierdute de fiecare alocare preemptibilă atinsă
+        end = start_sym + n_sym
+        for owner, allocs in self.allocs.items():
+            for a in allocs:
+                if not a.preemptible:
+                    continue
+                overlap = min(end, a.start_sym + a.n_sym) - max(start_sym, a.start_sym)
+                hit = (a.prb_mask & mask).bit_count()
+                if overlap > 0 and hit:
+                    self.punctured[owner] = self.punctured.get(owner, 0) + hit * overlap
+        for sym in range(start_sym, min(end, self.n_symbols)):
+            self.preemptible[sym] &= ~mask
+
+    def last_mask(self, owner) -> int:
+        # PRB-urile ultimei alocări a lui `owner` (0 dacă nu are)
+        allocs = self.allocs.get(owner)
+        return allocs[-1].prb_mask if allocs else 0
+
+    def punctured_fraction(self, owner) -> float:
+        # Fracțiunea din RE-urile alocate lui `owner` care au fost perforate
+        total = sum(a.prb_mask.bit_count() * a.n_sym for a in self.allocs.get(owner, ()))
+        if not total:
+            return 0.0
+        return min(self.punctured.get(owner, 0) / total, 1.0)
+
+    def utilization(self) -> float:
+        # Gradul de ocupare al slotului (RE ocupate / RE totale)
+        if not self.n_prbs:
+            return 0.0
+        return sum(m.bit_count() for m in self.used) / (self.n_prbs * self.n_symbols)
+
+
+# ────────────────────────────────────────────────────────────
+#    OCAZIILE DE TRANSMISIE DINTR-UN SLOT
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class Occasion:
+    start_sym:   int
+    n_sym:       int
+    ues:         list = None    # None = toți UE-ii; altfel subsetul eligibil
+    mode:        str = None     # modul de scheduling pentru această ocazie
+    preemptible: bool = False   # alocări eMBB, transmise la sfârșitul slotului
+    preempting:  bool = False   # mini-sloturi URLLC care pot perfora eMBB
+    group:       str = None     # slice-ul mini-sloturilor (None = ocaziile fără slicing)
+    index:       int = 0        # poziția ocaziei în grupul ei, în cadrul slotului
+    per_slot:    int = 1        # câte ocazii are grupul într-un slot
+
+
+def _tile(mini_symbols, n_symbols):
+    # Repetă tiparul de mini-sloturi până se umple slotul (ocaziile care nu încap se ignoră)
+    occ, start = [], 0
+    while mini_symbols and start + min(mini_symbols) <= n_symbols:
+        for n in mini_symbols:
+            if start + n > n_symbols:
+                return occ
+            occ.append((start, n))
+            start += n
+    return occ
+
+
+def build_occasions(cfg: dict, n_symbols: int = 14) -> list:
+    """
+    Construiește ocaziile de transmisie ale unui slot:
+      - fără slicing: un slot complet sau mini-sloturile din cfg['mini_symbols'],
+        așezate consecutiv (cele care depășesc cele 14 simboluri sunt ignorate)
+      - cu slicing: un slot complet pentru slice-urile 'full' (preemptibil) plus
+        mini-sloturile slice-urilor 'mini' (URLLC), repetate pe tot slotul,
+        care pot perfora alocările eMBB
+    """
+    mode = cfg["scheduler_mode"]
+    if mode != "slice":
+        if cfg["slot_type"] != "mini":
+            return [Occasion(0, n_symbols, mode=mode)]
+        occ, start = [], 0
+        for n in cfg["mini_symbols"]:
+            if start + n > n_symbols:
+                break
+            occ.append(Occasion(start, n, mode=mode, index=len(occ)))
+            start += n
+        for o in occ:
+            o.per_slot = len(occ)
+        return occ
+
+    mapping  = cfg.get("ue_slice_mapping", {})
+    profiles = cfg.get("slice_profiles_static", slice_profiles)
+    full_ues = sorted(ue for ue, sl in mapping.items() if profiles.get(sl, {}).get("slot_type") != "mini")
+    occasions = [Occasion(0, n_symbols, ues=full_ues, mode="slice", preemptible=True)]
+    for sl, prof in profiles.items():
+        if prof.get("slot_type") != "mini":
+            continue
+        ues = sorted(ue for ue, s in mapping.items() if s == sl)
+        if not ues:
+            continue
+        tiles = _tile(prof.get("mini_symbols") or [n_symbols], n_symbols)
+        for i, (start, n) in enumerate(tiles):
+            occasions.append(Occasion(start, n, ues=ues, mode=prof.get("scheduler_mode", "dynamic"),
+                                      preempting=True, group=sl, index=i, per_slot=len(tiles)))
+    return occasions
@@ -1,23 +1,58 @@
 # simulator/scheduler.py
 
+import heapq
+import math
+from functools import lru_cache
+
+import numpy as np
+
 from simulator.config          import default_params, slice_profiles
-from simulator.channel         import compute_sinr, sinr_to_cqi
+from simulator.channel         import (compute_sinr, sinr_to_cqi, sinr_to_cqi_array,
+                                       pathloss_db_array, reference_pathloss_db)
 from simulator.link_adaptation import select_mcs
+from simulator.rb              import compute_tbs, prbs_for_bits
+
+class SparseAllocation:
+    """
+    Alocare rară: liste paralele cu UE-urile programate și PRB-urile lor
+    (fără intrările zero ale restului populației). items() are aceeași formă
+    ca dict-ul alocării dense, deci buclele apelanților rămân neschimbate.
+    """
+    __slots__ = ('ues', 'prbs')
+
+    def __init__(self, grants=None):
+        self.ues, self.prbs = [], []
+        for ue, n in (grants or {}).items():
+            self.add(ue, n)
+
+    def add(self, ue, n_prbs):
+        if n_prbs > 0:
+            self.ues.append(ue)
+            self.prbs.append(n_prbs)
+
+    def items(self):
+        return zip(self.ues, self.prbs)
 
-def _allocate_classic(buffers, ue_distances, total_prbs, frame_params, mode):
+    def to_dict(self) -> dict:
+        return dict(zip(self.ues, self.prbs))
+
+    def __len__(self):
+        return len(self.ues)
+
+
+def _classic_grants(backlogged, ue_distances, total_prbs, frame_params, mode, cfg, draws=None):
     """
-    Funcție internă de alocare „clasică”:
+    PRB-urile acordate UE-urilor din `backlogged` (în ordinea dată):
       - mode == 'dynamic'         => alocare adaptivă bazată pe performanța canalului
       - mode == 'semi-persistent' => alocare egală și stabilă între UE-uri
+    Întoarce {ue: n_prbs} doar pentru UE-urile din backlogged.
+    draws: SlotDraws opțional (realizările comune ale canalului în slot).
     """
-    bw_mhz  = default_params['bandwidth_mhz']
+    bw_mhz  = cfg['bandwidth_mhz']
     scs_khz = frame_params.scs_khz
 
-    # Lista UE-urilor care au pachete în buffer
-    backlogged = [ue for ue, buf in buffers.items() if buf]
     N = len(backlogged)
-    # Inițializăm alocarea cu 0 pentru toți UE-ii
-    allocation = {ue: 0 for ue in buffers}
+    allocation = {ue: 0 for ue in backlogged}
     if N == 0:
         return allocation  # nimeni de deservit
 
@@ -44,7 +79,10 @@ def _allocate_classic(buffers, ue_distances, total_prbs, frame_params, mode):
             total_prbs,
             bw_mhz,
             scs_khz,
-            model='log_distance'
+            model='log_distance',
+            cfg=cfg,
+            shadow_db=None if draws is None else draws.shadow_db[ue],
+            rayleigh_db=None if draws is None else draws.rayleigh_db[ue]
         )
         cqi     = sinr_to_cqi(sinr_db)
         mcs     = select_mcs(cqi)
@@ -70,21 +108,24 @@ def _allocate_classic(buffers, ue_distances, total_prbs, frame_params, mode):
     return allocation
 
 
-def allocate_rb(buffers, ue_distances, total_prbs, frame_params, mode='dynamic'):
+def _allocate_classic(buffers, ue_distances, total_prbs, frame_params, mode, cfg, draws=None):
     """
-    Scheduler principal:
-      - dacă mode în {'dynamic','semi-persistent'} folosește _allocate_classic
-      - dacă mode == 'slice'       → alocare per slice (network slicing)
+    Funcție internă de alocare „clasică” (densă): un dict cu toți UE-ii din
+    `buffers`, 0 pentru cei neprogramați. Backlogged = buffer nevid.
     """
-    if mode != 'slice':
-        # mod clasic fără slicing
-        return _allocate_classic(buffers, ue_distances, total_prbs, frame_params, mode)
+    # Lista UE-urilor care au pachete în buffer
+    backlogged = [ue for ue, buf in buffers.items() if buf]
+    # Inițializăm alocarea cu 0 pentru toți UE-ii
+    allocation = {ue: 0 for ue in buffers}
+    allocation.update(_classic_grants(backlogged, ue_distances, total_prbs, frame_params, mode, cfg, draws))
+    return allocation
 
-    # --- Mod network slicing ---
-    ue_slice_map = default_params['ue_slice_mapping']
-    slice_shares = default_params['slice_prb_shares']
-    profiles     = slice_profiles
 
+def split_slice_prbs(total_prbs, slice_shares):
+    """
+    Împarte total_prbs între slice-uri proporțional cu share-urile; PRB-urile
+    rămase după rotunjirea în jos merg la slice-urile cu cea mai mare fracțiune.
+    """
     # 1) Calculăm exact câte PRB-uri primesc fiecare slice (float)
     exact      = {sl: total_prbs * share for sl, share in slice_shares.items()}
     # 2) Rotunjim în jos și păstrăm partea fracționară
@@ -96,8 +137,58 @@ def allocate_rb(buffers, ue_distances, total_prbs, frame_params, mode='dynamic')
     remainder = total_prbs - used
     for sl in sorted(frac, key=lambda s: frac[s], reverse=True)[:remainder]:
         base_alloc[sl] += 1
+    return base_alloc
+
+
+def allocate_rb(buffers, ue_distances, total_prbs, frame_params, mode='dynamic', sps=None, slot=0,
+                active=None, edf=None, now_ms=0.0, n_sym=None, group=None, *, cfg, draws=None):
+    """
+    Scheduler principal:
+      - dacă mode în {'dynamic','semi-persistent'} folosește _allocate_classic
+      - dacă mode == 'slice'       → alocare per slice (network slicing)
+    sps: {slice: SpsScheduler} opțional; slice-urile semi-persistente care au
+    granturi configurate le primesc din tabelul SPS pentru `slot`, fără a mai
+    recalcula împărțirea.
+    active: lista UE-urilor cu pachete gata de transmis (vezi
+    traffic.ActiveSet), pentru regula cfg['schedule_arrived_only']. Dacă e
+    dată, doar ele concurează pentru PRB-uri și rezultatul e o
+    SparseAllocation, deci costul depinde de UE-urile active, nu de
+    populație; altfel alocarea e densă, peste toate buffer-ele nevide
+    (regula implicită, inclusiv UE-urile al căror pachet sosește mai târziu).
+    edf, now_ms, n_sym, group: starea EdfScheduler, momentul deciziei,
+    simbolurile ocaziei și grupul ei (slice-ul sau None), pentru modurile
+    'edf' / 'edf_hybrid'.
+    cfg: SimConfig-ul rulării (lățimea de bandă, tabelele canalului, maparea
+    și share-urile slice-urilor), obligatoriu: compilat o singură dată de
+    apelant (simconfig.compile_config), niciodată la fiecare alocare.
+    draws: SlotDraws-ul slotului cu realizări comune ale canalului (vezi
+    channel.ChannelRealizations); fără el, estimările SINR trag din `random`.
+    """
+    ctx = (edf, buffers, now_ms, n_sym or frame_params.num_symbols_per_slot, cfg, draws)
+    if active is not None:
+        return _allocate_sparse(active, ue_distances, total_prbs, frame_params, mode, sps, slot,
+                                ctx, group)
+
+    if mode in EDF_MODES:
+        backlogged = [ue for ue, buf in buffers.items() if buf]
+        allocation = {ue: 0 for ue in buffers}
+        allocation.update(_edf_grants(backlogged, ue_distances, total_prbs, frame_params, mode,
+                                      ctx, group, dense=True))
+        return allocation
+
+    if mode != 'slice':
+        # mod clasic fără slicing
+        return _allocate_classic(buffers, ue_distances, total_prbs, frame_params, mode, cfg, draws)
+
+    # --- Mod network slicing ---
+    ue_slice_map = cfg.slice_mapping
+    slice_shares = cfg.slice_shares
+    profiles     = slice_profiles
 
-    # 4) Pentru fiecare slice, apelăm _allocate_classic pe sub-setul său de UE-uri
+    # 1) Câte PRB-uri primește fiecare slice
+    base_alloc = split_slice_prbs(total_prbs, slice_shares)
+
+    # 2) Pentru fiecare slice, apelăm _allocate_classic pe sub-setul său de UE-uri
     allocation = {ue: 0 for ue in buffers}
     for sl, prbs_for_slice in base_alloc.items():
         # extragem UE-urile active în acest slice
@@ -116,13 +207,28 @@ def allocate_rb(buffers, ue_distances, total_prbs, frame_params, mode='dynamic')
         policy   = profiles.get(sl, {})
         sub_mode = policy.get('scheduler_mode', 'dynamic')
 
+        # Slice SPS: granturile configurate ale slotului, citite din tabel
+        if sub_mode == 'semi-persistent' and sps and sl in sps:
+            for ue, n in sps[sl].grants(slot).items():
+                if ue in sub_bufs:
+                    allocation[ue] = n
+            continue
+
+        if sub_mode in EDF_MODES:
+            for ue, n in _edf_grants(ues_in_slice, sub_dists, prbs_for_slice, frame_params, sub_mode,
+                                     ctx, sl, dense=True).items():
+                allocation[ue] = n
+            continue
+
         # Alocăm în interiorul slice-ului
         sub_alloc = _allocate_classic(
             sub_bufs,
             sub_dists,
             prbs_for_slice,
             frame_params,
-            sub_mode
+            sub_mode,
+            cfg,
+            draws
         )
 
         # Combinăm cu alocarea globală
@@ -130,3 +236,473 @@ def allocate_rb(buffers, ue_distances, total_prbs, frame_params, mode='dynamic')
             allocation[ue] = val
 
     return allocation
+
+
+def _allocate_sparse(active, ue_distances, total_prbs, frame_params, mode, sps, slot, ctx, group):
+    # Varianta rară a allocate_rb: aceleași reguli, doar peste UE-urile active
+    cfg, draws = ctx[4], ctx[5]
+    if mode in EDF_MODES:
+        return SparseAllocation(_edf_grants(active, ue_distances, total_prbs, frame_params, mode,
+                                            ctx, group))
+    if mode != 'slice':
+        return SparseAllocation(_classic_grants(active, ue_distances, total_prbs, frame_params, mode,
+                                                cfg, draws))
+
+    ue_slice_map = cfg.slice_mapping
+    per_slice = {}
+    for ue in active:
+        per_slice.setdefault(ue_slice_map.get(ue), []).append(ue)
+
+    allocation = SparseAllocation()
+    for sl, prbs_for_slice in split_slice_prbs(total_prbs, cfg.slice_shares).items():
+        ues_in_slice = per_slice.get(sl)
+        if not ues_in_slice:
+            continue
+        sub_mode = slice_profiles.get(sl, {}).get('scheduler_mode', 'dynamic')
+        if sub_mode == 'semi-persistent' and sps and sl in sps:
+            grants = sps[sl].grants(slot)
+            for ue in ues_in_slice:
+                allocation.add(ue, grants.get(ue, 0))
+            continue
+        if sub_mode in EDF_MODES:
+            for ue, n in _edf_grants(ues_in_slice, ue_distances, prbs_for_slice, frame_params,
+                                     sub_mode, ctx, sl).items():
+                allocation.add(ue, n)
+            continue
+        for ue, n in _classic_grants(ues_in_slice, ue_distances, prbs_for_slice,
+                                     frame_params, sub_mode, cfg, draws).items():
+            allocation.add(ue, n)
+    return allocation
+
+
+# ────────────────────────────────────────────────────────────
+#    EARLIEST DEADLINE FIRST (EDF)
+# ────────────────────────────────────────────────────────────
+
+EDF_MODES = ('edf', 'edf_hybrid')
+
+
+class DeadlineQueue:
+    """
+    Heap binar indexat: ue -> cheie (deadline, ue), cu poziția fiecărui UE
+    în heap, deci update() și remove() costă O(log n) fără reconstruire.
+    smallest() parcurge cheile în ordine crescătoare fără a modifica heap-ul
+    (un heap auxiliar de frontieră), în O(k log k) pentru primele k.
+    """
+    __slots__ = ('heap', 'pos', 'keys')
+
+    def __init__(self):
+        self.heap = []      # UE-uri, ordonate după keys[ue]
+        self.pos  = {}      # ue -> indexul în heap
+        self.keys = {}      # ue -> (deadline_ms, ue)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, ue):
+        return ue in self.pos
+
+    def update(self, ue, deadline_ms: float):
+        key = (deadline_ms, ue)
+        i = self.pos.get(ue)
+        if i is None:
+            self.keys[ue] = key
+            self.heap.append(ue)
+            self.pos[ue] = len(self.heap) - 1
+            self._up(len(self.heap) - 1)
+            return
+        old = self.keys[ue]
+        if key == old:
+            return
+        self.keys[ue] = key
+        if key < old:
+            self._up(i)
+        else:
+            self._down(i)
+
+    def remove(self, ue):
+        i = self.pos.pop(ue, None)
+        if i is None:
+            return
+        del self.keys[ue]
+        last = self.heap.pop()
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.pos[last] = i
+            self._up(i)
+            self._down(self.pos[last])
+
+    def smallest(self):
+        # Generator: (deadline_ms, ue) în ordinea termenelor limită
+        heap, keys = self.heap, self.keys
+        if not heap:
+            return
+        frontier = [(keys[heap[0]], 0)]
+        while frontier:
+            key, i = heapq.heappop(frontier)
+            yield key
+            for c in (2 * i + 1, 2 * i + 2):
+                if c < len(heap):
+                    heapq.heappush(frontier, (keys[heap[c]], c))
+
+    def _up(self, i):
+        heap, pos, keys = self.heap, self.pos, self.keys
+        ue, key = heap[i], self.keys[heap[i]]
+        while i:
+            parent = (i - 1) >> 1
+            if keys[heap[parent]] <= key:
+                break
+            heap[i] = heap[parent]
+            pos[heap[i]] = i
+            i = parent
+        heap[i] = ue
+        pos[ue] = i
+
+    def _down(self, i):
+        heap, pos, keys = self.heap, self.pos, self.keys
+        n, ue, key = len(heap), heap[i], keys[heap[i]]
+        while True:
+            c = 2 * i + 1
+            if c >= n:
+                break
+            if c + 1 < n and keys[heap[c + 1]] < keys[heap[c]]:
+                c += 1
+            if key <= keys[heap[c]]:
+                break
+            heap[i] = heap[c]
+            pos[heap[i]] = i
+            i = c
+        heap[i] = ue
+        pos[ue] = i
+
+
+class EdfScheduler:
+    """
+    Termenele limită ale pachetelor din capul buffer-elor: deadline = sosire +
+    bugetul de întârziere al UE-ului (delay_budget_ms din profilul slice-ului
+    sau cfg['delay_budget_ms']). Câte un DeadlineQueue per grup (slice-ul
+    UE-ului sau None fără slicing), actualizat incremental de
+    traffic.ActiveSet la sosire, transmisie și livrare (on_ready / on_idle).
+    """
+
+    def __init__(self, budgets: dict, groups: dict, default_budget_ms: float, urgent_ms: float):
+        self.budgets    = budgets            # ue -> buget (ms), dacă diferă de cel implicit
+        self.groups     = groups             # ue -> grup
+        self.default_ms = default_budget_ms
+        self.urgent_ms  = urgent_ms          # 'edf_hybrid': pragul de urgență (slack, ms)
+        self.queues     = {}
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        mapping  = cfg.get('ue_slice_mapping') or {}
+        profiles = cfg.get('slice_profiles_static', slice_profiles)
+        default  = cfg.get('delay_budget_ms', default_params['delay_budget_ms'])
+        budgets  = {ue: profiles.get(sl, {}).get('delay_budget_ms', default) for ue, sl in mapping.items()} \
+            if cfg.get('scheduler_mode') == 'slice' else {}
+        groups   = dict(mapping) if cfg.get('scheduler_mode') == 'slice' else {}
+        return cls(budgets, groups, default, cfg.get('edf_urgent_ms', default_params['edf_urgent_ms']))
+
+    def deadline(self, ue, arrival_ms: float) -> float:
+        return arrival_ms + self.budgets.get(ue, self.default_ms)
+
+    def on_ready(self, ue, head: dict):
+        q = self.queues.get(self.groups.get(ue))
+        if q is None:
+            q = self.queues[self.groups.get(ue)] = DeadlineQueue()
+        q.update(ue, self.deadline(ue, head['time_ms']))
+
+    def on_idle(self, ue):
+        q = self.queues.get(self.groups.get(ue))
+        if q is not None:
+            q.remove(ue)
+
+    def candidates(self, group):
+        q = self.queues.get(group)
+        return q.smallest() if q is not None else iter(())
+
+
+def _edf_grants(ues, ue_distances, total_prbs, frame_params, mode, ctx, group, dense=False):
+    """
+    PRB-urile în ordinea termenelor limită: fiecare candidat primește cât
+    îi trebuie pentru restul pachetului din capul buffer-ului (la MCS-ul
+    estimat din canal), până se epuizează PRB-urile. Candidații vin din
+    DeadlineQueue (O(k log k) pentru k UE-uri servite) sau, pe calea densă
+    (dense=True), din sortarea UE-urilor din `ues` (referința, O(n log n)).
+    'edf_hybrid': EDF doar pentru UE-urile cu slack ≤ urgent_ms; PRB-urile
+    rămase sunt împărțite între ceilalți UE-i cu regula 'dynamic'.
+    """
+    edf, buffers, now_ms, n_sym, cfg, draws = ctx
+    bw_mhz  = cfg['bandwidth_mhz']
+    scs_khz = frame_params.scs_khz
+
+    if dense:
+        arrived    = [ue for ue in ues if buffers[ue][0]['time_ms'] <= now_ms]
+        candidates = iter(sorted((edf.deadline(ue, buffers[ue][0]['time_ms']), ue) for ue in arrived))
+    else:
+        candidates = edf.candidates(group)
+
+    grants, left = {}, total_prbs
+    for deadline_ms, ue in candidates:
+        if left <= 0 or (mode == 'edf_hybrid' and deadline_ms - now_ms > edf.urgent_ms):
+            break
+        head = buffers[ue][0]
+        cqi  = sinr_to_cqi(compute_sinr(
+            ue_distances[ue], total_prbs, bw_mhz, scs_khz, model='log_distance', cfg=cfg,
+            shadow_db=None if draws is None else draws.shadow_db[ue],
+            rayleigh_db=None if draws is None else draws.rayleigh_db[ue]))
+        n    = min(prbs_for_bits(head.get('remaining_bits', head['size_bits']), n_sym, cqi), left)
+        grants[ue] = n
+        left -= n
+
+    if mode == 'edf_hybrid' and left > 0:
+        rest = [ue for ue in ues if ue not in grants and buffers[ue]]
+        grants.update(_classic_grants(rest, ue_distances, left, frame_params, 'dynamic', cfg, draws))
+    return grants
+
+
+# ────────────────────────────────────────────────────────────
+#    GRANTURI CONFIGURATE (CONFIGURED GRANT / SPS)
+# ────────────────────────────────────────────────────────────
+
+class SpsScheduler:
+    """
+    Granturi configurate pentru un grup de UE-uri (un slice SPS sau toți UE-ii
+    în modul 'semi-persistent'): fiecare UE activat primește n_prbs PRB-uri la
+    ocaziile ⌊offset + k·period⌋, k = 0, 1, 2, ...
+    Ocaziile sunt numerotate global (slot × ocazii_pe_slot + index), deci
+    perioada poate fi și sub un slot pentru mini-sloturi.
+
+    Perioadele întregi (în ocazii) folosesc un tabel ocazie → granturi
+    construit o singură dată, câte o listă circulară per perioadă distinctă
+    (evităm hiper-perioada = cmmmc al perioadelor), invalidat doar la
+    activare, eliberare sau schimbarea perioadei / offset-ului. Perioadele
+    fracționare (perioada de trafic nu e un multiplu de ocazie) urmează exact
+    sosirile, fără derivă: următoarea ocazie a fiecărui UE stă într-un heap.
+    Costul unei ocazii este O(perioade distincte + granturi · log UE-uri).
+    Redimensionarea (reconfigure cu doar n_prbs) se face pe loc.
+    """
+
+    def __init__(self, budget_prbs: int, per_slot: int = 1, n_sym: int = None):
+        self.budget_prbs = budget_prbs
+        self.per_slot    = per_slot     # ocazii ale grupului într-un slot
+        self.n_sym       = n_sym        # simboluri per ocazie (dimensionarea granturilor)
+        self.configs     = {}           # ue -> (period, offset, n_prbs)
+        self._tables     = None         # {period: [ {ue: n_prbs} ] * period}
+        self._timed      = None         # heap [(ocazie, k, ue)] pentru perioadele fracționare
+        self._cursor     = -1           # ultima ocazie servită din heap
+        self._last       = {}           # granturile ei (apeluri repetate în aceeași ocazie)
+        self._members    = None         # (UE-uri, n_prbs) ca tablouri, pentru resize()
+
+    def activate(self, ue, period: float, offset: float, n_prbs: int):
+        period = float(period)
+        if period.is_integer() or period < 1:
+            period = max(1, int(period))
+            offset = int(offset) % period
+        else:
+            offset = float(offset)
+        self.configs[ue] = (period, offset, int(n_prbs))
+        self._tables = self._timed = self._members = None
+
+    def release(self, ue):
+        if self.configs.pop(ue, None) is not None:
+            self._tables = self._timed = self._members = None
+
+    def reconfigure(self, ue, period: float = None, offset: float = None, n_prbs: int = None):
+        old_p, old_o, old_n = self.configs[ue]
+        if period is None and offset is None:
+            # Doar dimensiunea: actualizăm intrările existente, fără reconstrucție
+            n = old_n if n_prbs is None else int(n_prbs)
+            self.configs[ue] = (old_p, old_o, n)
+            if self._tables is not None and isinstance(old_p, int):
+                self._tables[old_p][old_o][ue] = n
+            if ue in self._last:
+                self._last[ue] = n
+            return
+        self.activate(ue,
+                      old_p if period is None else period,
+                      old_o if offset is None else offset,
+                      old_n if n_prbs is None else n_prbs)
+
+    def members(self):
+        """(UE-uri, n_prbs) ale granturilor active, ca tablouri aliniate."""
+        if self._members is None:
+            ues = np.fromiter(self.configs, dtype=np.int64, count=len(self.configs))
+            n   = np.fromiter((c[2] for c in self.configs.values()), dtype=np.int64,
+                              count=len(self.configs))
+            self._members = (ues, n)
+        return self._members
+
+    def resize(self, n_prbs):
+        """Noile dimensiuni, aliniate cu members(); reconfigurează doar UE-ii schimbați."""
+        ues, cur = self.members()
+        changed  = np.flatnonzero(np.asarray(n_prbs) != cur)
+        for i in changed:
+            self.reconfigure(int(ues[i]), n_prbs=int(n_prbs[i]))
+        cur[changed] = np.asarray(n_prbs)[changed]
+
+    def _build(self):
+        tables = {}
+        for ue, (period, offset, n_prbs) in self.configs.items():
+            if not isinstance(period, int):
+                continue
+            if period not in tables:
+                tables[period] = [{} for _ in range(period)]
+            tables[period][offset][ue] = n_prbs
+        self._tables = dict(sorted(tables.items()))
+
+    def _seed(self, occasion: int):
+        # Prima ocazie ≥ `occasion` a fiecărui UE cu perioadă fracționară
+        heap = []
+        for ue, (period, offset, _) in self.configs.items():
+            if isinstance(period, int):
+                continue
+            k = max(0, math.floor((occasion - offset) / period))
+            while int(offset + k * period) < occasion:
+                k += 1
+            heap.append((int(offset + k * period), k, ue))
+        heapq.heapify(heap)
+        self._timed = heap
+
+    def _timed_grants(self, occasion: int) -> dict:
+        if self._timed is None or occasion < self._cursor:
+            self._seed(occasion)
+        elif occasion == self._cursor:
+            return self._last
+        heap, out = self._timed, {}
+        while heap and heap[0][0] <= occasion:
+            occ, k, ue = heap[0]
+            period, offset, n_prbs = self.configs[ue]
+            if occ == occasion:
+                out[ue] = n_prbs
+            heapq.heapreplace(heap, (int(offset + (k + 1) * period), k + 1, ue))
+        self._cursor, self._last = occasion, out
+        return out
+
+    def grants(self, occasion: int) -> dict:
+        """
+        Granturile active la ocazia dată: {ue: n_prbs}. Dacă suma depășește
+        bugetul grupului, ultimele granturi sunt trunchiate.
+        """
+        if self._tables is None:
+            self._build()
+        out = {}
+        for period, table in self._tables.items():
+            g = table[occasion % period]
+            if g:
+                out.update(g)
+        if self._timed is None or self._timed:
+            out.update(self._timed_grants(occasion))
+        if sum(out.values()) > self.budget_prbs:
+            left = self.budget_prbs
+            for ue, n in out.items():
+                out[ue] = min(n, left)
+                left -= out[ue]
+        return out
+
+
+def _packet_bits(cfg, ue):
+    size = cfg['packet_size_bits']
+    return size[ue] if isinstance(size, dict) else size
+
+
+@lru_cache(maxsize=None)
+def _guaranteed_tbs_per_prb(n_sym: int) -> np.ndarray:
+    # TBS-ul per PRB garantat pentru orice CQI ≥ c (eficiența din MCS_TABLE nu
+    # e monotonă: un SINR mai bun decât estimarea nu trebuie să golească grantul)
+    per_rb = np.array([compute_tbs(1, select_mcs(c), n_sym) for c in range(16)])
+    return np.minimum.accumulate(per_rb[::-1])[::-1]
+
+
+def sps_grant_prbs(cfg, bits, d_m, n_sym: int, total_prbs: int) -> np.ndarray:
+    """
+    PRB-urile care acoperă un pachet de `bits` biți pe legătura medie a
+    fiecărui UE (pathloss la distanța d_m, fără shadowing / fading), vectorizat.
+    cfg['sps_margin_db'] scade din SINR-ul mediu marja pentru shadowing și
+    fading, pe care grantul fix nu le poate urmări între ocazii.
+    Puterea per PRB scade cu numărul de PRB-uri, deci CQI-ul se reevaluează
+    la noua dimensiune până la punctul fix (dimensiunea doar crește).
+    cfg['sps_mcs'] (dacă e setat) fixează MCS-ul în locul legăturii.
+    """
+    d_m    = np.asarray(d_m, dtype=float)
+    bits   = np.broadcast_to(np.asarray(bits, dtype=float), d_m.shape)
+    per_rb = _guaranteed_tbs_per_prb(n_sym)
+    fixed  = cfg.get('sps_mcs')
+    tx, nf = np.asarray(cfg.prb_tx_dbm), np.asarray(cfg.noise_floor_dbm)
+    pl     = pathloss_db_array(d_m) - reference_pathloss_db() + cfg.pathloss_pl0_db + cfg.get('sps_margin_db', 0.0)
+    n = np.ones(d_m.shape, dtype=np.int64)
+    for _ in range(total_prbs):
+        cqi  = np.full(d_m.shape, fixed) if fixed is not None else \
+            sinr_to_cqi_array(tx[n] - pl - nf[n])
+        tbs  = per_rb[cqi]
+        need = np.where(tbs > 0, np.ceil(bits / np.maximum(tbs, 1)), total_prbs)
+        need = np.minimum(need, total_prbs).astype(np.int64)
+        if (need <= n).all():
+            break
+        n = np.maximum(n, need)
+    return n
+
+
+def resize_sps(cfg, sps_groups: dict, ue_distances, total_prbs: int):
+    """
+    Redimensionează granturile configurate după legătura curentă (apelat la
+    tick-urile de mobilitate); doar UE-ii al căror număr de PRB-uri se schimbă
+    sunt reconfigurați.
+    """
+    if cfg.get('sps_mcs') is not None:
+        return
+    dist = np.asarray(ue_distances, dtype=float)
+    size = cfg['packet_size_bits']
+    for sps in sps_groups.values():
+        ues, _ = sps.members()
+        if not len(ues):
+            continue
+        bits = np.array([size[int(ue)] for ue in ues]) if isinstance(size, dict) else size
+        sps.resize(sps_grant_prbs(cfg, bits, dist[ues], sps.n_sym, total_prbs))
+
+
+def build_sps(cfg, occasions, tm, slot_ms, total_prbs, ue_distances):
+    """
+    Activează granturi configurate pentru ocaziile semi-persistente:
+      - fără slicing ('semi-persistent'): un grup cu toți UE-ii (cheia None)
+      - cu slicing: câte un grup per slice SPS din slice_profiles (cheia = slice),
+        cu bugetul de PRB-uri al slice-ului
+    Perioada grantului = perioada de trafic a UE-ului (cfg['sps_period_ms']
+    o suprascrie), exprimată exact în ocazii (și fracționar); offset-ul e
+    momentul primului pachet; n_prbs acoperă un pachet pe legătura UE-ului la
+    activare (sps_grant_prbs), redimensionat apoi de resize_sps.
+    Returnează {cheie: SpsScheduler} (gol dacă cfg['sps_enabled'] e fals).
+    """
+    if not cfg.get('sps_enabled', True):
+        return {}
+    mode   = cfg['scheduler_mode']
+    groups = {}   # cheie -> (UE-uri, buget PRB, ocazii per slot, simboluri per ocazie)
+    if mode == 'semi-persistent':
+        n_sym = min(o.n_sym for o in occasions)
+        groups[None] = (list(tm.buffers), total_prbs, len(occasions), n_sym)
+    elif mode == 'slice':
+        mapping  = cfg.get('ue_slice_mapping', {})
+        profiles = cfg.get('slice_profiles_static', slice_profiles)
+        budgets  = split_slice_prbs(total_prbs, cfg.slice_shares)
+        for sl, prof in profiles.items():
+            ues = sorted(ue for ue, s in mapping.items() if s == sl)
+            if prof.get('scheduler_mode') != 'semi-persistent' or not ues:
+                continue
+            mini = [o for o in occasions if o.group == sl]
+            if mini:
+                groups[sl] = (ues, budgets.get(sl, 0), mini[0].per_slot, min(o.n_sym for o in mini))
+            else:
+                groups[sl] = (ues, budgets.get(sl, 0), 1, max(o.n_sym for o in occasions))
+
+    dist = np.asarray(ue_distances, dtype=float)
+    out = {}
+    for key, (ues, budget, per_slot, n_sym) in groups.items():
+        sps    = SpsScheduler(budget, per_slot, n_sym)
+        occ_ms = slot_ms / per_slot
+        ues    = [ue for ue in ues if tm.buffers.get(ue)]
+        bits   = [_packet_bits(cfg, ue) for ue in ues]
+        n_prbs = sps_grant_prbs(cfg, bits, dist[ues], n_sym, total_prbs) if ues else []
+        for ue, n in zip(ues, n_prbs):
+            period_ms = cfg.get('sps_period_ms') or tm.ue_periods_ms.get(ue, slot_ms)
+            sps.activate(ue, period_ms / occ_ms, tm.buffers[ue][0]['time_ms'] / occ_ms, n)
+        out[key] = sps
+    return out
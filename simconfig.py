@@ -0,0 +1,234 @@
+# simulator/simconfig.py
+
+import copy
+from collections.abc import Mapping
+from dataclasses import dataclass
+from numbers import Integral, Real
+from types import MappingProxyType
+
+from simulator.config import default_params, NUMEROLOGIES, PRB_TABLE, MCS_TABLE, slice_profiles
+from simulator.frames import FrameParams, get_frame_params
+from simulator.channel import prb_tx_power_dbm, noise_floor_dbm, reference_pathloss_db
+from simulator.mobility import MOBILITY_MODELS
+from simulator.scheduler import EDF_MODES
+from simulator.traffic_models import TRAFFIC_MODELS
+
+# ────────────────────────────────────────────────────────────
+#    CONFIGURAREA COMPILATĂ A UNUI SCENARIU
+# ────────────────────────────────────────────────────────────
+# compile_config() validează o singură dată dicționarul de parametri și
+# precalculează constantele derivate pe care funcțiile din bucla de sloturi
+# le recalculau la fiecare apel (puterea per PRB, zgomotul termic, durata
+# slotului, numărul de PRB-uri, pierderea de referință). SimConfig e imuabil
+# și se transmite explicit fiecărui subsistem; se citește și ca un dict
+# (cfg["n_ues"], cfg.get(...)), deci codul existent rămâne neschimbat.
+
+MAX_PRBS          = 275          # N_RB maxim într-un purtător NR (TS 38.101)
+SCHEDULER_MODES   = ("dynamic", "semi-persistent", "slice") + EDF_MODES
+SLOT_TYPES        = ("full", "mini")
+CHANNEL_MODELS    = ("wideband", "frequency_selective")
+ESM_METHODS       = ("eesm", "miesm")
+TRAFFIC_GENERATORS = ("python", "numpy")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class SimConfig(Mapping):
+    params:          Mapping        # parametrii compleți (impliciți + suprascrieri), doar citire
+    frame:           FrameParams    # durata simbolului, a slotului și a mini-sloturilor
+    total_prbs:      int
+    total_slots:     int            # sloturi în sim_time_ms
+    slot_ms:         float
+    prb_tx_dbm:      tuple          # n_prbs -> puterea Tx per PRB (dBm), pentru 0..total_prbs
+    noise_floor_dbm: tuple          # n_prbs -> zgomotul termic pe n_prbs PRB-uri (dBm)
+    pathloss_pl0_db: float          # pierderea log-distance la distanța de referință
+    slice_mapping:   Mapping        # UE -> slice (gol fără slicing)
+    slice_shares:    Mapping        # slice -> fracțiune din PRB-uri, normalizată la 1
+
+    def __getitem__(self, key):
+        return self.params[key]
+
+    def __iter__(self):
+        return iter(self.params)
+
+    def __len__(self):
+        return len(self.params)
+
+    def __contains__(self, key):
+        return key in self.params
+
+    def get(self, key, default=None):
+        return self.params.get(key, default)
+
+    def replace(self, **overrides) -> "SimConfig":
+        # O configurație nouă, revalidată, cu parametrii suprascriși
+        return compile_config({**self.params, **overrides})
+
+    def __reduce__(self):
+        # Prin pickle (checkpoint, procese worker) trec doar parametrii;
+        # tabelele se recalculează identic la încărcare
+        return compile_config, (dict(self.params),)
+
+
+# ────────────────────────────────────────────────────────────
+#    VALIDARE
+# ────────────────────────────────────────────────────────────
+
+def _total_prbs(bw_mhz, scs_khz) -> int:
+    return PRB_TABLE.get((bw_mhz, scs_khz), int((bw_mhz * 1e6) / (scs_khz * 1e3 * 12)))
+
+
+def _positive(cfg, key, errors):
+    value = cfg.get(key)
+    if not isinstance(value, Real) or value <= 0:
+        errors.append(f"{key} trebuie să fie pozitiv (primit {value!r})")
+
+
+def _check_mini_symbols(key, mini, errors):
+    # Primul simbol e de control (rb.compute_tbs), deci un mini-slot de un
+    # singur simbol nu poate transporta date
+    if any(not isinstance(n, Integral) or not 2 <= n <= 14 for n in mini):
+        errors.append(f"{key}={mini!r}: fiecare mini-slot are între 2 și 14 simboluri "
+                      "(un simbol de control + cel puțin unul de date)")
+
+
+def _one_of(cfg, key, options, errors):
+    if cfg.get(key) not in options:
+        errors.append(f"{key}={cfg.get(key)!r} necunoscut; opțiuni: {', '.join(map(str, options))}")
+
+
+def validate(cfg: Mapping) -> list:
+    """
+    Erorile de configurare ale parametrilor compleți `cfg` (listă goală dacă
+    scenariul e valid): valori în afara domeniului, moduri necunoscute și
+    combinații imposibile (lățime de bandă / SCS, mini-sloturi, slicing).
+    """
+    errors = []
+    if cfg.get("scs_mu") not in NUMEROLOGIES:
+        errors.append(f"scs_mu={cfg.get('scs_mu')!r} necunoscut; opțiuni: {sorted(NUMEROLOGIES)}")
+    for key in ("bandwidth_mhz", "sim_time_ms"):
+        _positive(cfg, key, errors)
+    n_ues = cfg.get("n_ues")
+    if not isinstance(n_ues, Integral) or isinstance(n_ues, bool) or n_ues < 1:
+        errors.append(f"n_ues trebuie să fie un întreg ≥ 1 (primit {n_ues!r})")
+
+    if not errors:
+        scs_khz = NUMEROLOGIES[cfg["scs_mu"]]
+        n_rb    = _total_prbs(cfg["bandwidth_mhz"], scs_khz)
+        if not 1 <= n_rb <= MAX_PRBS:
+            errors.append(f"combinație lățime de bandă / SCS invalidă: {cfg['bandwidth_mhz']} MHz la "
+                          f"{scs_khz} kHz dă {n_rb} PRB-uri (permis 1..{MAX_PRBS})")
+
+    # trafic
+    traffic = cfg.get("traffic_type")
+    if traffic != "trace" and traffic not in TRAFFIC_MODELS:
+        errors.append(f"traffic_type={traffic!r} necunoscut; opțiuni: trace, {', '.join(TRAFFIC_MODELS)}")
+    if traffic == "trace" and not cfg.get("traffic_trace_path"):
+        errors.append("traffic_type='trace' necesită 'traffic_trace_path'")
+    _one_of(cfg, "traffic_generator", TRAFFIC_GENERATORS, errors)
+    size = cfg.get("packet_size_bits")
+    sizes = size.values() if isinstance(size, dict) else [size]
+    if any(not isinstance(s, Integral) or s <= 0 for s in sizes):
+        errors.append("packet_size_bits trebuie să fie un întreg pozitiv (sau un dict UE -> întreg pozitiv)")
+
+    # scheduler și structura slotului
+    mode = cfg.get("scheduler_mode")
+    _one_of(cfg, "scheduler_mode", SCHEDULER_MODES, errors)
+    if mode in EDF_MODES:
+        _positive(cfg, "delay_budget_ms", errors)
+    _one_of(cfg, "slot_type", SLOT_TYPES, errors)
+    if cfg.get("slot_type") == "mini" and mode != "slice":
+        mini = cfg.get("mini_symbols") or []
+        _check_mini_symbols("mini_symbols", mini, errors)
+        if not mini:
+            errors.append("slot_type='mini' necesită o listă mini_symbols nevidă")
+    if cfg.get("sps_mcs") is not None and cfg.get("sps_mcs") not in MCS_TABLE:
+        errors.append(f"sps_mcs={cfg.get('sps_mcs')!r} nu e în MCS_TABLE (0..{max(MCS_TABLE)}) "
+                      "sau None (MCS-ul legăturii)")
+    if cfg.get("sps_period_ms") is not None:
+        _positive(cfg, "sps_period_ms", errors)
+    if not isinstance(cfg.get("sps_margin_db", 0.0), Real) or cfg.get("sps_margin_db", 0.0) < 0:
+        errors.append(f"sps_margin_db trebuie să fie ≥ 0 dB (primit {cfg.get('sps_margin_db')!r})")
+
+    # slicing
+    if mode == "slice":
+        profiles = cfg.get("slice_profiles_static", slice_profiles)
+        mapping  = cfg.get("ue_slice_mapping") or {}
+        shares   = cfg.get("slice_prb_shares") or {}
+        if not mapping or not shares:
+            errors.append("scheduler_mode='slice' necesită 'ue_slice_mapping' și 'slice_prb_shares'")
+        unknown = sorted((set(mapping.values()) | set(shares)) - set(profiles))
+        if unknown:
+            errors.append(f"slice-uri necunoscute: {unknown}; opțiuni: {sorted(profiles)}")
+        if any(s < 0 for s in shares.values()) or (shares and sum(shares.values()) <= 0):
+            errors.append("slice_prb_shares trebuie să fie nenegative, cu sumă pozitivă")
+        for sl, prof in profiles.items():
+            if prof.get("mini_symbols"):
+                _check_mini_symbols(f"slice_profiles[{sl!r}].mini_symbols", prof["mini_symbols"], errors)
+
+    # canal și mobilitate
+    _one_of(cfg, "channel_model", CHANNEL_MODELS, errors)
+    _one_of(cfg, "esm_method", ESM_METHODS, errors)
+    if cfg.get("crn_seed") is not None and cfg.get("channel_model") != "wideband":
+        errors.append("crn_seed (realizări comune ale canalului) e disponibil doar cu channel_model='wideband'")
+    _one_of(cfg, "mobility_model", tuple(MOBILITY_MODELS), errors)
+    if cfg.get("mobility_model") == "trace" and not cfg.get("mobility_trace_path"):
+        errors.append("mobility_model='trace' necesită 'mobility_trace_path'")
+    return errors
+
+
+# ────────────────────────────────────────────────────────────
+#    COMPILARE
+# ────────────────────────────────────────────────────────────
+
+def compile_config(params: Mapping = None) -> SimConfig:
+    """
+    Completează `params` cu default_params, validează rezultatul și
+    precalculează constantele derivate. Ridică ValueError cu toate erorile
+    găsite, înainte de orice lucru al simulării. Un SimConfig primit e
+    întors neschimbat. Parametrii sunt copiați în adâncime: listele și
+    dicționarele imbricate (mini_symbols, packet_size_bits pe slice,
+    ue_slice_mapping) nu rămân partajate cu default_params sau cu apelantul.
+    """
+    if isinstance(params, SimConfig):
+        return params
+    cfg = copy.deepcopy({**default_params, **(params or {})})
+    errors = validate(cfg)
+    if errors:
+        raise ValueError("configurație invalidă:\n  - " + "\n  - ".join(errors))
+
+    fp      = get_frame_params(cfg["scs_mu"], cfg["mini_symbols"])
+    n_rb    = _total_prbs(cfg["bandwidth_mhz"], fp.scs_khz)
+    tx, nd, nf = cfg["tx_power_dbm"], cfg["noise_density_dbm_hz"], cfg["noise_figure_db"]
+
+    shares = {}
+    if cfg["scheduler_mode"] == "slice":
+        raw    = cfg["slice_prb_shares"]
+        total  = sum(raw.values()) or 1.0
+        shares = {sl: share / total for sl, share in raw.items()}
+
+    return SimConfig(
+        params          = MappingProxyType(cfg),
+        frame           = fp,
+        total_prbs      = n_rb,
+        total_slots     = int((cfg["sim_time_ms"] * 1000) / fp.slot_duration_us),
+        slot_ms         = fp.slot_duration_us / 1000.0,
+        prb_tx_dbm      = tuple(prb_tx_power_dbm(tx, n) for n in range(n_rb + 1)),
+        noise_floor_dbm = tuple(noise_floor_dbm(nd, nf, n, fp.scs_khz) for n in range(n_rb + 1)),
+        pathloss_pl0_db = reference_pathloss_db(),
+        slice_mapping   = MappingProxyType(dict(cfg.get("ue_slice_mapping") or {})),
+        slice_shares    = MappingProxyType(shares),
+    )
+
+
+if __name__ == "__main__":
+    # python -m simulator.simconfig '{"scs_mu": 0, "bandwidth_mhz": 100}'
+    import json
+    import sys
+
+    params = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    try:
+        c = compile_config(params)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    print(f"{c.total_prbs} PRB-uri, slot {c.slot_ms:g} ms, {c.total_slots} sloturi, "
+          f"zgomot {c.noise_floor_dbm[c.total_prbs]:.2f} dBm, P/PRB {c.prb_tx_dbm[c.total_prbs]:.2f} dBm")
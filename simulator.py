@@ -1,23 +1,39 @@
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 import random
 import math
 
+import numpy as np
+
 # Importăm funcțiile de adaptare a legăturii și de estimare BLER
-from simulator.link_adaptation import select_mcs, MCSParams, estimate_bler
+from simulator.link_adaptation import select_mcs, select_mcs_effective, MCSParams, estimate_bler
 # Importăm funcțiile pentru calculul caracteristicilor canalului
-from simulator.channel import compute_pathloss, compute_sinr, sinr_to_cqi
-# Obținem parametrii cadrului (slot/full sau mini-slot)
-from simulator.frames import get_frame_params
+from simulator.channel import (compute_pathloss, compute_sinr, sinr_to_cqi, FrequencySelectiveChannel,
+                               ChannelRealizations)
+# Configurarea compilată: parametri validați, cadrul (slot / mini-slot) și tabelele derivate
+from simulator.simconfig import compile_config
 # Scheduler-ul care decide distribuția PRB-urilor între UE
-from simulator.scheduler import allocate_rb
+from simulator.scheduler import allocate_rb, build_sps, resize_sps, EdfScheduler, EDF_MODES
 # Managerul traficului (buffer-urile cu pachete) pentru UE-uri
-from simulator.traffic import TrafficManager
+from simulator.traffic import TrafficManager, ActiveSet
 # Calculul Transport Block Size pentru fiecare alocare
-from simulator.rb import compute_tbs
+from simulator.rb import compute_tbs, prbs_for_bits
 # Managerul HARQ (retransmisii și statistică)
 from simulator.harq_manager import HarqManager
-# Parametri impliciți și tabelul de PRB-uri per configurare BW/SCS
-from simulator.config import default_params, PRB_TABLE
+# Grila de resurse PRB × simbol și ocaziile de transmisie (slot / mini-slot)
+from simulator.resource_grid import ResourceGrid, build_occasions, mask_indices
+# Motorul de mobilitate vectorizat și înregistrarea compactă a distanțelor
+from simulator.mobility import MobilityEngine, PositionRecorder, DistanceTrace
+# Seriile de timp cu rezoluție fixă (utilizare PRB, backlog, HARQ, livrări)
+from simulator.telemetry import Telemetry, TelemetrySeries
+# Urmărirea eșantionată a vieții pachetelor (sosire, SR, grant, HARQ, ACK/drop)
+from simulator.tracer import PacketTracer, PacketTrace, GRANT, HARQ_START, NACK, ACK
+# Instantanee periodice de progres (pentru interfața web)
+from simulator.progress import ProgressReporter
+
+if TYPE_CHECKING:
+    # Doar pentru adnotări: simulator.memory se importă leneș, la cerere
+    from simulator.memory import MemoryReport
 
 
 # ────────────────────────────────────────────────────────────
@@ -80,227 +96,542 @@ class SimulationResult:
     first_tx:       list
     delivered_logs: list
     harq_stats:     list
-    distance_log: list
+    distance_log:   DistanceTrace   # distanțe eșantionate (slot × UE), nu câte un dict per mișcare
+    simulated_slots: int = 0        # câte sloturi au fost efectiv simulate
+    event_log:      str = None      # baza fișierelor jurnalului binar (vezi simulator.eventlog)
+    telemetry:      TelemetrySeries = None   # serii de timp pe bin-uri de sloturi
+    trace:          PacketTrace = None       # evenimentele pachetelor urmărite (opțional)
+    memory:         "MemoryReport" = None    # contabilitatea memoriei (vezi simulator.memory)
 
 
 # ────────────────────────────────────────────────────────────
-#    MOBILITATEA UE-URILOR
+#    TRANSMISIA UNUI PACHET ÎNTR-UN TTI
 # ────────────────────────────────────────────────────────────
 
-def init_positions(n_ues: int, R: float) -> dict:
-    # Generăm poziții uniforme pe aria cercului de rază R
-    pos = {}
-    for ue in range(n_ues):
-        r = R * math.sqrt(random.random())  # distribuție uniformă în suprafață
-        theta = random.random() * 2 * math.pi
-        pos[ue] = [r * math.cos(theta), r * math.sin(theta)]
-    return pos
-
-def init_speeds(n_ues: int) -> dict:
-    # Definim viteze: 70% pietoni (0.5–1.5 m/s), 30% vehicule (10–15 m/s)
-    speeds = {}
-    for ue in range(n_ues):
-        if random.random() < 0.7:
-            speeds[ue] = random.uniform(0.5, 1.5)
+def transmit_packet(ev, ue, slot, n_prbs, dur_us, num_sym, distance_m, scs_khz,
+                    cfg, tm, hm, arrival_times, interference_mw=0.0, tbs_scale=1.0, tracer=None,
+                    fading_db=None, draws=None):
+    """
+    Transmite (o parte din) pachetul `ev` al UE-ului pe `n_prbs` PRB-uri:
+      - canal (pathloss, shadowing, fast fading, interferență opțională)
+      - alegerea MCS, calculul TBS, test BLER și pornirea HARQ la nevoie
+      - tbs_scale < 1 reduce TBS-ul util când o parte din RE-uri au fost
+        perforate de mini-sloturi URLLC
+      - tracer: PacketTracer opțional, care notează grant-ul și rezultatul
+        pentru pachetele urmărite
+      - fading_db: câștigul de fading al fiecărui PRB alocat (canal selectiv
+        în frecvență); MCS-ul și SINR-ul raportat vin atunci din SINR-ul
+        efectiv (cfg['esm_method']: EESM / MIESM) peste aceste PRB-uri
+      - draws: SlotDraws-ul slotului (realizări comune ale canalului, vezi
+        channel.ChannelRealizations); fără el, extragerile vin din `random`
+    Returnează (latență_ms, înregistrare_livrare) la ACK, altfel None
+    (pachetul rămâne în buffer-ul UE pentru retransmisie).
+    """
+    bw_mhz            = cfg["bandwidth_mhz"]
+    sigma_shadow_db   = cfg["shadow_sigma_db"]
+    apply_fast_fading = cfg["fast_fading"]
+
+    # 1) Calcul pierdere de cale și SINR de bază
+    pl_db    = compute_pathloss(distance_m, pl0_db=cfg.pathloss_pl0_db)
+    sinr_lin = compute_sinr(distance_m, n_prbs, bw_mhz, scs_khz, model="log_distance",
+                            interference_mw=interference_mw, fast_fading=fading_db is None, cfg=cfg,
+                            shadow_db=None if draws is None else draws.shadow_db[ue],
+                            rayleigh_db=None if draws is None else draws.rayleigh_db[ue])
+
+    # 2) Aplicăm shadowing și fast fading
+    shadow_db = random.gauss(0.0, sigma_shadow_db) if draws is None else draws.shadow_z[ue] * sigma_shadow_db
+    if fading_db is None:
+        if draws is None:
+            fad_lin = abs(random.gauss(0.0, 1.0)) if apply_fast_fading else 1.0
         else:
-            speeds[ue] = random.uniform(10.0, 15.0)
-    return speeds
+            fad_lin = draws.fading[ue] if apply_fast_fading else 1.0
+
+        # 3) Combinăm în SINR final în dB
+        sinr_db       = 10 * math.log10(sinr_lin) - shadow_db
+        sinr_with_f   = (10 ** (sinr_db / 10.0)) * fad_lin
+        final_sinr_db = 10 * math.log10(sinr_with_f)
 
-def init_headings(n_ues: int) -> dict:
-    # Direcții random [0, 2π) pentru fiecare UE
-    return { ue: random.random() * 2 * math.pi for ue in range(n_ues) }
+        # 4) Alegerea MCS pe baza CQI
+        cqi = sinr_to_cqi(final_sinr_db)
+        mcs: MCSParams = select_mcs(cqi)
+    else:
+        # 3-4) SINR per PRB alocat → SINR efectiv și MCS într-un singur pas
+        sinr_db = 10 * math.log10(sinr_lin) - shadow_db
+        mcs, final_sinr_db = select_mcs_effective(sinr_db + fading_db, cfg.get("esm_method", "eesm"))
+        cqi = mcs.index
+    ev["spectral_efficiency"] = mcs.Qm * mcs.code_rate
+
+    # 5) Calcul câți biți pot fi trimiși în acest TTI
+    tbs_from_table = compute_tbs(n_prbs, mcs, num_sym)
+    if tbs_scale < 1.0:
+        tbs_from_table = int(tbs_from_table * tbs_scale) // 8 * 8
+    n_tx_bits      = min(tbs_from_table, ev["remaining_bits"])
+    ev["remaining_bits"] -= n_tx_bits
+    if tracer is not None:
+        tracer.log(ev, GRANT, slot, n_prbs, mcs.index)
+
+    if ev["remaining_bits"] > 0:
+        # 6) Dacă nu încape, inițiem HARQ
+        if tracer is not None:
+            tracer.log(ev, HARQ_START, slot, ev["attempt"], ev["remaining_bits"])
+        tm.buffers[ue].appendleft(ev)
+        hm.start_harq_tx(ue, slot, n_prbs, mcs.index, n_tx_bits, arrival_times[ue])
+        return None
+
+    # 7) Dacă încape complet, test BLER
+    bler = estimate_bler(final_sinr_db, mcs.index)
+    if (random.random() if draws is None else draws.u_tx[ue]) < bler:
+        # NACK → retransmitere HARQ
+        if tracer is not None:
+            tracer.log(ev, NACK, slot, ev["attempt"])
+        ev["remaining_bits"] = ev["size_bits"]
+        tm.buffers[ue].appendleft(ev)
+        hm.start_harq_tx(ue, slot, n_prbs, mcs.index, n_tx_bits, arrival_times[ue])
+        return None
+
+    # 8) ACK → calculăm latența totală și construim înregistrarea
+    params_latency = {
+        "sr_rounds":                 ev.get("sr_rounds", 0),
+        "k_slots":                   ev.get("k_slots",   0),
+        "slot_duration_us":          dur_us,
+        "packet_size_bits":          ev["size_bits"],
+        "spectral_efficiency":       ev["spectral_efficiency"],
+        "bandwidth_hz":              bw_mhz * 1e6,
+        "coding_time_us":            cfg.get("coding_time_us", 0.0),
+        "decoding_time_us":          cfg.get("decoding_time_us", 0.0),
+        "num_retx":                  ev["attempt"] - 1,
+        "feedback_delay_us":         cfg.get("feedback_delay_us", 0.0),
+        "retransmission_duration_us":cfg.get("retransmission_duration_us", 0.0),
+        "distance_m":                distance_m,
+    }
+    latency = total_latency(params_latency)
+    if tracer is not None:
+        tracer.log(ev, ACK, slot, ev["attempt"], latency)
+    record = {
+        "ue":           ue,
+        "slot":         slot,
+        "latency_ms":   round(latency, 3),
+        "distance_m":   round(distance_m, 2),
+        "pathloss_db":  round(pl_db, 2),
+        "sinr_db":      round(final_sinr_db, 2),
+        "cqi":          cqi,
+        "mcs_idx":      mcs.index,
+        "Qm":           mcs.Qm,
+        "code_rate":    mcs.code_rate,
+        "n_prbs":       n_prbs,
+        "tbs_teoretic": tbs_from_table,
+        "tbs_bits":     n_tx_bits,
+        "first_tx":     (ev["attempt"] == 1),
+    }
+    return latency, record
+
+
+def prepare_packet(ev, ue, arrival_times, tracer=None, slot=0):
+    """
+    Marchează o nouă încercare de transmisie pentru pachetul `ev`:
+    la prima apariție inițializează biții rămași, contoarele SR / k_slots
+    și momentul sosirii UE-ului (și îl propune tracer-ului, dacă există).
+    """
+    # Inițializare prima dată când ev apare: număr biți, încercări, SR, slots
+    if "remaining_bits" not in ev:
+        ev.update({
+            "remaining_bits":       ev["size_bits"],
+            "attempt":              0,
+            "sr_rounds":            0,
+            "k_slots":              0,
+            "spectral_efficiency":  0.0,
+            "has_been_allocated":   False
+        })
+        arrival_times[ue] = ev["time_ms"]
+        if tracer is not None:
+            tracer.start(ev, ue, slot)
+
+    # Contor încercare + calcul SR și scheduling delay prima dată
+    ev["attempt"] += 1
+    if not ev["has_been_allocated"]:
+        ev["sr_rounds"] += 1
+        ev["k_slots"]    += 1
+        ev["has_been_allocated"] = True
 
 
 # ────────────────────────────────────────────────────────────
-#    FUNCȚIA PRINCIPALĂ DE SIMULARE
+#    SIMULAREA PAS CU PAS (SLOT CU SLOT)
 # ────────────────────────────────────────────────────────────
 
-def run_scenario(params: dict = None) -> SimulationResult:
-    # 1) Citim configurarea de bază și suprascriem cu parametrii primiți
-    cfg = default_params.copy()
-    if params:
-        cfg.update(params)
-
-    # 2) Extragem parametrii fading (shadowing, fast fading)
-    sigma_shadow_db   = cfg.get("shadow_sigma_db", default_params.get("shadow_sigma_db", 8.0))
-    apply_fast_fading = cfg.get("fast_fading",     default_params.get("fast_fading", True))
-
-    # 3) Parametri cadrului (slot / mini-slot) și număr total de PRB-uri disponibile
-    fp       = get_frame_params(cfg["scs_mu"], cfg.get("mini_symbols"))
-    bw_mhz   = cfg["bandwidth_mhz"]
-    scs_khz  = fp.scs_khz
-    total_prbs = PRB_TABLE.get((bw_mhz, scs_khz), int((bw_mhz * 1e6) / (scs_khz * 1e3 * 12)))
-
-    # 4) Inițializăm managerii de trafic și HARQ
-    tm = TrafficManager(cfg["n_ues"], cfg["traffic_type"], cfg)
-    tm.initialize()  # populăm buffer-ele cu pachete
-    symbol_duration_ms = fp.symbol_duration_us / 1000.0
-    num_symbols       = fp.num_symbols_per_slot
-    full_slot_ms      = fp.slot_duration_us / 1000.0
-    hm = HarqManager(cfg["n_ues"], symbol_duration_ms, num_symbols, full_slot_ms)
-
-    # 5) Inițializare mobilitate UE: poziții, viteze, direcții → calcul distanțe
-    cell_r   = cfg.get("cell_radius", 500)
-    pos      = init_positions(cfg["n_ues"], cell_r)
-    print("[DEBUG] Poziții inițiale UE:", pos)
-    speeds   = init_speeds(cfg["n_ues"])
-    headings = init_headings(cfg["n_ues"])
-    ue_dist  = { ue: math.hypot(x, y) for ue, (x, y) in pos.items() }
-    print("[DEBUG] Distanțe inițiale UE:", ue_dist)
-    # 6) Pregătim structurile pentru rezultate
-    latencies, ue_ids, slots, first_tx = [], [], [], []
-    delivered_logs, arrival_times = [], {}
-
-    # 7) Alegem durata fiecărui TTI (slot complet sau liste de mini-sloturi)
-    if cfg["slot_type"] == "mini":
-        durations_us = fp.mini_slot_durations_us
-        num_sym      = cfg["mini_symbols"][0]
-    else:
-        durations_us = [fp.slot_duration_us]
-        num_sym      = fp.num_symbols_per_slot
-    total_slots = int((cfg["sim_time_ms"] * 1000) / fp.slot_duration_us)
-    distance_log = []
-    # 8) Bucla principală: pentru fiecare slot și sub-slot (mini)
-    for slot in range(total_slots):
-        for dur_us in durations_us:
-            now_ms = (slot * fp.slot_duration_us + dur_us) / 1000.0
-
-            # 8.1) Scheduler: alocăm PRB-uri pe baza funcției allocate_rb
-            alloc = allocate_rb(tm.buffers, ue_dist, total_prbs, fp, cfg["scheduler_mode"])
-
-            # 8.2) Procesăm fiecare UE cu buffer și resurse alocate
+class Simulation:
+    """
+    Starea completă a unei simulări (buffer-e de trafic, procese HARQ,
+    mobilitate, rezultate acumulate), avansată slot cu slot prin step().
+    Obiectul poate fi salvat oricând cu simulator.checkpoint.save_checkpoint
+    și reluat ulterior bit cu bit.
+    """
+
+    def __init__(self, params: dict = None):
+        # 1) Configurarea compilată: default_params + parametrii primiți, validată
+        #    înainte de orice altă inițializare (ValueError pentru combinații invalide)
+        self.cfg = cfg = compile_config(params)
+        # Sămânța opțională face rularea reproductibilă independent de apelant
+        if cfg.get("seed") is not None:
+            random.seed(cfg["seed"])
+
+        # 2) Parametri cadrului (slot / mini-slot) și număr total de PRB-uri disponibile
+        self.fp         = fp = cfg.frame
+        self.total_prbs = cfg.total_prbs
+
+        # 3) Inițializăm managerii de trafic și HARQ
+        self.tm = TrafficManager(cfg["n_ues"], cfg["traffic_type"], cfg)
+        self.tm.initialize()  # populăm buffer-ele cu pachete
+        self.hm = HarqManager(cfg["n_ues"], fp.symbol_duration_us / 1000.0,
+                              fp.num_symbols_per_slot, cfg.slot_ms, cfg)
+
+        # 4) Inițializare mobilitate UE: motor vectorizat (poziții, viteze, direcții)
+        #    RNG-ul NumPy e derivat din `random`, deci random.seed() controlează și mobilitatea
+        rng           = np.random.default_rng(random.getrandbits(63))
+        self.mobility = MobilityEngine.from_config(cfg["n_ues"], cfg, rng)
+        self.ue_dist  = self.mobility.distances().tolist()   # indexat după ID-ul UE
+
+        # 4b) Cu cfg['channel_model'] == 'frequency_selective', fading per UE × PRB
+        #     (rapoarte CQI pe subbandă, PRB-uri alese după ele, SINR efectiv)
+        self.channel = None
+        if cfg["channel_model"] == "frequency_selective":
+            self.channel = FrequencySelectiveChannel(
+                cfg["n_ues"], self.total_prbs, fp.scs_khz, fp.slot_duration_us / 1e6, cfg,
+                np.random.default_rng(random.getrandbits(63)))
+            self.noise_prb_dbm = cfg.noise_floor_dbm[1]
+
+        # 4c) Cu cfg['crn_seed'], shadowing-ul, fading-ul și testele BLER ale
+        #     fiecărui (UE, slot) vin din realizări comune: aceeași sămânță dă
+        #     același canal oricărui scheduler (comparații cu variabile comune)
+        self.crn = None
+        if cfg["crn_seed"] is not None:
+            self.crn = ChannelRealizations(cfg["n_ues"], cfg["crn_seed"])
+
+        # 5) Pregătim structurile pentru rezultate
+        self.latencies, self.ue_ids, self.slots, self.first_tx = [], [], [], []
+        self.delivered_logs, self.arrival_times = [], {}
+
+        # 6) Grila PRB × simbol a slotului; ocaziile de transmisie și structurile
+        #    scheduler-ului sunt construite de _build_schedulers()
+        self.grid        = ResourceGrid(self.total_prbs, fp.num_symbols_per_slot)
+        self.total_slots = cfg.total_slots
+        self._build_schedulers()
+
+        # 7) Tick-ul de mobilitate (în sloturi) și eșantionarea distanțelor
+        self.tick_slots = max(1, int(cfg.get("mobility_tick_slots", 1)))
+        self.tick_s     = self.tick_slots * fp.slot_duration_us / 1e6
+        if cfg.get("precompute_mobility", False):
+            self.mobility.precompute(self.total_slots // self.tick_slots, self.tick_s)
+        #    Cu cfg['event_log_path'], livrările, înregistrările HARQ și distanțele
+        #    se scriu într-un jurnal binar pe disc în loc de liste în memorie
+        self.events = None
+        if cfg.get("event_log_path"):
+            from simulator.eventlog import EventLog
+            self.events = EventLog(cfg["event_log_path"], cfg["n_ues"],
+                                   cfg.get("distance_log_every_slots", 10),
+                                   cfg.get("event_log_flush_s", 1.0))
+            self.hm.sink  = self.events
+            self.recorder = self.events
+        else:
+            self.recorder = PositionRecorder(cfg["n_ues"], self.total_slots,
+                                             cfg.get("distance_log_every_slots", 10))
+        self.recorder.record(0, self.mobility.distances())
+
+        # 7b) Telemetrie pe ferestre de cfg['telemetry_bin_slots'] sloturi (0 = dezactivată)
+        self.telemetry = None
+        if cfg.get("telemetry_bin_slots"):
+            self.telemetry = Telemetry(self.total_prbs, cfg["n_ues"], cfg["telemetry_bin_slots"],
+                                       cfg.get("telemetry_bins", 1024), cfg.get("telemetry_per_ue", False))
+        self._harq_mark = (0, 0)
+
+        # 7c) Tracer de pachete: 1 din cfg['trace_sample_every'] și/sau toate
+        #     pachetele UE-urilor din cfg['trace_ues']
+        self.tracer = None
+        if cfg.get("trace_sample_every") or cfg.get("trace_ues"):
+            self.tracer = PacketTracer(fp.slot_duration_us / 1000.0, cfg.get("trace_sample_every"),
+                                       cfg.get("trace_ues"))
+            self.hm.tracer = self.tracer
+
+        # 7d) Contabilitatea memoriei: la fiecare cfg['memory_every_slots'] sloturi
+        #     (0 = dezactivată), cu snapshot-uri tracemalloc dacă cfg['memory_tracemalloc']
+        self.memory = None
+        if cfg.get("memory_every_slots"):
+            from simulator.memory import MemoryAccountant
+            self.memory = MemoryAccountant(cfg["memory_every_slots"], cfg.get("memory_tracemalloc", False))
+
+        # 7e) Raportarea progresului e activă doar în timpul unui run(progress=...)
+        self.progress = None
+
+        # 8) Următorul slot de simulat și indicatorul de terminare
+        self.slot     = 0
+        self.finished = False
+
+    def _build_schedulers(self):
+        """
+        Tot ce depinde de scheduler_mode, construit din self.cfg și din
+        buffer-ele curente; apelat la inițializare și de
+        checkpoint.fork_checkpoint când o variantă schimbă modul.
+        """
+        cfg, fp = self.cfg, self.fp
+        # Ocaziile de transmisie din fiecare slot (slot complet, mini-sloturi,
+        # mini-sloturi URLLC peste eMBB)
+        self.occasions = build_occasions(cfg, fp.num_symbols_per_slot)
+
+        # Granturi configurate (SPS) pentru ocaziile semi-persistente:
+        # tabele precalculate, invalidate doar la activare / eliberare;
+        # dimensiunea grantului urmează legătura fiecărui UE
+        self.sps    = build_sps(cfg, self.occasions, self.tm, cfg.slot_ms, self.total_prbs,
+                                self.ue_dist)
+        self.sps_of = {ue: key for key, sps in self.sps.items() for ue in sps.configs}
+
+        # Regula de scheduling cfg['schedule_arrived_only']: doar UE-urile cu un
+        # pachet deja sosit concurează pentru PRB-uri, nu toate buffer-ele nevide
+        # (implicit). Schimbă rezultatele, deci nu e activată implicit; e
+        # implementată rar, cu ActiveSet, iar alocările întoarse sunt rare
+        # Cu un mod EDF, termenele limită ale UE-urilor active stau într-un
+        # heap indexat, actualizat de ActiveSet (vezi scheduler.EdfScheduler)
+        modes = {o.mode for o in self.occasions}
+        if cfg["scheduler_mode"] == "slice":
+            modes |= {p.get("scheduler_mode") for p in cfg.get("slice_profiles_static", {}).values()}
+        self.edf      = EdfScheduler.from_config(cfg) if modes & set(EDF_MODES) else None
+        self.active   = ActiveSet(self.tm.buffers, self.edf) if cfg.get("schedule_arrived_only", False) else None
+        self.occ_sets = [None if o.ues is None else set(o.ues) for o in self.occasions]
+
+    def __getstate__(self):
+        # Callback-ul de progres aparține apelantului și nu intră în checkpoint
+        state = self.__dict__.copy()
+        state["progress"] = None
+        return state
+
+    @property
+    def done(self) -> bool:
+        return self.finished or self.slot >= self.total_slots
+
+    def _idle(self) -> bool:
+        has_packets = self.active.has_packets() if self.active is not None else self.tm.has_packets()
+        return not has_packets and not self.hm.has_pending()
+
+    def _backlog_bits(self, now_ms: float) -> int:
+        # Biții pachetelor deja sosite și încă netransmise (doar la închiderea unui bin);
+        # dacă ActiveSet e la zi, doar UE-urile din `ready` au pachete sosite
+        bufs = self.tm.buffers.values()
+        if self.active is not None and self.active.now_ms >= now_ms:
+            bufs = (self.tm.buffers[ue] for ue in self.active.ready)
+        total = 0
+        for buf in bufs:
+            for ev in buf:
+                if ev["time_ms"] > now_ms:
+                    break
+                total += ev.get("remaining_bits", ev["size_bits"])
+        return total
+
+    def _channel_view(self, alloc: dict, slot: int):
+        # Pentru UE-urile cu grant în ocazia curentă: câștigurile per PRB și
+        # ordinea de preferință a PRB-urilor (o singură operație pe tot grupul)
+        ues = [ue for ue, n in alloc.items() if n]
+        if not ues:
+            return {}, None, None
+        gains = self.channel.gains_db(ues, slot)
+        wide  = self.channel.wideband_sinr_db(np.asarray(self.ue_dist)[ues], self.cfg["tx_power_dbm"],
+                                              self.noise_prb_dbm)
+        order = self.channel.prb_order(wide[:, None] + gains)
+        return {ue: i for i, ue in enumerate(ues)}, gains, order
+
+    def _serve(self, ue, slot, n_prbs, dur_us, n_sym, tbs_scale=1.0, fading_db=None, draws=None):
+        # Scoatem pachetul din buffer și îl transmitem pe resursele acordate
+        ev = self.tm.pop_packet(ue)
+        prepare_packet(ev, ue, self.arrival_times, self.tracer, slot)
+
+        # Canal, link adaptation, TBS, HARQ și latență
+        out = transmit_packet(ev, ue, slot, n_prbs, dur_us, n_sym, self.ue_dist[ue],
+                              self.fp.scs_khz, self.cfg, self.tm, self.hm, self.arrival_times,
+                              tbs_scale=tbs_scale, tracer=self.tracer, fading_db=fading_db, draws=draws)
+        if out is not None:
+            # stocăm rezultatele (în jurnalul binar, dacă e activ)
+            latency, record = out
+            if self.telemetry is not None:
+                self.telemetry.on_delivery(ue, ev["size_bits"])
+            if self.progress is not None:
+                self.progress.on_delivery(latency)
+            if self.events is not None:
+                self.events.log_delivered({**record, "latency_ms": latency})
+            else:
+                self.latencies.append(latency)
+                self.ue_ids.append(ue)
+                self.slots.append(slot)
+                self.first_tx.append(record["first_tx"])
+                self.delivered_logs.append(record)
+
+        # Grant configurat eliberat când UE-ul nu mai are trafic
+        if ue in self.sps_of and not self.tm.buffers[ue]:
+            self.sps[self.sps_of.pop(ue)].release(ue)
+        if self.active is not None:
+            self.active.update(ue)
+
+    def step(self) -> bool:
+        """
+        Simulează slotul curent (cu toate mini-sloturile sale).
+        Returnează False dacă simularea s-a încheiat.
+        """
+        if self.done:
+            return False
+        cfg, fp, tm, hm = self.cfg, self.fp, self.tm, self.hm
+        slot = self.slot
+
+        # 1) Toți UE-ii se deplasează la fiecare tick de mobilitate; eșantionul de
+        #    distanțe se ia la fiecare interval, cu pozițiile ultimului tick, chiar
+        #    dacă tick-ul nu divide intervalul de eșantionare
+        if slot and slot % self.tick_slots == 0:
+            self.mobility.step(self.tick_s)
+            self.ue_dist = self.mobility.distances().tolist()
+            if self.sps:
+                resize_sps(cfg, self.sps, self.ue_dist, self.total_prbs)
+        if slot and slot % self.recorder.every_slots == 0:
+            self.recorder.record(slot, self.mobility.distances())
+        ue_dist = self.ue_dist
+
+        # 2) Parcurgem ocaziile slotului în ordine; alocările eMBB preemptibile
+        #    se transmit abia la final, după ce mini-sloturile URLLC le-au perforat
+        self.grid.reset()
+        deferred = []
+        active = self.active
+        draws  = self.crn.at(slot) if self.crn is not None else None
+        for occ, occ_set in zip(self.occasions, self.occ_sets):
+            dur_us = occ.n_sym * fp.symbol_duration_us
+            now_ms = (slot * fp.slot_duration_us + (occ.start_sym + occ.n_sym) * fp.symbol_duration_us) / 1000.0
+            if active is not None:
+                active.advance(now_ms)
+
+            # 2.1) Scheduler: granturile configurate (SPS) se citesc din tabel,
+            #      restul ocaziilor trec prin allocate_rb
+            if occ.mode == "semi-persistent" and occ.group in self.sps:
+                alloc = self.sps[occ.group].grants(slot * occ.per_slot + occ.index)
+            elif active is not None:
+                alloc = allocate_rb(tm.buffers, ue_dist, self.total_prbs, fp, occ.mode,
+                                    sps=self.sps, slot=slot, active=active.ready_ues(occ_set),
+                                    edf=self.edf, now_ms=now_ms, n_sym=occ.n_sym, group=occ.group,
+                                    cfg=cfg, draws=draws)
+            else:
+                bufs  = tm.buffers if occ.ues is None else {ue: tm.buffers[ue] for ue in occ.ues}
+                alloc = allocate_rb(bufs, ue_dist, self.total_prbs, fp, occ.mode,
+                                    sps=self.sps, slot=slot,
+                                    edf=self.edf, now_ms=now_ms, n_sym=occ.n_sym, group=occ.group,
+                                    cfg=cfg, draws=draws)
+
+            # 2.2) Plasăm fiecare alocare în grilă și transmitem; cu canal
+            #      selectiv, fiecare UE primește PRB-urile cu CQI-ul raportat cel mai bun
+            rows = None
+            if self.channel is not None:
+                rows, gains, order = self._channel_view(alloc, slot)
             for ue, n_prbs in alloc.items():
                 # sărim dacă nu avem PRB sau nu e nimic în buffer sau e prea devreme
                 if n_prbs == 0 or not tm.buffers[ue] or tm.buffers[ue][0]["time_ms"] > now_ms:
                     continue
-
-                ev = tm.pop_packet(ue)
-
-                # Inițializare prima dată când ev apare: număr biți, încercări, SR, slots
-                if "remaining_bits" not in ev:
-                    ev.update({
-                        "remaining_bits":       ev["size_bits"],
-                        "attempt":              0,
-                        "sr_rounds":            0,
-                        "k_slots":              0,
-                        "spectral_efficiency":  0.0,
-                        "has_been_allocated":   False
-                    })
-                    arrival_times[ue] = ev["time_ms"]
-
-                # Contor încercare + calcul SR și scheduling delay prima dată
-                ev["attempt"] += 1
-                if not ev["has_been_allocated"]:
-                    ev["sr_rounds"] += 1
-                    ev["k_slots"]    += 1
-                    ev["has_been_allocated"] = True
-
-                # 8.3) Actualizare mobilitate UE în acest mini-slot
-                x, y = pos[ue]
-                theta = headings[ue]
-                delta_s = speeds[ue] * (dur_us / 1e6)
-                x_new = x + delta_s * math.cos(theta)
-                y_new = y + delta_s * math.sin(theta)
-                # dacă iese din celulă, schimbă direcția
-                if math.hypot(x_new, y_new) > cell_r:
-                    theta = (theta + math.pi) % (2 * math.pi)
-                    headings[ue] = theta
-                    x_new = x + delta_s * math.cos(theta)
-                    y_new = y + delta_s * math.sin(theta)
-                pos[ue] = [x_new, y_new]
-                print( f"[DEBUG] UE{ue} noua poziție: x={x_new:.2f}, y={y_new:.2f} la slot {slot}")
-                ue_dist[ue] = math.hypot(x_new, y_new)
-                print(f"[DEBUG] UE{ue} noua distanță: x={ue_dist[ue]:.2f}la slot {slot}")
-                distance_log.append({
-                    "ue": ue,
-                    "slot": slot,
-                    "distance_m": round(ue_dist[ue], 2)
-                })
-                # 8.4) Calcul pierdere de cale și SINR de bază
-                pl_db    = compute_pathloss(ue_dist[ue])
-                sinr_lin = compute_sinr(ue_dist[ue], n_prbs, bw_mhz, scs_khz, model="log_distance")
-
-                # 8.5) Aplicăm shadowing și fast fading
-                shadow_db = random.gauss(0.0, sigma_shadow_db)
-                fad_lin   = abs(random.gauss(0.0, 1.0)) if apply_fast_fading else 1.0
-
-                # 8.6) Combinăm în SINR final în dB
-                sinr_db       = 10 * math.log10(sinr_lin) - shadow_db
-                sinr_with_f   = (10 ** (sinr_db / 10.0)) * fad_lin
-                final_sinr_db = 10 * math.log10(sinr_with_f)
-
-                # 8.7) Alegerea MCS pe baza CQI
-                cqi = sinr_to_cqi(final_sinr_db)
-                mcs: MCSParams = select_mcs(cqi)
-                ev["spectral_efficiency"] = mcs.Qm * mcs.code_rate
-
-                # 8.8) Calcul câți biți pot fi trimiși în acest TTI
-                tbs_from_table = compute_tbs(n_prbs, mcs, num_sym)
-                n_tx_bits      = min(tbs_from_table, ev["remaining_bits"])
-                ev["remaining_bits"] -= n_tx_bits
-
-                if ev["remaining_bits"] > 0:
-                    #print(f"[DEBUG] UE{ue} HARQ round {ev['attempt']} – rămân {ev['remaining_bits']} biți")
-                    # 8.9) Dacă nu încape, inițiem HARQ
-                    tm.buffers[ue].appendleft(ev)
-                    hm.start_harq_tx(ue, slot, n_prbs, mcs.index, n_tx_bits, arrival_times[ue])
+                if occ.preempting:
+                    # URLLC cere doar PRB-urile necesare pachetului (MCS robust)
+                    head = tm.buffers[ue][0]
+                    n_prbs = min(n_prbs, prbs_for_bits(head.get("remaining_bits", head["size_bits"]), occ.n_sym))
+                fading = None
+                if rows is not None:
+                    i = rows[ue]
+                    n_prbs = self.grid.allocate(ue, n_prbs, occ.start_sym, occ.n_sym, preemptible=occ.preemptible,
+                                                preempt=occ.preempting, prefer=order[i])
+                    fading = gains[i][mask_indices(self.grid.last_mask(ue))] if n_prbs else None
                 else:
-                    # 8.10) Dacă încape complet, test BLER
-                    bler = estimate_bler(final_sinr_db, mcs.index)
-                    if random.random() < bler:
-                        # NACK → retransmitere HARQ
-                        ev["remaining_bits"] = ev["size_bits"]
-                        tm.buffers[ue].appendleft(ev)
-                        hm.start_harq_tx(ue, slot, n_prbs, mcs.index, n_tx_bits, arrival_times[ue])
-                    else:
-                        # ACK → calculăm latența totală și logăm
-                        params_latency = {
-                            "sr_rounds":                 ev.get("sr_rounds", 0),
-                            "k_slots":                   ev.get("k_slots",   0),
-                            "slot_duration_us":          dur_us,
-                            "packet_size_bits":          ev["size_bits"],
-                            "spectral_efficiency":       ev["spectral_efficiency"],
-                            "bandwidth_hz":              bw_mhz * 1e6,
-                            "coding_time_us":            cfg.get("coding_time_us", 0.0),
-                            "decoding_time_us":          cfg.get("decoding_time_us", 0.0),
-                            "num_retx":                  ev["attempt"] - 1,
-                            "feedback_delay_us":         cfg.get("feedback_delay_us", 0.0),
-                            "retransmission_duration_us":cfg.get("retransmission_duration_us", 0.0),
-                            "distance_m":                ue_dist[ue],
-                        }
-                        latency = total_latency(params_latency)
-                        #print(f"[DEBUG] UE{ue} ACK slot={slot}, latență totală={latency:.3f}ms")
-                        # stocăm rezultatele
-                        latencies.append(latency)
-                        ue_ids.append(ue)
-                        slots.append(slot)
-                        first_tx.append(ev["attempt"] == 1)
-                        delivered_logs.append({
-                            "ue":           ue,
-                            "slot":         slot,
-                            "latency_ms":   round(latency, 3),
-                            "distance_m":   round(ue_dist[ue], 2),
-                            "pathloss_db":  round(pl_db, 2),
-                            "sinr_db":      round(final_sinr_db, 2),
-                            "cqi":          cqi,
-                            "mcs_idx":      mcs.index,
-                            "Qm":           mcs.Qm,
-                            "code_rate":    mcs.code_rate,
-                            "n_prbs":       n_prbs,
-                            "tbs_teoretic": tbs_from_table,
-                            "tbs_bits":     n_tx_bits,
-                            "first_tx":     (ev["attempt"] == 1),
-                        })
-
-            # 8.11) La sfârșitul fiecărui slot complet, procesăm feedback HARQ
-            hm.check_feedback(slot, ue_dist, bw_mhz, scs_khz, tm.buffers, arrival_times)
-            # 8.12) Dacă nu mai avem trafic și HARQ în așteptare, ieșim
-            if not tm.has_packets() and not hm.has_pending():
-                break
-        if not tm.has_packets() and not hm.has_pending():
-            break
-
-    # primim statistici HARQ (rundă, latențe)
-    harq_stats = hm.get_latency_stats()
-    # întoarcem toate rezultatele într-un singur obiect
-    return SimulationResult(latencies, ue_ids, slots, first_tx, delivered_logs, harq_stats, distance_log )
+                    n_prbs = self.grid.allocate(ue, n_prbs, occ.start_sym, occ.n_sym,
+                                                preemptible=occ.preemptible, preempt=occ.preempting)
+                if n_prbs == 0:
+                    continue
+                if occ.preemptible:
+                    deferred.append((ue, n_prbs, occ, dur_us, fading))
+                    continue
+                self._serve(ue, slot, n_prbs, dur_us, occ.n_sym, fading_db=fading, draws=draws)
+
+            # 2.3) La sfârșitul fiecărei ocazii, procesăm feedback HARQ
+            finished = hm.check_feedback(slot, ue_dist, cfg["bandwidth_mhz"], fp.scs_khz, tm.buffers,
+                                         self.arrival_times, draws=draws)
+            if active is not None:
+                for ue in finished:
+                    active.update(ue)
+
+        # 3) Alocările eMBB, cu TBS redus proporțional cu RE-urile perforate
+        for ue, n_prbs, occ, dur_us, fading in deferred:
+            if tm.buffers[ue]:
+                self._serve(ue, slot, n_prbs, dur_us, occ.n_sym,
+                            tbs_scale=1.0 - self.grid.punctured_fraction(ue), fading_db=fading, draws=draws)
+
+        # 4) Telemetria slotului: ocuparea grilei, HARQ, backlog la final de bin
+        util = self.grid.utilization() if self.telemetry is not None or self.progress is not None else 0.0
+        if self.telemetry is not None:
+            acked, dropped = hm.n_acked, hm.n_dropped
+            self.telemetry.on_harq(acked - self._harq_mark[0], dropped - self._harq_mark[1])
+            self._harq_mark = (acked, dropped)
+            end_ms = (slot + 1) * fp.slot_duration_us / 1000.0
+            self.telemetry.end_slot(slot, util * self.total_prbs, len(hm.active),
+                                    lambda: self._backlog_bits(end_ms))
+
+        # 5) Dacă nu mai avem trafic și HARQ în așteptare, ne oprim
+        if self._idle():
+            self.finished = True
+
+        self.slot += 1
+        if self.progress is not None:
+            self.progress.end_slot(self, util)
+        if self.memory is not None:
+            self.memory.end_slot(self)
+        return not self.done
+
+    def run(self, until_slot: int = None, progress=None) -> "SimulationResult":
+        """
+        Rulează până la `until_slot` (exclusiv) sau până la final.
+        Dacă cfg conține 'checkpoint_path' și 'checkpoint_every_slots',
+        salvează periodic starea pe disc.
+        progress: callback(snapshot: dict) opțional, apelat periodic (cel mult
+        o dată la cfg['progress_interval_s'] secunde) și o dată la final.
+        """
+        stop  = self.total_slots if until_slot is None else min(until_slot, self.total_slots)
+        path  = self.cfg.get("checkpoint_path")
+        every = int(self.cfg.get("checkpoint_every_slots") or 0)
+        if path and every:
+            from simulator.checkpoint import save_checkpoint
+        if progress is not None:
+            self.progress = ProgressReporter(progress, self.cfg.get("progress_interval_s", 0.5))
+
+        try:
+            while self.slot < stop and self.step():
+                if path and every and self.slot % every == 0:
+                    save_checkpoint(self, path)
+            if self.done and self.events is not None:
+                self.events.close()
+            if self.progress is not None:
+                self.progress.finish(self)
+        finally:
+            self.progress = None
+        return self.result()
+
+    def result(self) -> "SimulationResult":
+        # întoarcem toate rezultatele acumulate până acum într-un singur obiect
+        telemetry = None
+        trace     = self.tracer.result() if self.tracer is not None else None
+        memory    = self.memory.result(self) if self.memory is not None else None
+        if self.telemetry is not None:
+            now_ms    = self.slot * self.fp.slot_duration_us / 1000.0
+            telemetry = self.telemetry.result(lambda: self._backlog_bits(now_ms))
+        if self.events is not None:
+            # coloanele sunt vederi memmap peste jurnal, nu copii în memorie
+            d = self.events.delivered.view()
+            return SimulationResult(d["latency_ms"], d["ue"], d["slot"], d["first_tx"], d,
+                                    self.hm.get_latency_stats(), self.recorder.result(),
+                                    self.slot, self.events.base, telemetry, trace, memory)
+        return SimulationResult(self.latencies, self.ue_ids, self.slots, self.first_tx,
+                                self.delivered_logs, self.hm.get_latency_stats(),
+                                self.recorder.result(), self.slot, telemetry=telemetry, trace=trace,
+                                memory=memory)
+
+
+# ────────────────────────────────────────────────────────────
+#    FUNCȚIA PRINCIPALĂ DE SIMULARE
+# ────────────────────────────────────────────────────────────
+
+def run_scenario(params: dict = None, progress=None) -> SimulationResult:
+    # Construim starea inițială și o avansăm slot cu slot până la final
+    return Simulation(params).run(progress=progress)
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from simulator.simulator import run_scenario, SimulationResult
-from simulator.config import default_params, slice_profiles
+from simulator.config import slice_profiles
 
 @dataclass
 class SliceMetrics:
@@ -12,28 +12,22 @@ class SliceSimulationResult:
     base: SimulationResult         # Rezultatul simulării clasice (fără slicing)
     per_slice: dict[str, SliceMetrics]  # Metrici agregate per slice
 
-def run_scenario_slice(params: dict) -> SliceSimulationResult:
+def run_scenario_slice(params: dict, progress=None) -> SliceSimulationResult:
     """
     Rulează simularea 5G NR cu network slicing.
     Input în `params`:
       - 'ue_slice_mapping': dict[int, str]     # mapare UE -> denumire slice
       - 'slice_prb_shares': dict[str, float]   # share de PRB per slice (ex: {'eMBB':60, 'URLLC':20, 'mMTC':20})
     Poate conține și ceilalți parametri obișnuiți pentru run_scenario.
+    progress: callback opțional pentru instantanee de progres (ca la run_scenario).
     """
-    # 1) Extragem și eliminăm din params informațiile despre slicing
-    ue_slice_mapping = params.pop('ue_slice_mapping')
-    raw_shares       = params.pop('slice_prb_shares')
+    # 1) Mapările UE -> slice și share-urile de PRB rămân în parametrii rulării:
+    #    compile_config le validează și normalizează share-urile (sumă 1.0),
+    #    iar scheduler-ul le citește din configurația compilată
+    params = dict(params)
+    ue_slice_mapping = params['ue_slice_mapping']
 
-    # 1b) Normalizăm share-urile astfel încât să însumeze 1.0
-    total = sum(raw_shares.values()) or 1.0
-    slice_prb_shares = {sl: share / total for sl, share in raw_shares.items()}
-
-    # 2) Injectăm mapările și share-urile normalizate în default_params,
-    # ca scheduler-ul să le găsească la runtime
-    default_params['ue_slice_mapping'] = ue_slice_mapping
-    default_params['slice_prb_shares'] = slice_prb_shares
-
-    # 2b) Overridem dimensiunea pachetelor per UE conform configurației slice-urilor
+    # 2) Overridem dimensiunea pachetelor per UE conform configurației slice-urilor
     # folosind câmpul 'packet_size_bits' din slice_profiles
     params['packet_size_bits'] = {
         ue: slice_profiles[sl]['packet_size_bits']
@@ -44,7 +38,7 @@ def run_scenario_slice(params: dict) -> SliceSimulationResult:
     params['scheduler_mode'] = 'slice'
 
     # 4) Apelăm funcția de simulare existentă cu noii parametri
-    sim_res: SimulationResult = run_scenario(params)
+    sim_res: SimulationResult = run_scenario(params, progress)
 
     # 5) Agregăm listele de latențe per slice, pe baza log-urilor de livrare
     per_slice_data: dict[str, list[float]] = {}
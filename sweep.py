@@ -0,0 +1,321 @@
+# simulator/sweep.py
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulator.config import default_params, slice_profiles
+from simulator.queueing import estimate
+from simulator.simconfig import compile_config
+from simulator.simulator import run_scenario
+from simulator.simulator_slice import run_scenario_slice
+
+# ────────────────────────────────────────────────────────────
+#    SCHEMA ȘI CODIFICAREA PARAMETRILOR
+# ────────────────────────────────────────────────────────────
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id           INTEGER PRIMARY KEY,
+    sweep        TEXT    NOT NULL,
+    params_hash  TEXT    NOT NULL,
+    params       TEXT    NOT NULL,
+    status       TEXT    NOT NULL DEFAULT 'pending',   -- pending / running / done / failed / rejected
+    worker       TEXT,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    heartbeat    REAL,
+    finished_at  REAL,
+    error        TEXT,
+    UNIQUE (sweep, params_hash)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (sweep, status);
+CREATE TABLE IF NOT EXISTS results (
+    task_id      INTEGER PRIMARY KEY REFERENCES tasks (id),
+    summary      TEXT    NOT NULL
+);
+"""
+
+
+def _encode(params: dict) -> str:
+    return json.dumps(params, sort_keys=True, default=float)
+
+
+def _int_keys(value):
+    # JSON transformă cheile int în șiruri (ue_slice_mapping, packet_size_bits)
+    if isinstance(value, dict):
+        if value and all(isinstance(k, str) and k.lstrip("-").isdigit() for k in value):
+            return {int(k): _int_keys(v) for k, v in value.items()}
+        return {k: _int_keys(v) for k, v in value.items()}
+    return value
+
+
+def _decode(text: str) -> dict:
+    return _int_keys(json.loads(text))
+
+
+def grid_points(base: dict, grid: dict) -> list:
+    """
+    Produsul cartezian al axelor din `grid` peste parametrii de bază, ex.
+    grid_points({'sim_time_ms': 2000}, {'n_ues': [10, 20], 'scs_mu': [0, 1]}).
+    """
+    names = list(grid)
+    return [{**base, **dict(zip(names, values))} for values in itertools.product(*grid.values())]
+
+
+def summarize(res) -> dict:
+    # Rezumatul unui punct: ce se păstrează în baza de date (nu toate latențele)
+    lat = np.asarray(res.latencies, dtype=float)
+    harq = res.harq_stats
+    if isinstance(harq, np.ndarray):              # jurnal binar (memmap structurat)
+        dropped = int(harq["dropped"].sum())
+    else:
+        dropped = sum(1 for r in harq if r.get("dropped"))
+    out = {
+        "delivered":       int(len(lat)),
+        "first_tx_ratio":  float(np.mean(res.first_tx)) if len(lat) else math.nan,
+        "harq_dropped":    dropped,
+        "simulated_slots": int(res.simulated_slots),
+    }
+    for name, value in (("mean_ms", lat.mean() if len(lat) else math.nan),
+                        ("p50_ms", np.percentile(lat, 50) if len(lat) else math.nan),
+                        ("p95_ms", np.percentile(lat, 95) if len(lat) else math.nan),
+                        ("p99_ms", np.percentile(lat, 99) if len(lat) else math.nan)):
+        out[name] = None if math.isnan(value) else float(value)
+    return out
+
+
+# ────────────────────────────────────────────────────────────
+#    STOCAREA PERSISTENTĂ A UNUI SWEEP
+# ────────────────────────────────────────────────────────────
+
+class SweepStore:
+    """
+    Coada de scenarii și rezumatele lor într-o bază SQLite locală (WAL),
+    partajată de mai multe procese:
+      - add_points() e idempotent (punctele existente sunt ignorate), deci
+        re-pornirea unui sweep sare peste punctele deja terminate
+      - claim() revendică atomic un punct (BEGIN IMMEDIATE); punctele
+        'running' fără heartbeat de lease_s secunde (worker mort) sunt
+        reluate
+      - results() poate fi apelat oricând, inclusiv în timpul rulării
+    """
+
+    def __init__(self, path: str, lease_s: float = 120.0):
+        self.path    = path
+        self.lease_s = lease_s
+        self.con = sqlite3.connect(path, timeout=60.0, isolation_level=None)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.executescript(SCHEMA)
+
+    def close(self):
+        self.con.close()
+
+    def add_points(self, sweep: str, points) -> int:
+        # Întoarce câte puncte noi au fost adăugate
+        return self._insert(sweep, [(p, "pending", None) for p in points])
+
+    def reject_points(self, sweep: str, rejected) -> int:
+        # Puncte (params, motiv) înregistrate ca 'rejected': nu sunt revendicate niciodată
+        return self._insert(sweep, [(p, "rejected", reason) for p, reason in rejected])
+
+    def _insert(self, sweep: str, entries) -> int:
+        rows = []
+        for p, status, error in entries:
+            text = _encode(p)
+            rows.append((sweep, hashlib.sha1(text.encode()).hexdigest(), text, status, error))
+        before = self.con.total_changes
+        self.con.execute("BEGIN IMMEDIATE")
+        self.con.executemany(
+            "INSERT OR IGNORE INTO tasks (sweep, params_hash, params, status, error) "
+            "VALUES (?, ?, ?, ?, ?)", rows)
+        self.con.execute("COMMIT")
+        return self.con.total_changes - before
+
+    def claim(self, sweep: str, worker: str):
+        """
+        Revendică următorul punct neterminat: (task_id, params) sau None.
+        Tranzacția IMMEDIATE serializează revendicările între procese.
+        """
+        now = time.time()
+        self.con.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.con.execute(
+                "SELECT id, params FROM tasks WHERE sweep = ? AND "
+                "(status = 'pending' OR (status = 'running' AND heartbeat < ?)) "
+                "ORDER BY id LIMIT 1", (sweep, now - self.lease_s)).fetchone()
+            if row is not None:
+                self.con.execute(
+                    "UPDATE tasks SET status = 'running', worker = ?, heartbeat = ?, "
+                    "attempts = attempts + 1 WHERE id = ?", (worker, now, row[0]))
+            self.con.execute("COMMIT")
+        except BaseException:
+            self.con.execute("ROLLBACK")
+            raise
+        return None if row is None else (row[0], _decode(row[1]))
+
+    def heartbeat(self, task_id: int, worker: str):
+        self.con.execute("UPDATE tasks SET heartbeat = ? WHERE id = ? AND worker = ?",
+                         (time.time(), task_id, worker))
+
+    def complete(self, task_id: int, summary: dict):
+        self.con.execute("BEGIN IMMEDIATE")
+        self.con.execute("INSERT OR REPLACE INTO results (task_id, summary) VALUES (?, ?)",
+                         (task_id, json.dumps(summary)))
+        self.con.execute("UPDATE tasks SET status = 'done', finished_at = ?, error = NULL WHERE id = ?",
+                         (time.time(), task_id))
+        self.con.execute("COMMIT")
+
+    def fail(self, task_id: int, error: str):
+        self.con.execute("UPDATE tasks SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+                         (time.time(), error, task_id))
+
+    def retry_failed(self, sweep: str) -> int:
+        cur = self.con.execute("UPDATE tasks SET status = 'pending', error = NULL "
+                               "WHERE sweep = ? AND status = 'failed'", (sweep,))
+        return cur.rowcount
+
+    def progress(self, sweep: str) -> dict:
+        # {status: număr de puncte}
+        return dict(self.con.execute("SELECT status, COUNT(*) FROM tasks WHERE sweep = ? "
+                                     "GROUP BY status", (sweep,)).fetchall())
+
+    def rejected(self, sweep: str) -> list:
+        # Punctele respinse înainte de rulare: câte un dict {params, motiv}
+        rows = self.con.execute("SELECT id, params, error FROM tasks WHERE sweep = ? AND "
+                                "status = 'rejected' ORDER BY id", (sweep,)).fetchall()
+        return [{"task_id": tid, "params": _decode(p), "reason": e} for tid, p, e in rows]
+
+    def results(self, sweep: str) -> list:
+        # Punctele terminate până acum: câte un dict {params, rezumat}
+        rows = self.con.execute(
+            "SELECT t.id, t.params, r.summary FROM tasks t JOIN results r ON r.task_id = t.id "
+            "WHERE t.sweep = ? ORDER BY t.id", (sweep,)).fetchall()
+        return [{"task_id": tid, "params": _decode(p), **json.loads(s)} for tid, p, s in rows]
+
+
+# ────────────────────────────────────────────────────────────
+#    WORKER-I ȘI ORCHESTRAREA
+# ────────────────────────────────────────────────────────────
+
+def _effective(params: dict) -> dict:
+    # Parametrii rulați efectiv de _run_point (run_scenario_slice fixează modul și dimensiunile)
+    if not params.get("ue_slice_mapping"):
+        return params
+    profiles = params.get("slice_profiles_static", slice_profiles)
+    return {**params, "scheduler_mode": "slice",
+            "packet_size_bits": {ue: profiles[sl]["packet_size_bits"]
+                                 for ue, sl in params["ue_slice_mapping"].items()}}
+
+
+def _overload(params: dict, max_load: float):
+    # Motivul respingerii unui punct cu încărcarea estimată ≥ max_load (None dacă rămâne)
+    if params.get("traffic_type", default_params["traffic_type"]) == "trace":
+        return None
+    est = estimate(params)
+    worst = max(est.groups, key=lambda g: g.load)
+    if worst.load < max_load:
+        return None
+    return f"încărcare estimată ρ={worst.load:.3f} ≥ {max_load:g} (grup {worst.group})"
+
+
+def _run_point(params: dict):
+    if params.get("ue_slice_mapping"):
+        return run_scenario_slice(dict(params)).base
+    return run_scenario(dict(params))
+
+
+def worker_loop(path: str, sweep: str, worker: str = None, lease_s: float = 120.0) -> int:
+    """
+    Revendică și rulează puncte până când coada e goală. Un fir de fundal
+    reînnoiește heartbeat-ul punctului curent la fiecare lease_s / 3 secunde.
+    Întoarce numărul de puncte terminate de acest worker.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    store  = SweepStore(path, lease_s)
+    done   = 0
+    try:
+        while True:
+            task = store.claim(sweep, worker)
+            if task is None:
+                return done
+            task_id, params = task
+
+            stop = threading.Event()
+
+            def beat():
+                hb = SweepStore(path, lease_s)
+                try:
+                    while not stop.wait(lease_s / 3.0):
+                        hb.heartbeat(task_id, worker)
+                finally:
+                    hb.close()
+
+            beater = threading.Thread(target=beat, daemon=True)
+            beater.start()
+            try:
+                t0 = time.perf_counter()
+                summary = summarize(_run_point(params))
+                summary["wall_s"] = time.perf_counter() - t0
+                store.complete(task_id, summary)
+                done += 1
+            except Exception as exc:
+                store.fail(task_id, f"{type(exc).__name__}: {exc}")
+            finally:
+                stop.set()
+                beater.join()
+    finally:
+        store.close()
+
+
+def run_sweep(path: str, sweep: str, points=None, n_workers: int = None,
+              lease_s: float = 120.0, max_load: float = None) -> list:
+    """
+    Adaugă punctele (dacă sunt date) în sweep-ul `sweep` din baza `path` și
+    pornește n_workers procese locale care le rulează. Poate fi relansat
+    după o întrerupere: punctele terminate nu se mai rulează, iar alte
+    procese (pe aceeași bază) pot participa la același sweep cu worker_loop().
+    max_load: punctele a căror încărcare estimată analitic (queueing.estimate,
+    cel mai încărcat grup) e ≥ max_load sunt marcate 'rejected' fără a fi
+    rulate (vezi SweepStore.rejected); ρ ≥ 1 înseamnă o coadă care crește
+    fără limită. Punctele cu trafic din trace nu sunt estimate.
+    Întoarce rezultatele tuturor punctelor terminate.
+    """
+    rejected = []
+    if points is not None:
+        # punctele invalide sunt respinse înainte de a porni vreun worker
+        points = list(points)
+        for p in points:
+            compile_config({**p, "scheduler_mode": "slice"} if p.get("ue_slice_mapping") else p)
+        if max_load is not None:
+            reasons = [_overload(_effective(p), max_load) for p in points]
+            rejected = [(p, r) for p, r in zip(points, reasons) if r is not None]
+            points = [p for p, r in zip(points, reasons) if r is None]
+    store = SweepStore(path, lease_s)
+    try:
+        if points is not None:
+            store.add_points(sweep, points)
+            store.reject_points(sweep, rejected)
+    finally:
+        store.close()
+
+    n_workers = n_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(worker_loop, path, sweep, None, lease_s) for _ in range(n_workers)]
+        for fut in futures:
+            fut.result()
+
+    store = SweepStore(path, lease_s)
+    try:
+        return store.results(sweep)
+    finally:
+        store.close()
@@ -0,0 +1,140 @@
+# simulator/telemetry.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# ────────────────────────────────────────────────────────────
+#    SERII DE TIMP CU REZOLUȚIE FIXĂ (RING BUFFER)
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class TelemetrySeries:
+    bin_slots:     int            # câte sloturi acoperă un bin
+    slot_start:    np.ndarray     # (n_bins,) primul slot al fiecărui bin
+    prb_allocated: np.ndarray     # (n_bins,) PRB-uri ocupate, medie pe slot (RE / simboluri)
+    prb_total:     int            # PRB-uri disponibile într-un slot
+    backlog_bits:  np.ndarray     # (n_bins,) biți în așteptare la sfârșitul bin-ului
+    harq_active:   np.ndarray     # (n_bins,) procese HARQ active, medie pe slot
+    delivered:     np.ndarray     # (n_bins,) pachete livrate (ACK la prima transmisie sau HARQ)
+    dropped:       np.ndarray     # (n_bins,) pachete abandonate după HARQ_MAX_ROUNDS
+    ue_bits:       np.ndarray = None   # (n_bins, n_ues) biți livrați per UE, dacă e activat
+
+    def __len__(self):
+        return len(self.slot_start)
+
+    @property
+    def utilization(self) -> np.ndarray:
+        return self.prb_allocated / self.prb_total if self.prb_total else np.zeros(len(self))
+
+    def ue_throughput_bps(self, slot_duration_us: float) -> np.ndarray:
+        # Debitul per UE în fiecare bin (bit/s)
+        if self.ue_bits is None:
+            return None
+        return self.ue_bits / (self.bin_slots * slot_duration_us * 1e-6)
+
+
+class Telemetry:
+    """
+    Acumulează starea celulei slot cu slot în câteva scalare (O(1) per slot)
+    și le închide într-un bin la fiecare `bin_slots` sloturi. Ultimele
+    `n_bins` bin-uri sunt păstrate într-un ring buffer, deci memoria și
+    costul extragerii depind de numărul de bin-uri, nu de numărul de
+    evenimente. Backlog-ul e eșantionat o singură dată per bin.
+    Matricea per UE (n_bins × n_ues) e opțională: la zeci de mii de UE-uri
+    ajunge la zeci de MB, deci se cere explicit cu per_ue=True.
+    """
+
+    def __init__(self, total_prbs: int, n_ues: int, bin_slots: int = 100,
+                 n_bins: int = 1024, per_ue: bool = False):
+        self.total_prbs = total_prbs
+        self.bin_slots  = max(1, int(bin_slots))
+        self.n_bins     = max(1, int(n_bins))
+        self.count      = 0          # bin-uri închise (pot depăși n_bins; ring-ul le suprascrie)
+
+        self.slot_start    = np.zeros(self.n_bins, dtype=np.int64)
+        self.prb_allocated = np.zeros(self.n_bins, dtype=np.float32)
+        self.backlog_bits  = np.zeros(self.n_bins, dtype=np.int64)
+        self.harq_active   = np.zeros(self.n_bins, dtype=np.float32)
+        self.delivered     = np.zeros(self.n_bins, dtype=np.int32)
+        self.dropped       = np.zeros(self.n_bins, dtype=np.int32)
+        self.ue_bits       = np.zeros((self.n_bins, n_ues), dtype=np.float32) if per_ue else None
+
+        # acumulatorii bin-ului curent
+        self._bin_start = 0
+        self._slots     = 0
+        self._prb_sum   = 0.0
+        self._harq_sum  = 0
+        self._delivered = 0
+        self._dropped   = 0
+        self._ue_bits   = np.zeros(n_ues, dtype=np.float64) if per_ue else None
+
+    def on_delivery(self, ue: int, bits: int):
+        self._delivered += 1
+        if self._ue_bits is not None:
+            self._ue_bits[ue] += bits
+
+    def on_harq(self, acked: int, dropped: int):
+        self._delivered += acked
+        self._dropped   += dropped
+
+    def end_slot(self, slot: int, prb_allocated: float, harq_active: int, backlog_fn):
+        """
+        Închide slotul: prb_allocated = PRB-uri ocupate în medie pe simboluri,
+        harq_active = procese HARQ active; backlog_fn() e apelată doar la
+        închiderea bin-ului și întoarce biții în așteptare.
+        """
+        self._slots    += 1
+        self._prb_sum  += prb_allocated
+        self._harq_sum += harq_active
+        if self._slots >= self.bin_slots:
+            self._close_bin(backlog_fn())
+            self._bin_start = slot + 1
+
+    def _close_bin(self, backlog_bits: int):
+        i = self.count % self.n_bins
+        n = max(self._slots, 1)
+        self.slot_start[i]    = self._bin_start
+        self.prb_allocated[i] = self._prb_sum / n
+        self.backlog_bits[i]  = backlog_bits
+        self.harq_active[i]   = self._harq_sum / n
+        self.delivered[i]     = self._delivered
+        self.dropped[i]       = self._dropped
+        if self._ue_bits is not None:
+            self.ue_bits[i] = self._ue_bits
+            self._ue_bits[:] = 0.0
+        self.count += 1
+        self._slots = self._harq_sum = self._delivered = self._dropped = 0
+        self._prb_sum = 0.0
+
+    def result(self, backlog_fn=None) -> TelemetrySeries:
+        """
+        Seriile în ordine cronologică (cele mai vechi bin-uri peste capacitate
+        au fost suprascrise). Un bin parțial la final e inclus dacă există,
+        fără a modifica starea acumulatorilor.
+        """
+        n     = min(self.count, self.n_bins)
+        first = self.count % self.n_bins if self.count > self.n_bins else 0
+        order = (np.arange(n) + first) % self.n_bins
+        series = TelemetrySeries(
+            bin_slots     = self.bin_slots,
+            slot_start    = self.slot_start[order],
+            prb_allocated = self.prb_allocated[order],
+            prb_total     = self.total_prbs,
+            backlog_bits  = self.backlog_bits[order],
+            harq_active   = self.harq_active[order],
+            delivered     = self.delivered[order],
+            dropped       = self.dropped[order],
+            ue_bits       = self.ue_bits[order] if self.ue_bits is not None else None,
+        )
+        if self._slots:
+            k = max(self._slots, 1)
+            series.slot_start    = np.append(series.slot_start, self._bin_start)
+            series.prb_allocated = np.append(series.prb_allocated, self._prb_sum / k)
+            series.backlog_bits  = np.append(series.backlog_bits, backlog_fn() if backlog_fn else 0)
+            series.harq_active   = np.append(series.harq_active, self._harq_sum / k)
+            series.delivered     = np.append(series.delivered, self._delivered)
+            series.dropped       = np.append(series.dropped, self._dropped)
+            if self._ue_bits is not None:
+                series.ue_bits = np.vstack([series.ue_bits, self._ue_bits[None, :].astype(np.float32)])
+        return series
@@ -0,0 +1,8 @@
+# simulator/tests/test_import_budget.py
+
+from simulator.import_budget import check_import_budget
+
+
+def test_core_import_within_budget():
+    # Nucleul se importă în buget și nu încarcă pachetele de raportare
+    assert check_import_budget() == []
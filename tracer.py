@@ -0,0 +1,117 @@
+# simulator/tracer.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# ────────────────────────────────────────────────────────────
+#    EVENIMENTELE DIN VIAȚA UNUI PACHET
+# ────────────────────────────────────────────────────────────
+
+ARRIVAL, SR, GRANT, HARQ_START, NACK, ACK, HARQ_RETX, HARQ_ACK, DROP = range(9)
+
+EVENT_NAMES = {
+    ARRIVAL:    "arrival",      # pachetul intră în buffer (time_ms = momentul sosirii)
+    SR:         "sr",           # prima programare: SR + grant inițial
+    GRANT:      "grant",        # o transmisie: a = PRB-uri, b = MCS
+    HARQ_START: "harq_start",   # TB segmentat, pornește HARQ: b = biți rămași
+    NACK:       "nack",         # eroare de bloc la transmisia completă: a = încercarea
+    ACK:        "ack",          # livrat la transmisie: b = latența calculată (ms)
+    HARQ_RETX:  "harq_retx",    # NACK pe feedback HARQ, nouă rundă: a = runda
+    HARQ_ACK:   "harq_ack",     # ACK pe feedback HARQ: a = runda
+    DROP:       "drop",         # abandonat după HARQ_MAX_ROUNDS: a = runda
+}
+
+TRACE_DTYPE = np.dtype([
+    ("ue",    "<i4"),
+    ("seq",   "<i4"),   # al câtelea pachet al UE-ului (ordinea sosirilor)
+    ("kind",  "u1"),
+    ("slot",  "<i4"),
+    ("t_ms",  "<f8"),
+    ("a",     "<i4"),
+    ("b",     "<f4"),
+])
+
+
+def _sampled(ue: int, seq: int, every: int) -> bool:
+    # Eșantion determinist 1-din-N după (UE, seq): nu depinde de scheduler,
+    # deci aceleași pachete sunt urmărite în variante diferite ale unei rulări
+    h = ((ue * 0x9E3779B1) ^ (seq * 0x85EBCA77)) & 0xFFFFFFFF
+    h = ((h ^ (h >> 15)) * 0x2C1B3C6D) & 0xFFFFFFFF
+    return (h ^ (h >> 12)) % every == 0
+
+
+# ────────────────────────────────────────────────────────────
+#    TRACER-UL
+# ────────────────────────────────────────────────────────────
+
+@dataclass
+class PacketTrace:
+    events:   np.ndarray    # TRACE_DTYPE, în ordinea apariției
+    slot_ms:  float
+
+    def __len__(self):
+        return len(self.events)
+
+    def packets(self) -> np.ndarray:
+        # Perechile (ue, seq) urmărite
+        return np.unique(self.events[["ue", "seq"]])
+
+    def timeline(self, ue: int, seq: int) -> list:
+        # Evenimentele unui pachet, ca dict-uri lizibile
+        ev = self.events[(self.events["ue"] == ue) & (self.events["seq"] == seq)]
+        return [{"event": EVENT_NAMES[int(e["kind"])], "slot": int(e["slot"]),
+                 "t_ms": float(e["t_ms"]), "a": int(e["a"]), "b": float(e["b"])} for e in ev]
+
+    def sojourn_ms(self) -> dict:
+        # (ue, seq) -> timpul de la sosire la ACK / drop, măsurat pe linia de timp
+        out, start = {}, {}
+        for e in self.events:
+            key = (int(e["ue"]), int(e["seq"]))
+            if e["kind"] == ARRIVAL:
+                start[key] = e["t_ms"]
+            elif e["kind"] in (ACK, HARQ_ACK, DROP) and key in start:
+                out[key] = float(e["t_ms"] - start[key])
+        return out
+
+
+class PacketTracer:
+    """
+    Urmărește un eșantion determinist de pachete (1 din `sample_every`)
+    și/sau toate pachetele UE-urilor din `ues`. Pachetele urmărite primesc
+    cheia 'trace' = (ue, seq); toate celelalte hook-uri ies imediat pentru
+    pachetele fără ea. Evenimentele sunt scrise într-un tablou structurat
+    prealocat, dublat la nevoie.
+    """
+
+    def __init__(self, slot_ms: float, sample_every: int = 0, ues=None, capacity: int = 4096):
+        self.slot_ms      = slot_ms
+        self.sample_every = int(sample_every or 0)
+        self.ues          = set(ues or ())
+        self._seq         = {}                  # ue -> pachete văzute
+        self._buf         = np.zeros(capacity, dtype=TRACE_DTYPE)
+        self.n            = 0
+
+    def start(self, ev: dict, ue: int, slot: int):
+        # La prima apariție a unui pachet: decidem dacă îl urmărim
+        seq = self._seq.get(ue, 0)
+        self._seq[ue] = seq + 1
+        if ue in self.ues or (self.sample_every and _sampled(ue, seq, self.sample_every)):
+            ev["trace"] = (ue, seq)
+            self._log(ue, seq, ARRIVAL, int(ev["time_ms"] / self.slot_ms), ev["time_ms"])
+            self.log(ev, SR, slot)
+
+    def log(self, ev: dict, kind: int, slot: int, a: int = 0, b: float = 0.0):
+        key = ev.get("trace")
+        if key is not None:
+            # evenimentele de transmisie / feedback sunt datate la sfârșitul slotului
+            self._log(key[0], key[1], kind, slot, (slot + 1) * self.slot_ms, a, b)
+
+    def _log(self, ue, seq, kind, slot, t_ms, a=0, b=0.0):
+        if self.n == len(self._buf):
+            self._buf = np.concatenate([self._buf, np.zeros(len(self._buf), dtype=TRACE_DTYPE)])
+        self._buf[self.n] = (ue, seq, kind, slot, t_ms, a, b)
+        self.n += 1
+
+    def result(self) -> PacketTrace:
+        return PacketTrace(self._buf[:self.n].copy(), self.slot_ms)
@@ -1,6 +1,15 @@
 from collections import deque
+import heapq
+import math
+import os
 import random
+import warnings
+
+import numpy as np
+
 from simulator.config import default_params
+from simulator.eventlog import HEADER_BYTES, npy_header, open_records
+from simulator.traffic_models import TRAFFIC_TRACE_DTYPE, generate
 
 # ────────────────────────────────────────────────────────────
 #     FUNCȚII PENTRU GENERAREA TRAFICULUI (Periodic/Aperiodic)
@@ -56,34 +65,215 @@ def generate_aperiodic(ue_id: int, rate_lambda: float, packet_size_bits, sim_tim
     return buf
 
 
+# ────────────────────────────────────────────────────────────
+#     TRAFIC DIN TRASEE (CSV / .npy), CITIT LA CERERE
+# ────────────────────────────────────────────────────────────
+
+def csv_to_trace(csv_path: str, out_path: str = None, chunk_rows: int = 1 << 20) -> str:
+    """
+    Convertește un traseu CSV (antet cu coloanele time_ms, ue_id, size_bits,
+    în orice ordine; alte coloane sunt ignorate) într-un .npy structurat
+    TRAFFIC_TRACE_DTYPE, citind câte `chunk_rows` rânduri odată. Conversia
+    e refolosită cât timp fișierul .npy e mai nou decât CSV-ul.
+    """
+    out_path = out_path or csv_path + ".npy"
+    if os.path.exists(out_path) and os.path.getmtime(out_path) >= os.path.getmtime(csv_path):
+        return out_path
+
+    with open(csv_path, "r", newline="") as src:
+        header = [h.strip() for h in src.readline().split(",")]
+        try:
+            cols = tuple(header.index(name) for name in TRAFFIC_TRACE_DTYPE.names)
+        except ValueError:
+            raise ValueError(f"{csv_path}: antetul trebuie să conțină coloanele "
+                             f"{', '.join(TRAFFIC_TRACE_DTYPE.names)}") from None
+        n = 0
+        with open(out_path + ".tmp", "wb") as dst:
+            dst.write(b"\0" * HEADER_BYTES)
+            while True:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")   # ultimul chunk poate fi vid
+                    chunk = np.loadtxt(src, delimiter=",", usecols=cols, max_rows=chunk_rows,
+                                       ndmin=2, dtype=np.float64)
+                if not len(chunk):
+                    break
+                rec = np.empty(len(chunk), dtype=TRAFFIC_TRACE_DTYPE)
+                rec["time_ms"], rec["ue_id"], rec["size_bits"] = chunk.T
+                rec.tofile(dst)
+                n += len(rec)
+            dst.seek(0)
+            dst.write(npy_header(TRAFFIC_TRACE_DTYPE, n))
+    os.replace(out_path + ".tmp", out_path)
+    return out_path
+
+
+class TraceSource:
+    """
+    Un traseu de sosiri deschis ca np.memmap read-only, cu un index per UE:
+    permutarea care ordonează rândurile după (ue_id, time_ms), salvată în
+    <path>.idx.npy, și, pentru fiecare UE, intervalul [start, end) din ea. Rândurile sunt citite una câte
+    una, la cerere; la pickle (checkpoint / multi-celulă) se păstrează doar
+    calea, iar indexul e reconstruit la prima citire.
+    Cu `records` (tablou TRAFFIC_TRACE_DTYPE deja în memorie, ex. din
+    simulator.traffic_models) nu există fișier, iar tabloul e păstrat ca atare.
+    """
+
+    def __init__(self, path: str = None, sim_time_ms: float = math.inf, records: np.ndarray = None):
+        if path is not None and path.endswith(".csv"):
+            path = csv_to_trace(path)
+        self.path        = path
+        self.sim_time_ms = sim_time_ms
+        self._records    = records
+        self._data       = None
+
+    def _open(self):
+        data = open_records(self.path) if self._records is None else self._records
+        missing = set(TRAFFIC_TRACE_DTYPE.names) - set(data.dtype.names or ())
+        if missing:
+            raise ValueError(f"{self.path or 'records'}: lipsesc câmpurile {sorted(missing)}")
+        ue, t = data["ue_id"], data["time_ms"]
+        same_ue = ue[1:] == ue[:-1]
+        if np.all(ue[1:] >= ue[:-1]) and np.all(t[1:][same_ue] >= t[:-1][same_ue]):
+            self._order = None                      # deja ordonat: fără permutare
+            ue_sorted, t_sorted = ue, t
+        else:
+            self._order = self._load_order(ue, t)
+            ue_sorted, t_sorted = ue[self._order], t[self._order]
+        ids, first = np.unique(np.asarray(ue_sorted), return_index=True)
+        # doar sosirile din fereastra simulării: în fiecare UE timpul e crescător,
+        # deci sunt primele `kept` rânduri ale intervalului
+        kept = np.add.reduceat(np.asarray(t_sorted) < self.sim_time_ms, first) if len(first) else first
+        self._bounds = {u: (a, a + k) for u, a, k in zip(ids.tolist(), first.tolist(), kept.tolist())}
+        self._data = data
+
+    def _load_order(self, ue, t) -> np.ndarray:
+        # Permutarea (ue_id, time_ms) e salvată lângă traseu și refolosită,
+        # ca sortarea să fie plătită o singură dată per fișier
+        if self.path is None:
+            return np.lexsort((t, ue))
+        idx_path = self.path + ".idx.npy"
+        if os.path.exists(idx_path) and os.path.getmtime(idx_path) >= os.path.getmtime(self.path):
+            order = np.load(idx_path, mmap_mode="r")
+            if len(order) == len(ue):
+                return order
+        order = np.lexsort((t, ue)).astype(np.int32 if len(ue) < 2**31 else np.int64)
+        try:
+            np.save(idx_path, order)
+        except OSError:
+            pass                                    # director read-only: indexul rămâne în memorie
+        return order
+
+    def bounds(self, ue: int) -> tuple:
+        if self._data is None:
+            self._open()
+        return self._bounds.get(ue, (0, 0))
+
+    def packet(self, i: int, ue: int) -> dict:
+        if self._data is None:
+            self._open()
+        row = self._data[i if self._order is None else self._order[i]]
+        return {'time_ms': float(row["time_ms"]), 'ue_id': ue, 'size_bits': int(row["size_bits"])}
+
+    def mean_interval_ms(self, ue: int) -> float:
+        # Intervalul mediu între sosiri (pentru dimensionarea SPS)
+        a, b = self.bounds(ue)
+        if b - a < 2:
+            return self.sim_time_ms
+        return (self.packet(b - 1, ue)['time_ms'] - self.packet(a, ue)['time_ms']) / (b - a - 1)
+
+    def __getstate__(self):
+        return {"path": self.path, "sim_time_ms": self.sim_time_ms, "_records": self._records}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._data = None
+
+
+class TraceBuffer:
+    """
+    Buffer-ul unui UE alimentat dintr-un TraceSource, cu aceeași interfață ca
+    deque-ul de dict-uri folosit de simulator (buf[0], popleft, appendleft,
+    len, iterare). Doar pachetele atinse de simulare devin dict-uri: restul
+    sunt un cursor în index, deci memoria nu crește cu lungimea traseului.
+    """
+
+    def __init__(self, source: TraceSource, ue: int):
+        self.source = source
+        self.ue     = ue
+        self.pos, self.end = source.bounds(ue)
+        self._head  = deque()     # pachete materializate (sau puse înapoi de HARQ)
+
+    def _fill(self, k: int):
+        while len(self._head) < k and self.pos < self.end:
+            self._head.append(self.source.packet(self.pos, self.ue))
+            self.pos += 1
+
+    def __len__(self):
+        return len(self._head) + self.end - self.pos
+
+    def __bool__(self):
+        return bool(self._head) or self.pos < self.end
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += len(self)
+        self._fill(i + 1)
+        return self._head[i]
+
+    def popleft(self) -> dict:
+        self._fill(1)
+        return self._head.popleft()
+
+    def appendleft(self, ev: dict):
+        self._head.appendleft(ev)
+
+    def __iter__(self):
+        # Fără consum: pachetele încă necitite sunt materializate temporar
+        yield from list(self._head)
+        for i in range(self.pos, self.end):
+            yield self.source.packet(i, self.ue)
+
+
 # ────────────────────────────────────────────────────────────
 #     CLASA TRAFFICMANAGER: GESTIONEAZĂ BUFFER-ELE CU PACHETE
 # ────────────────────────────────────────────────────────────
 
 class TrafficManager:
-    def __init__(self, n_ues: int, traffic_type: str, params: dict):
+    def __init__(self, n_ues: int, traffic_type: str, params: dict, ue_ids: list = None):
         """
         Initializează managerul de trafic:
           - n_ues: număr de UE-uri
-          - traffic_type: 'periodic' sau 'aperiodic'
+          - traffic_type: 'periodic', 'aperiodic', 'trace' (params['traffic_trace_path'])
+            sau un model vectorizat din simulator.traffic_models ('poisson',
+            'on_off', 'ftp3', 'xr')
           - params: dicționar cu toți parametrii simulatorului (period_ms, lambda_per_ms etc.)
+          - ue_ids: ID-urile UE gestionate (implicit 0..n_ues-1); util când
+            UE-urile sunt împărțite între mai multe procese (multi-celulă)
         """
         # Creează câte un buffer vid pentru fiecare UE
-        self.buffers = {ue: deque() for ue in range(n_ues)}
+        if ue_ids is None:
+            ue_ids = range(n_ues)
+        self.buffers = {ue: deque() for ue in ue_ids}
         self.traffic_type = traffic_type
         self.params = params
         # Înregistrează slotul de sosire al fiecărui pachet (opțional)
         self.arrival_slots = {}
+        # Perioada (sau intervalul mediu între sosiri) a fiecărui UE, în ms;
+        # folosită pentru dimensionarea granturilor configurate (SPS)
+        self.ue_periods_ms = {}
 
     def initialize(self):
         """
         Populează buffer-ele pentru fiecare UE conform modelului ales:
           - periodic: generează cu generate_periodic()
           - aperiodic: generează cu generate_aperiodic()
+          - trace: buffer-e TraceBuffer peste fișierul traffic_trace_path
+          - modelele vectorizate (și periodic / aperiodic cu traffic_generator
+            = 'numpy'): generate() din simulator.traffic_models, citit tot
+            prin TraceBuffer
         Parametrii period_ms, lambda_per_ms și procentele de variație
         se iau din self.params sau default_params.
         """
-        n_ues       = len(self.buffers)
         base_period = self.params.get('period_ms', default_params['period_ms'])
         spread_p    = self.params.get('period_spread_pct', default_params['period_spread_pct'])
         base_lambda = self.params.get('lambda_per_ms', default_params['lambda_per_ms'])
@@ -91,7 +281,31 @@ class TrafficManager:
         sim_time    = self.params.get('sim_time_ms', default_params['sim_time_ms'])
         packet_size = self.params.get('packet_size_bits', default_params['packet_size_bits'])
 
-        for ue in range(n_ues):
+        if self.traffic_type == 'trace':
+            path = self.params.get('traffic_trace_path', default_params['traffic_trace_path'])
+            if not path:
+                raise ValueError("traffic_type='trace' necesită 'traffic_trace_path'")
+            source = TraceSource(path, sim_time)
+            for ue in list(self.buffers):
+                self.buffers[ue] = TraceBuffer(source, ue)
+                self.ue_periods_ms[ue] = source.mean_interval_ms(ue)
+            return
+
+        # Modelele vectorizate (toate UE-urile deodată, cu NumPy); RNG-ul e
+        # derivat din `random`, deci random.seed() le controlează și pe ele
+        vectorized = self.traffic_type not in ('periodic', 'aperiodic') or \
+            self.params.get('traffic_generator', default_params['traffic_generator']) == 'numpy'
+        if vectorized:
+            rng = np.random.default_rng(random.getrandbits(63))
+            ues = list(self.buffers)
+            records, interval = generate(self.traffic_type, ues, self.params, sim_time, rng)
+            source = TraceSource(sim_time_ms=sim_time, records=records)
+            for ue, iv in zip(ues, interval.tolist()):
+                self.buffers[ue] = TraceBuffer(source, ue)
+                self.ue_periods_ms[ue] = iv
+            return
+
+        for ue in list(self.buffers):
             if self.traffic_type == 'periodic':
                 # Aplică o variație procentuală pe perioada de generare
                 if spread_p > 0.0:
@@ -99,6 +313,7 @@ class TrafficManager:
                     ue_period = base_period * factor
                 else:
                     ue_period = base_period
+                self.ue_periods_ms[ue] = ue_period
                 # Generează și stochează traficul periodic
                 self.buffers[ue] = generate_periodic(
                     ue, ue_period,
@@ -112,6 +327,7 @@ class TrafficManager:
                     ue_lambda = base_lambda * factor
                 else:
                     ue_lambda = base_lambda
+                self.ue_periods_ms[ue] = 1.0 / ue_lambda
                 # Generează și stochează traficul aperiodic
                 self.buffers[ue] = generate_aperiodic(
                     ue, ue_lambda,
@@ -147,3 +363,58 @@ class TrafficManager:
         Returnează True dacă există pachete rămase în vreun buffer.
         """
         return any(self.buffers[ue] for ue in self.buffers)
+
+
+# ────────────────────────────────────────────────────────────
+#     MULȚIMEA UE-URILOR ACTIVE (PACHET SOSIT ÎN BUFFER)
+# ────────────────────────────────────────────────────────────
+
+class ActiveSet:
+    """
+    Evidența incrementală a UE-urilor care au un pachet deja sosit în capul
+    buffer-ului. UE-urile al căror prim pachet e în viitor stau într-un heap
+    după momentul sosirii; advance(now) mută în `ready` doar pe cele sosite,
+    iar update(ue) e apelat după fiecare modificare a buffer-ului unui UE.
+    Costul per TTI depinde de numărul de UE-uri active, nu de populație.
+    listener (opțional, ex. scheduler.EdfScheduler) primește on_ready(ue, head)
+    la fiecare update() al unui UE activ și on_idle(ue) când acesta iese.
+    """
+
+    def __init__(self, buffers: dict, listener=None):
+        self.buffers  = buffers
+        self.listener = listener
+        self.ready    = {}        # ue -> None (dict: ordine deterministă de inserare)
+        self.now_ms   = -math.inf
+        self._heap    = [(buf[0]['time_ms'], ue) for ue, buf in buffers.items() if buf]
+        heapq.heapify(self._heap)
+        self._waiting = {ue for _, ue in self._heap}
+
+    def advance(self, now_ms: float):
+        self.now_ms = now_ms
+        heap = self._heap
+        while heap and heap[0][0] <= now_ms:
+            _, ue = heapq.heappop(heap)
+            self._waiting.discard(ue)
+            self.update(ue)
+
+    def update(self, ue):
+        buf = self.buffers[ue]
+        if buf and buf[0]['time_ms'] <= self.now_ms:
+            self.ready[ue] = None
+            if self.listener is not None:
+                self.listener.on_ready(ue, buf[0])
+            return
+        if self.ready.pop(ue, 0) is None and self.listener is not None:
+            self.listener.on_idle(ue)
+        if buf and ue not in self._waiting:
+            heapq.heappush(self._heap, (buf[0]['time_ms'], ue))
+            self._waiting.add(ue)
+
+    def ready_ues(self, subset=None) -> list:
+        # UE-urile active (opțional doar cele din `subset`), ordonate după ID
+        if subset is None:
+            return sorted(self.ready)
+        return sorted(ue for ue in self.ready if ue in subset)
+
+    def has_packets(self) -> bool:
+        return bool(self.ready or self._heap)
@@ -0,0 +1,230 @@
+# simulator/traffic_models.py
+
+import math
+
+import numpy as np
+
+from simulator.config import default_params
+
+# ────────────────────────────────────────────────────────────
+#    UTILITARE VECTORIZATE
+# ────────────────────────────────────────────────────────────
+# Fiecare model întoarce (records, interval_ms):
+#   - records: tablou TRAFFIC_TRACE_DTYPE (time_ms, ue_id, size_bits),
+#     ordonat după (ue_id, time_ms), pentru toate UE-urile deodată
+#   - interval_ms: intervalul nominal între sosiri al fiecărui UE (pentru SPS)
+
+TRAFFIC_TRACE_DTYPE = np.dtype([
+    ("time_ms",   "<f8"),
+    ("ue_id",     "<i4"),
+    ("size_bits", "<i4"),
+])
+
+
+def _get(params: dict, key: str):
+    return params.get(key, default_params[key])
+
+
+def _spread(rng, base: float, pct: float, n: int) -> np.ndarray:
+    # Variația uniformă ±pct în jurul valorii de bază, câte una per UE
+    if pct > 0.0:
+        return base * rng.uniform(1.0 - pct, 1.0 + pct, n)
+    return np.full(n, float(base))
+
+
+def _sizes(packet_size_bits, ue: np.ndarray) -> np.ndarray:
+    # packet_size_bits: int sau dict per UE (ca în generate_periodic)
+    if isinstance(packet_size_bits, dict):
+        lut = np.zeros(int(ue.max()) + 1 if len(ue) else 1, dtype=np.int64)
+        for k, v in packet_size_bits.items():
+            if int(k) < len(lut):
+                lut[int(k)] = v
+        return lut[ue]
+    return np.full(len(ue), int(packet_size_bits), dtype=np.int64)
+
+
+def _segment_cumsum(x: np.ndarray, lens: np.ndarray) -> np.ndarray:
+    # Sumă cumulativă care repornește la începutul fiecărui segment de lungime lens[i]
+    c = np.cumsum(x)
+    starts = np.concatenate(([0], np.cumsum(lens)[:-1]))
+    offset = np.zeros(len(lens))
+    nz = lens > 0
+    offset[nz] = c[starts[nz]] - x[starts[nz]]
+    return c - np.repeat(offset, lens)
+
+
+def _split_mtu(t: np.ndarray, ue: np.ndarray, bits: np.ndarray, mtu_bits: int):
+    # Segmentează fișiere / cadre în pachete de cel mult mtu_bits, sosite simultan
+    n_seg = np.maximum(1, -(-bits // mtu_bits))
+    t_out, ue_out = np.repeat(t, n_seg), np.repeat(ue, n_seg)
+    size = np.full(int(n_seg.sum()), mtu_bits, dtype=np.int64)
+    last = np.cumsum(n_seg) - 1
+    size[last] = bits - (n_seg - 1) * mtu_bits
+    return t_out, ue_out, size
+
+
+def _pack(t: np.ndarray, ue: np.ndarray, size: np.ndarray, sim_time_ms: float) -> np.ndarray:
+    keep = (t >= 0.0) & (t < sim_time_ms)
+    t, ue, size = t[keep], ue[keep], size[keep]
+    # majoritatea modelelor generează deja grupat pe UE și crescător în timp:
+    # sortarea (dominantă ca și cost) e făcută doar dacă e necesară
+    same = ue[1:] == ue[:-1]
+    if not (np.all(ue[1:] >= ue[:-1]) and np.all(t[1:][same] >= t[:-1][same])):
+        order = np.lexsort((t, ue))
+        t, ue, size = t[order], ue[order], size[order]
+    rec = np.empty(len(t), dtype=TRAFFIC_TRACE_DTYPE)
+    rec["time_ms"], rec["ue_id"], rec["size_bits"] = t, ue, size
+    return rec
+
+
+def _poisson_times(rng, ue_ids: np.ndarray, rate: np.ndarray, t0: np.ndarray, t1: np.ndarray):
+    """
+    Sosiri Poisson de rată rate[i] în [t0[i], t1[i]) pentru fiecare intrare i:
+    sume cumulative ale unor exponențiale generate în bloc (cu o marjă de
+    ~5σ peste media λT); intrările care nu acoperă intervalul sunt completate
+    într-o nouă rundă, doar pentru ele.
+    """
+    out_t, out_ue = [], []
+    idx = np.arange(len(ue_ids))
+    start = t0.astype(float).copy()
+    while len(idx):
+        mean = rate[idx] * (t1[idx] - start[idx])
+        lens = np.ceil(mean + 5.0 * np.sqrt(mean) + 5.0).astype(np.int64)
+        gaps = rng.standard_exponential(int(lens.sum())) / np.repeat(rate[idx], lens)
+        t = np.repeat(start[idx], lens) + _segment_cumsum(gaps, lens)
+        owner = np.repeat(idx, lens)
+        inside = t < np.repeat(t1[idx], lens)
+        out_t.append(t[inside])
+        out_ue.append(ue_ids[owner[inside]])
+        # intrările al căror ultim eșantion e încă în interval continuă de acolo
+        last = t[np.cumsum(lens) - 1]
+        more = last < t1[idx]
+        start[idx[more]] = last[more]
+        idx = idx[more]
+    return np.concatenate(out_t), np.concatenate(out_ue)
+
+
+# ────────────────────────────────────────────────────────────
+#    MODELE DE TRAFIC
+# ────────────────────────────────────────────────────────────
+
+def periodic(ue_ids, params: dict, sim_time_ms: float, rng):
+    # Periodic cu fază inițială aleatoare și perioadă variată ±period_spread_pct per UE
+    ue_ids = np.asarray(ue_ids, dtype=np.int64)
+    period = _spread(rng, _get(params, "period_ms"), _get(params, "period_spread_pct"), len(ue_ids))
+    phase  = rng.uniform(0.0, period)
+    counts = np.maximum(0, np.ceil((sim_time_ms - phase) / period)).astype(np.int64)
+    owner  = np.repeat(np.arange(len(ue_ids)), counts)
+    k      = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    t      = phase[owner] + k * period[owner]
+    ue     = ue_ids[owner]
+    return _pack(t, ue, _sizes(_get(params, "packet_size_bits"), ue), sim_time_ms), period
+
+
+def poisson(ue_ids, params: dict, sim_time_ms: float, rng):
+    # Poisson de rată lambda_per_ms variată ±lambda_spread_pct per UE
+    ue_ids = np.asarray(ue_ids, dtype=np.int64)
+    lam = _spread(rng, _get(params, "lambda_per_ms"), _get(params, "lambda_spread_pct"), len(ue_ids))
+    t, ue = _poisson_times(rng, ue_ids, lam, np.zeros(len(ue_ids)), np.full(len(ue_ids), sim_time_ms))
+    return _pack(t, ue, _sizes(_get(params, "packet_size_bits"), ue), sim_time_ms), 1.0 / lam
+
+
+def on_off(ue_ids, params: dict, sim_time_ms: float, rng):
+    """
+    Sursă ON/OFF Markov: perioade ON și OFF exponențiale (medii on_ms, off_ms),
+    sosiri Poisson de rată on_rate_per_ms doar în perioadele ON. Fiecare UE
+    pornește din starea staționară (ON cu probabilitatea on / (on + off)).
+    """
+    ue_ids = np.asarray(ue_ids, dtype=np.int64)
+    n = len(ue_ids)
+    on_ms, off_ms, rate = _get(params, "on_ms"), _get(params, "off_ms"), _get(params, "on_rate_per_ms")
+
+    # primul ON: în curs la t=0 (cu probabilitatea staționară) sau după restul
+    # exponențial al unui OFF; ciclurile ON+OFF următoare sunt generate în
+    # blocuri, doar pentru UE-urile care nu au acoperit încă [0, sim_time_ms)
+    block = max(8, int(math.ceil(sim_time_ms / (on_ms + off_ms))) // 4 + 1)
+    on0   = rng.exponential(on_ms, n)
+    in_on = rng.random(n) < on_ms / (on_ms + off_ms)
+    first = np.where(in_on, -rng.uniform(0.0, on0), rng.exponential(off_ms, n))
+    starts, lengths, owners = [first], [on0], [ue_ids]
+    clock = first + on0 + rng.exponential(off_ms, n)      # începutul următorului ON
+    idx = np.flatnonzero(clock < sim_time_ms)
+    while len(idx):
+        on  = rng.exponential(on_ms, (len(idx), block))
+        off = rng.exponential(off_ms, (len(idx), block))
+        start = clock[idx, None] + np.cumsum(on + off, axis=1) - (on + off)
+        starts.append(start.ravel())
+        lengths.append(on.ravel())
+        owners.append(np.repeat(ue_ids[idx], block))
+        clock[idx] = start[:, -1] + on[:, -1] + off[:, -1]
+        idx = idx[clock[idx] < sim_time_ms]
+    starts_on, on = np.concatenate(starts), np.concatenate(lengths)
+
+    t0 = np.clip(starts_on, 0.0, sim_time_ms)
+    t1 = np.clip(starts_on + on, 0.0, sim_time_ms)
+    busy = t1 > t0
+    owner = np.concatenate(owners)[busy]
+    t, ue = _poisson_times(rng, owner, np.full(len(owner), float(rate)), t0[busy], t1[busy])
+    interval = np.full(n, (on_ms + off_ms) / (on_ms * rate))
+    return _pack(t, ue, _sizes(_get(params, "packet_size_bits"), ue), sim_time_ms), interval
+
+
+def ftp3(ue_ids, params: dict, sim_time_ms: float, rng):
+    """
+    3GPP FTP model 3 (TR 36.889): fișiere de ftp_file_bits cu sosiri Poisson
+    de rată ftp_lambda_per_ms per UE; fiecare fișier ajunge în buffer ca
+    pachete de cel mult mtu_bits, toate la momentul sosirii fișierului.
+    """
+    ue_ids = np.asarray(ue_ids, dtype=np.int64)
+    lam = np.full(len(ue_ids), float(_get(params, "ftp_lambda_per_ms")))
+    t, ue = _poisson_times(rng, ue_ids, lam, np.zeros(len(ue_ids)), np.full(len(ue_ids), sim_time_ms))
+    bits = np.full(len(t), int(_get(params, "ftp_file_bits")), dtype=np.int64)
+    t, ue, size = _split_mtu(t, ue, bits, int(_get(params, "mtu_bits")))
+    return _pack(t, ue, size, sim_time_ms), 1.0 / lam
+
+
+def xr(ue_ids, params: dict, sim_time_ms: float, rng):
+    """
+    Trafic XR / video (TR 38.838): cadre la xr_fps, cu fază aleatoare per UE
+    și jitter gaussian trunchiat (σ = xr_jitter_std_ms, |jitter| ≤
+    xr_jitter_max_ms); dimensiunea cadrului e gaussiană trunchiată la
+    [50%, 150%] din media xr_rate_mbps / xr_fps, cu σ = xr_size_std_pct din
+    medie. Cadrele sunt segmentate în pachete de cel mult mtu_bits.
+    """
+    ue_ids = np.asarray(ue_ids, dtype=np.int64)
+    period = 1000.0 / _get(params, "xr_fps")
+    mean_bits = _get(params, "xr_rate_mbps") * 1e3 * period          # Mbit/s × ms = kbit
+    phase  = rng.uniform(0.0, period, len(ue_ids))
+    counts = np.ceil((sim_time_ms - phase) / period).astype(np.int64) + 1
+    owner  = np.repeat(np.arange(len(ue_ids)), counts)
+    k      = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    jmax   = _get(params, "xr_jitter_max_ms")
+    jitter = np.clip(rng.normal(0.0, _get(params, "xr_jitter_std_ms"), len(k)), -jmax, jmax)
+    t = phase[owner] + k * period + jitter
+    std  = _get(params, "xr_size_std_pct") * mean_bits
+    bits = np.clip(rng.normal(mean_bits, std, len(k)), 0.5 * mean_bits, 1.5 * mean_bits)
+    bits = np.maximum(8, np.round(bits / 8.0) * 8).astype(np.int64)
+    t, ue, size = _split_mtu(t, ue_ids[owner], bits, int(_get(params, "mtu_bits")))
+    return _pack(t, ue, size, sim_time_ms), np.full(len(ue_ids), period)
+
+
+# Modelele disponibile după traffic_type; 'periodic' / 'aperiodic' trec pe
+# calea vectorizată doar cu traffic_generator = 'numpy'
+TRAFFIC_MODELS = {
+    "periodic":  periodic,
+    "aperiodic": poisson,
+    "poisson":   poisson,
+    "on_off":    on_off,
+    "ftp3":      ftp3,
+    "xr":        xr,
+}
+
+
+def generate(traffic_type: str, ue_ids, params: dict, sim_time_ms: float, rng):
+    try:
+        model = TRAFFIC_MODELS[traffic_type]
+    except KeyError:
+        raise ValueError(f"model de trafic necunoscut: {traffic_type!r} "
+                         f"(disponibile: {', '.join(TRAFFIC_MODELS)})") from None
+    return model(ue_ids, params, sim_time_ms, rng)